@@ -10,11 +10,18 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.0/ref/settings/
 """
 
+import sys
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
+# The django_perf package shared by the projects in this repository lives
+# at its root.
+REPO_ROOT = BASE_DIR.parent
+if str(REPO_ROOT) not in sys.path:
+    sys.path.append(str(REPO_ROOT))
+
 
 # Quick-start development settings - unsuitable for production
 # See https://docs.djangoproject.com/en/5.0/howto/deployment/checklist/
@@ -44,6 +51,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'django_perf.instrumentation.RequestMetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -104,6 +112,27 @@ AUTH_PASSWORD_VALIDATORS = [
 ]
 
 
+# The book and author endpoints take a handful of queries per page with
+# their select_related/prefetch_related querysets. Requests over
+# REQUEST_QUERY_BUDGET (or their view's entry in REQUEST_QUERY_BUDGETS)
+# are logged; per-view totals are served at /metrics/ to staff users
+# (django_perf.instrumentation).
+REQUEST_QUERY_BUDGET = 20
+REQUEST_QUERY_BUDGETS = {}
+# Serve /metrics/ to anyone, not just staff users. Only for a scraper on
+# a network the public cannot reach.
+REQUEST_METRICS_PUBLIC = False
+
+# List endpoints return pages of PAGE_SIZE (?page_size= up to 500) with
+# opaque next/previous cursors; see api/pagination.py.
+REST_FRAMEWORK = {
+    'DEFAULT_PAGINATION_CLASS': 'api.pagination.KeysetCursorPagination',
+    'PAGE_SIZE': 50,
+    # Per-item errors of many=True serializers as {index: errors}.
+    'LIST_SERIALIZER_ERRORS_AS_DICT': True,
+}
+
+
 # Internationalization
 # https://docs.djangoproject.com/en/5.0/topics/i18n/
 
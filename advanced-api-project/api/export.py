@@ -0,0 +1,51 @@
+import csv
+import json
+
+# Rows fetched from the database per round trip and lines sent per chunk.
+EXPORT_CHUNK_SIZE = 2000
+
+
+# Echo is the file-like object csv.writer writes to: it hands each line
+# back instead of buffering it.
+class Echo:
+    def write(self, value):
+        return value
+
+
+def export_rows(queryset, fields):
+    """Dicts of ``fields`` for every row, read in chunks through a
+    server-side cursor where the database has one, so memory does not grow
+    with the size of the export.
+    """
+    return queryset.values(*fields).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+
+
+def chunked(lines):
+    """Join lines into chunks of EXPORT_CHUNK_SIZE, so the response is not
+    written one short line at a time.
+    """
+    chunk = []
+    for line in lines:
+        chunk.append(line)
+        if len(chunk) == EXPORT_CHUNK_SIZE:
+            yield "".join(chunk)
+            chunk = []
+    if chunk:
+        yield "".join(chunk)
+
+
+def stream_csv(rows, fields):
+    writer = csv.writer(Echo())
+    yield writer.writerow(fields)
+    yield from chunked(writer.writerow([row[name] for name in fields]) for row in rows)
+
+
+def stream_ndjson(rows, fields):
+    yield from chunked(json.dumps(row, ensure_ascii=False) + "\n" for row in rows)
+
+
+# export format -> (content type, stream function)
+EXPORT_FORMATS = {
+    "csv": ("text/csv; charset=utf-8", stream_csv),
+    "ndjson": ("application/x-ndjson; charset=utf-8", stream_ndjson),
+}
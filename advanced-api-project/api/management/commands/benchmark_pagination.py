@@ -0,0 +1,81 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import RequestFactory
+from rest_framework.pagination import LimitOffsetPagination
+from rest_framework.request import Request
+
+from django_perf.benchmarking import QueryCounter, percentile, request_host
+from api.models import Book
+from api.pagination import KeysetCursorPagination
+from api.views import BookListView
+
+
+class Command(BaseCommand):
+    help = (
+        "Time /api/books/ at increasing page depths with cursor pagination and with "
+        "?offset= pagination. Seed the database with seed_benchmark_data first."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--page-size", type=int, default=50)
+        parser.add_argument(
+            "--depth", type=int, action="append", dest="depths",
+            help="Page number to time (repeatable). Defaults to 1, 10, 100, 1000 and 10000.",
+        )
+        parser.add_argument("--requests", type=int, default=20, help="Timed requests per page and paginator.")
+        parser.add_argument("--ordering", default="id", help="?ordering= for both paginators, e.g. -publication_year.")
+
+    def handle(self, *args, **options):
+        page_size = options["page_size"]
+        total = Book.objects.count()
+        if not total:
+            raise CommandError("No books to page through; run seed_benchmark_data first.")
+        depths = [d for d in options["depths"] or [1, 10, 100, 1000, 10000] if (d - 1) * page_size < total]
+
+        factory = RequestFactory(HTTP_HOST=request_host())
+        cursor_view = BookListView.as_view()
+        offset_view = BookListView.as_view(pagination_class=LimitOffsetPagination)
+        ordering = options["ordering"]
+
+        self.stdout.write(f"{total} books, {page_size} per page, ?ordering={ordering}")
+        self.stdout.write(
+            f"{'page':>7} {'offset p50':>11} {'p95 ms':>8} {'queries':>8} {'cursor p50':>11} {'p95 ms':>8} {'queries':>8}"
+        )
+        for depth in depths:
+            offset = (depth - 1) * page_size
+            offset_request = {"ordering": ordering, "limit": page_size, "offset": offset}
+            cursor_request = {"ordering": ordering, "page_size": page_size}
+            if offset:
+                cursor_request["cursor"] = self.cursor_before(factory, ordering, offset)
+            offset_stats = self.time(factory, offset_view, offset_request, options["requests"])
+            cursor_stats = self.time(factory, cursor_view, cursor_request, options["requests"])
+            self.stdout.write(
+                f"{depth:>7} {offset_stats[0]:>11.2f} {offset_stats[1]:>8.2f} {offset_stats[2]:>8g} "
+                f"{cursor_stats[0]:>11.2f} {cursor_stats[1]:>8.2f} {cursor_stats[2]:>8g}"
+            )
+        self.stdout.write(self.style.SUCCESS("Done."))
+
+    def cursor_before(self, factory, ordering, offset):
+        """The next-page cursor of the page that ends at row ``offset``."""
+        request = Request(factory.get("/api/books/", {"ordering": ordering}))
+        paginator = KeysetCursorPagination()
+        paginator.ordering = paginator.get_ordering(request, BookListView.queryset, BookListView)
+        row = BookListView.queryset.order_by(*paginator.ordering)[offset - 1]
+        return paginator.encode_cursor(False, row)
+
+    def time(self, factory, view, params, requests):
+        """p50 and p95 latency in ms and queries per request."""
+        counter = QueryCounter()
+        latencies = []
+        with connection.execute_wrapper(counter):
+            for _ in range(requests):
+                request = factory.get("/api/books/", params)
+                started = time.perf_counter()
+                response = view(request).render()
+                latencies.append((time.perf_counter() - started) * 1000)
+                if response.status_code != 200:
+                    raise CommandError(f"/api/books/ {params} returned {response.status_code}")
+        latencies.sort()
+        return percentile(latencies, 50), percentile(latencies, 95), counter.count / requests
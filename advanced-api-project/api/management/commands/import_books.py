@@ -0,0 +1,129 @@
+import csv
+import json
+import time
+from itertools import islice
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from rest_framework import serializers
+
+from api.models import Author, Book
+from api.serializers import validate_publication_year
+
+FORMATS = {".csv": "csv", ".ndjson": "ndjson", ".jsonl": "ndjson"}
+TITLE_MAX_LENGTH = Book._meta.get_field("title").max_length
+AUTHOR_MAX_LENGTH = Author._meta.get_field("name").max_length
+
+
+class Command(BaseCommand):
+    help = (
+        "Import books from a CSV or NDJSON file with title, publication_year and author (a name) "
+        "columns, as written by /api/books/export.csv and .ndjson. The file is read a batch at a "
+        "time; authors are matched by name and created when missing. Invalid rows are skipped "
+        "and reported."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("file")
+        parser.add_argument("--format", choices=["csv", "ndjson"], help="Defaults to the file extension.")
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument("--max-errors", type=int, default=20, help="Invalid rows to report individually.")
+
+    def handle(self, *args, **options):
+        path = Path(options["file"])
+        file_format = options["format"] or FORMATS.get(path.suffix.lower())
+        if file_format is None:
+            raise CommandError(f"Cannot tell the format of {path}; pass --format.")
+        if not path.is_file():
+            raise CommandError(f"{path} does not exist.")
+
+        started = time.perf_counter()
+        self.max_errors = options["max_errors"]
+        self.skipped = 0
+        # Every author name seen so far -> id, starting with those in the
+        # database. Where names repeat the oldest author wins.
+        self.authors = {}
+        for pk, name in Author.objects.order_by("-pk").values_list("pk", "name").iterator(chunk_size=10_000):
+            self.authors[name] = pk
+        new_authors = imported = 0
+        reported = started
+
+        with path.open(newline="", encoding="utf-8") as handle:
+            rows = self.valid_books(read_rows(handle, file_format))
+            while batch := list(islice(rows, options["batch_size"])):
+                with transaction.atomic():
+                    new_authors += self.add_authors({name for name, _ in batch})
+                    Book.objects.bulk_create(
+                        [Book(author_id=self.authors[name], **fields) for name, fields in batch]
+                    )
+                imported += len(batch)
+                now = time.perf_counter()
+                if now - reported >= 1:
+                    reported = now
+                    self.stdout.write(f"{imported:>12,} books  {imported / (now - started):>10,.0f} rows/s")
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {imported:,} books and {new_authors:,} new authors in {elapsed:.1f}s "
+            f"({imported / max(elapsed, 1e-9):,.0f} rows/s); skipped {self.skipped:,} invalid rows."
+        ))
+
+    def valid_books(self, rows):
+        """(author name, Book fields) for each valid row; invalid rows are
+        counted and the first --max-errors reported.
+        """
+        for line, row in rows:
+            try:
+                yield clean_row(row)
+            except (serializers.ValidationError, ValueError) as exc:
+                self.skipped += 1
+                if self.skipped <= self.max_errors:
+                    message = exc.detail[0] if isinstance(exc, serializers.ValidationError) else exc
+                    self.stderr.write(f"Line {line}: {message}")
+
+    def add_authors(self, names):
+        """Create the authors in ``names`` not seen before; returns how many."""
+        missing = sorted(names - self.authors.keys())
+        if missing:
+            created = Author.objects.bulk_create([Author(name=name) for name in missing])
+            if connection.features.can_return_rows_from_bulk_insert:
+                self.authors.update((author.name, author.pk) for author in created)
+            else:
+                self.authors.update(
+                    Author.objects.filter(name__in=missing).order_by("-pk").values_list("name", "pk")
+                )
+        return len(missing)
+
+
+def read_rows(handle, file_format):
+    """(line number, row) for each row of the file, read lazily."""
+    if file_format == "csv":
+        reader = csv.DictReader(handle)
+        for row in reader:
+            yield reader.line_num, row
+        return
+    for line, text in enumerate(handle, start=1):
+        if text.strip():
+            try:
+                row = json.loads(text)
+            except ValueError:
+                row = None
+            yield line, row
+
+
+def clean_row(row):
+    if not isinstance(row, dict):
+        raise ValueError("not a JSON object.")
+    # The export's author column is an id; its author_name is the name.
+    name = str(row.get("author_name") or row.get("author") or "").strip()
+    title = str(row.get("title") or "").strip()
+    if not title or not name:
+        raise ValueError("title and author are required.")
+    if len(title) > TITLE_MAX_LENGTH or len(name) > AUTHOR_MAX_LENGTH:
+        raise ValueError("title or author is too long.")
+    try:
+        year = int(row.get("publication_year"))
+    except (TypeError, ValueError):
+        raise ValueError("publication_year must be an integer.")
+    return name, {"title": title, "publication_year": validate_publication_year(year)}
@@ -0,0 +1,24 @@
+from urllib.parse import urlencode
+
+from django.core.management.base import CommandError
+
+from django_perf.benchmarking import BenchmarkCommand
+from api.models import Book
+
+
+class Command(BenchmarkCommand):
+    def endpoints(self):
+        book = Book.objects.select_related("author").order_by("pk").first()
+        if book is None:
+            raise CommandError("No books to request; run seed_benchmark_data first.")
+        return [
+            ("book-list", "/api/books/"),
+            ("book-list-title", "/api/books/?ordering=title"),
+            ("book-detail", f"/api/books/{book.pk}/"),
+            ("book-list-author", f"/api/books/?author={book.author_id}"),
+            ("book-list-author-name", f"/api/books/?{urlencode({'author__name': book.author.name})}"),
+            ("book-list-year", f"/api/books/?publication_year={book.publication_year}&ordering=title"),
+            ("book-export-author", f"/api/books/export.ndjson?author={book.author_id}"),
+            ("author-detail", f"/api/authors/{book.author_id}/"),
+            ("book-search", f"/api/books/?{urlencode({'search': book.author.name})}"),
+        ]
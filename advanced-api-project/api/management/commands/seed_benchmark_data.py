@@ -0,0 +1,40 @@
+import random
+import time
+
+from django_perf.benchmarking import SeedCommand, insert_batches
+from api.models import Author, Book
+
+FIRST_NAMES = "Ada Chinua Frank Ursula Toni Gabriel Octavia Haruki Italo Jorge Doris Kazuo".split()
+LAST_NAMES = "Achebe Herbert Le-Guin Morrison Marquez Butler Murakami Calvino Borges Lessing Ishiguro".split()
+WORDS = "shadow river empire dune storm garden silent last night city glass winter house war sea".split()
+
+
+class Command(SeedCommand):
+    help = "Add synthetic authors and books for run_benchmarks, inserted with bulk_create in batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--authors", type=int, default=20_000)
+        parser.add_argument("--books", type=int, default=1_000_000)
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument("--seed", type=int, default=42)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+        batch_size = options["batch_size"]
+        started = time.perf_counter()
+
+        last_author = Author.objects.order_by("-pk").values_list("pk", flat=True).first() or 0
+        self.timed("authors", lambda: insert_batches(Author, (
+            Author(name=f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)} {n}") for n in range(options["authors"])
+        ), batch_size))
+        author_ids = list(Author.objects.filter(pk__gt=last_author).values_list("pk", flat=True))
+
+        self.timed("books", lambda: insert_batches(Book, (
+            Book(
+                title=" ".join(rng.choices(WORDS, k=3)).title(),
+                publication_year=rng.randint(1850, 2024),
+                author_id=rng.choice(author_ids),
+            )
+            for _ in range(options["books"] if author_ids else 0)
+        ), batch_size))
+        self.stdout.write(self.style.SUCCESS(f"Seeded benchmark data in {time.perf_counter() - started:.1f}s."))
@@ -5,6 +5,9 @@ from django.db import models
 class Author(models.Model):
     name = models.CharField(max_length=100, help_text="Full name of the author")
 
+    class Meta:
+        indexes = [models.Index(fields=["name", "id"], name="api_author_name_idx")]
+
     def __str__(self) -> str:
         return self.name
 
@@ -21,5 +24,13 @@ class Book(models.Model):
         help_text="Author who wrote this book",
     )
 
+    class Meta:
+        # Keyset pagination seeks and sorts on (field, id) for each
+        # ?ordering= field; these let deep pages read the index in order.
+        indexes = [
+            models.Index(fields=["title", "id"], name="api_book_title_idx"),
+            models.Index(fields=["publication_year", "id"], name="api_book_year_idx"),
+        ]
+
     def __str__(self) -> str:
         return f"{self.title} by {self.author.name}"
\ No newline at end of file
@@ -0,0 +1,134 @@
+import base64
+import json
+from functools import reduce
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination
+from rest_framework.utils.urls import replace_query_param
+
+
+# KeysetCursorPagination pages through a list by seeking past the last row
+# returned, on every field of the ordering (?ordering= from OrderingFilter,
+# e.g. author__name), with "id" added to break ties. Each page is one
+# WHERE (...) > (...) ORDER BY ... LIMIT query, so page 10,000 costs the
+# same as page one, and rows inserted or deleted before the cursor never
+# shift rows between pages. DRF's CursorPagination only seeks on the first
+# ordering field and falls back to OFFSET among equal values, which is
+# neither flat nor stable for fields like title or publication_year.
+#
+# Cursors are opaque: base64 JSON of the direction, the ordering they were
+# made for and the row's values. A cursor used with another ?ordering= is
+# rejected with 404 like any other invalid cursor.
+class KeysetCursorPagination(CursorPagination):
+    ordering = ("id",)
+    page_size_query_param = "page_size"
+    max_page_size = 500
+
+    def get_ordering(self, request, queryset, view):
+        ordering = list(self.ordering)
+        for backend in getattr(view, "filter_backends", []):
+            if hasattr(backend, "get_ordering"):
+                ordering = list(backend().get_ordering(request, queryset, view) or ordering)
+                break
+        if not {"id", "-id", "pk", "-pk"} & set(ordering):
+            ordering.append("id")
+        return tuple(ordering)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+
+        reverse, position = self.decode_cursor(request, queryset.model) or (False, None)
+        ordering = [flip(name) for name in self.ordering] if reverse else self.ordering
+        if position is not None:
+            queryset = queryset.filter(seek(ordering, position))
+
+        # One extra row tells whether there is another page in that direction.
+        rows = list(queryset.order_by(*ordering)[:self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        if reverse:
+            rows.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, position is not None
+        self.page = rows
+        return rows
+
+    def get_next_link(self):
+        if not (self.page and self.has_next):
+            return None
+        return self.link(False, self.page[-1])
+
+    def get_previous_link(self):
+        if not (self.page and self.has_previous):
+            return None
+        return self.link(True, self.page[0])
+
+    def link(self, reverse, obj):
+        return replace_query_param(self.base_url, self.cursor_query_param, self.encode_cursor(reverse, obj))
+
+    def encode_cursor(self, reverse, obj):
+        values = [field_value(obj, name.lstrip("-")) for name in self.ordering]
+        raw = json.dumps([reverse, list(self.ordering), values], separators=(",", ":")).encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+    def decode_cursor(self, request, model):
+        cursor = request.query_params.get(self.cursor_query_param)
+        if not cursor:
+            return None
+        try:
+            raw = base64.urlsafe_b64decode((cursor + "=" * (-len(cursor) % 4)).encode())
+            reverse, ordering, values = json.loads(raw)
+            if not isinstance(reverse, bool) or tuple(ordering) != self.ordering:
+                raise ValueError(cursor)
+            position = [
+                model_field(model, name.lstrip("-")).to_python(value)
+                for name, value in zip(self.ordering, values, strict=True)
+            ]
+        except (TypeError, ValueError, ValidationError, FieldDoesNotExist):
+            raise NotFound(self.invalid_cursor_message)
+        return reverse, position
+
+
+def flip(name):
+    return name[1:] if name.startswith("-") else f"-{name}"
+
+
+def seek(ordering, values):
+    """Rows after ``values`` in ``ordering``: for "-a, b" that is
+    a <= x AND (a < x OR (a = x AND b > y)).
+    """
+    terms = []
+    for i, name in enumerate(ordering):
+        field = name.lstrip("-")
+        term = Q(**{f"{field}__{'lt' if name.startswith('-') else 'gt'}": values[i]})
+        for j in range(i):
+            term &= Q(**{ordering[j].lstrip("-"): values[j]})
+        terms.append(term)
+    # The redundant bound on the first field lets the database seek into
+    # the (field, id) index instead of filtering rows one by one.
+    first = ordering[0]
+    bound = Q(**{f"{first.lstrip('-')}__{'lte' if first.startswith('-') else 'gte'}": values[0]})
+    return bound & reduce(lambda a, b: a | b, terms)
+
+
+def field_value(obj, name):
+    """``name`` may follow relations, e.g. author__name."""
+    for part in name.split("__"):
+        obj = getattr(obj, part)
+    return obj
+
+
+def model_field(model, name):
+    *relations, last = name.split("__")
+    for part in relations:
+        model = model._meta.get_field(part).related_model
+    return model._meta.pk if last == "pk" else model._meta.get_field(last)
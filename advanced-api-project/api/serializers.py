@@ -1,26 +1,113 @@
 from datetime import date
+from django.core.exceptions import ValidationError as DjangoValidationError
 from rest_framework import serializers
 from .models import Author, Book
 
+
+# PreloadedPrimaryKeyRelatedField resolves ids from the objects a list
+# serializer loaded in bulk (context["preloaded"][field name]) instead of
+# running one query per item. On its own it is a PrimaryKeyRelatedField.
+class PreloadedPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    def to_internal_value(self, data):
+        preloaded = self.context.get("preloaded", {}).get(self.field_name)
+        if preloaded is None or self.pk_field is not None:
+            return super().to_internal_value(data)
+        pk = to_pk(self.get_queryset().model, data)
+        if pk is None:
+            self.fail("incorrect_type", data_type=type(data).__name__)
+        if pk not in preloaded:
+            self.fail("does_not_exist", pk_value=data)
+        return preloaded[pk]
+
+
+def to_pk(model, value):
+    """``value`` as a primary key of ``model``, or None if it is not one."""
+    if isinstance(value, bool):
+        return None
+    try:
+        return model._meta.pk.to_python(value)
+    except DjangoValidationError:
+        return None
+
+
+# BookListSerializer handles BookSerializer(many=True) writes in bulk:
+# authors for all items are loaded in one query, creates are one
+# bulk_create and updates one bulk_update. For updates, pass the books
+# being changed as the instance and an "id" in each item.
+class BookListSerializer(serializers.ListSerializer):
+    def to_internal_value(self, data):
+        if isinstance(data, list):
+            self.preload(data)
+        self.instances = {book.pk: book for book in self.instance or ()}
+        self.seen = set()
+        return super().to_internal_value(data)
+
+    def preload(self, data):
+        preloaded = self.context.setdefault("preloaded", {})
+        for name, field in self.child.fields.items():
+            if isinstance(field, PreloadedPrimaryKeyRelatedField) and not field.read_only:
+                model = field.get_queryset().model
+                pks = {to_pk(model, item.get(name)) for item in data if isinstance(item, dict)}
+                preloaded[name] = field.get_queryset().in_bulk(pks - {None})
+
+    def run_child_validation(self, data):
+        if self.instance is None:
+            return super().run_child_validation(data)
+        pk = to_pk(Book, data.get("id")) if isinstance(data, dict) else None
+        if pk not in self.instances:
+            raise serializers.ValidationError({"id": ["Book not found."]})
+        if pk in self.seen:
+            raise serializers.ValidationError({"id": ["Book appears more than once."]})
+        self.seen.add(pk)
+        self.child.instance = self.instances[pk]
+        self.child.initial_data = data
+        return {**super().run_child_validation(data), "id": pk}
+
+    def create(self, validated_data):
+        return Book.objects.bulk_create([Book(**attrs) for attrs in validated_data])
+
+    def update(self, instance, validated_data):
+        instances = {book.pk: book for book in instance}
+        books, fields = [], set()
+        for attrs in validated_data:
+            book = instances[attrs.pop("id")]
+            for name, value in attrs.items():
+                setattr(book, name, value)
+            fields.update(attrs)
+            books.append(book)
+        if fields:
+            Book.objects.bulk_update(books, sorted(fields))
+        return books
+
+
 # BookSerializer serializes all fields of Book.
 # Validation: publication_year must not be in the future.
 class BookSerializer(serializers.ModelSerializer):
+    serializer_related_field = PreloadedPrimaryKeyRelatedField
+
     class Meta:
         model = Book
         fields = "__all__"
+        list_serializer_class = BookListSerializer
 
     def validate_publication_year(self, value):
-        current_year = date.today().year
-        if value > current_year:
-            raise serializers.ValidationError("publication_year cannot be in the future.")
-        return value
+        return validate_publication_year(value)
+
+
+# Also used by manage.py import_books, which does not build a serializer per row.
+def validate_publication_year(value):
+    current_year = date.today().year
+    if value > current_year:
+        raise serializers.ValidationError("publication_year cannot be in the future.")
+    return value
 
 
 # AuthorSerializer includes the author's name and a nested list of their books.
 # Uses 'books' from Book.related_name, read-only nested representation.
+# Views should prefetch_related("books") or each author costs a query.
 class AuthorSerializer(serializers.ModelSerializer):
     books = BookSerializer(many=True, read_only=True)
 
     class Meta:
         model = Author
-        fields = ("name", "books")
\ No newline at end of file
+        fields = ("id", "name", "books")
\ No newline at end of file
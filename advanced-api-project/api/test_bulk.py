@@ -0,0 +1,124 @@
+"""
+Tests for the bulk book endpoint (/api/books/bulk/).
+
+Covers:
+- Bulk create, update (PUT and PATCH) and delete
+- Per-item errors, including validate_publication_year, with nothing written
+- Unauthenticated requests are refused
+- Queries stay constant as the batch grows
+"""
+
+from datetime import date
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from .models import Author, Book
+
+BULK_URL = "/api/books/bulk/"
+
+
+class BookBulkTests(APITestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username="tester", password="pass12345")
+        self.client.force_authenticate(user=self.user)
+        self.achebe = Author.objects.create(name="Chinua Achebe")
+        self.herbert = Author.objects.create(name="Frank Herbert")
+
+    def books(self, count, author=None):
+        return [
+            {"title": f"  Book {i}  ", "publication_year": 1950 + i, "author": (author or self.achebe).id}
+            for i in range(count)
+        ]
+
+    def test_create(self):
+        response = self.client.post(BULK_URL, self.books(3), format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual([book["title"] for book in response.data], ["Book 0", "Book 1", "Book 2"])
+        self.assertTrue(all(book["id"] for book in response.data))
+        self.assertEqual(Book.objects.filter(author=self.achebe).count(), 3)
+
+    def test_create_reports_every_invalid_item(self):
+        books = self.books(4)
+        books[1]["publication_year"] = date.today().year + 1
+        books[3]["author"] = 999
+        response = self.client.post(BULK_URL, books, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        errors = response.data["errors"]
+        self.assertEqual([error["index"] for error in errors], [1, 3])
+        self.assertIn("publication_year", errors[0]["errors"])
+        self.assertIn("author", errors[1]["errors"])
+        self.assertFalse(Book.objects.exists())
+
+    def test_create_needs_a_list(self):
+        response = self.client.post(BULK_URL, {"title": "Dune"}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("non_field_errors", response.data["errors"])
+
+    def test_update(self):
+        dune = Book.objects.create(title="Dune", publication_year=1965, author=self.herbert)
+        arrow = Book.objects.create(title="Arrow of God", publication_year=1964, author=self.achebe)
+        payload = [
+            {"id": dune.id, "title": " Dune Messiah ", "publication_year": 1969, "author": self.herbert.id},
+            {"id": arrow.id, "title": "Arrow of God", "publication_year": 1964, "author": self.herbert.id},
+        ]
+        response = self.client.put(BULK_URL, payload, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        dune.refresh_from_db()
+        arrow.refresh_from_db()
+        self.assertEqual((dune.title, dune.publication_year), ("Dune Messiah", 1969))
+        self.assertEqual(arrow.author, self.herbert)
+
+    def test_partial_update(self):
+        dune = Book.objects.create(title="Dune", publication_year=1965, author=self.herbert)
+        response = self.client.patch(BULK_URL, [{"id": dune.id, "publication_year": 1966}], format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        dune.refresh_from_db()
+        self.assertEqual((dune.title, dune.publication_year), ("Dune", 1966))
+
+    def test_update_unknown_and_repeated_ids(self):
+        dune = Book.objects.create(title="Dune", publication_year=1965, author=self.herbert)
+        payload = [{"id": dune.id, "title": "Dune 2"}, {"id": 999, "title": "Lost"}, {"id": dune.id, "title": "Dune 3"}]
+        response = self.client.patch(BULK_URL, payload, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual([error["index"] for error in response.data["errors"]], [1, 2])
+        dune.refresh_from_db()
+        self.assertEqual(dune.title, "Dune")
+
+    def test_delete(self):
+        ids = [Book.objects.create(title=f"Book {i}", publication_year=1950, author=self.achebe).id for i in range(3)]
+        response = self.client.delete(BULK_URL, ids[:2], format="json")
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertEqual(list(Book.objects.values_list("id", flat=True)), ids[2:])
+
+    def test_delete_unknown_id_deletes_nothing(self):
+        book = Book.objects.create(title="Dune", publication_year=1965, author=self.herbert)
+        response = self.client.delete(BULK_URL, [book.id, 999], format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data["errors"], [{"index": 1, "errors": ["Book not found."]}])
+        self.assertTrue(Book.objects.filter(pk=book.pk).exists())
+
+    def test_requires_authentication(self):
+        self.client.force_authenticate(user=None)
+        response = self.client.post(BULK_URL, self.books(1), format="json")
+        self.assertIn(response.status_code, (status.HTTP_401_UNAUTHORIZED, status.HTTP_403_FORBIDDEN))
+
+    def queries_for(self, method, payload):
+        with CaptureQueriesContext(connection) as queries:
+            response = getattr(self.client, method)(BULK_URL, payload, format="json")
+        self.assertLess(response.status_code, 300, response.data)
+        return len(queries)
+
+    def test_constant_queries(self):
+        self.assertEqual(
+            self.queries_for("post", self.books(3)),
+            self.queries_for("post", self.books(30, author=self.herbert)),
+        )
+        few, many = Book.objects.order_by("id")[:3], Book.objects.order_by("id")[3:]
+        self.assertEqual(
+            self.queries_for("patch", [{"id": book.id, "author": self.herbert.id} for book in few]),
+            self.queries_for("patch", [{"id": book.id, "author": self.achebe.id} for book in many]),
+        )
@@ -0,0 +1,75 @@
+"""
+Tests for the streaming book export (/api/books/export.csv, .ndjson).
+
+Covers:
+- CSV with a header row and NDJSON with one object per line
+- The same filtering, searching and ordering as the book list
+- The export streams and runs one query however many rows it returns
+"""
+
+import csv
+import io
+import json
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from . import export
+from .models import Author, Book
+
+
+class BookExportTests(APITestCase):
+    def setUp(self):
+        self.achebe = Author.objects.create(name="Chinua Achebe")
+        self.herbert = Author.objects.create(name="Frank Herbert")
+        self.things = Book.objects.create(title="Things Fall Apart", publication_year=1958, author=self.achebe)
+        self.dune = Book.objects.create(title="Dune", publication_year=1965, author=self.herbert)
+        self.arrow = Book.objects.create(title="Arrow of God", publication_year=1964, author=self.achebe)
+
+    def export(self, export_format, params=None):
+        response = self.client.get(f"/api/books/export.{export_format}", params, HTTP_ACCEPT="application/json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        return response, b"".join(response.streaming_content).decode()
+
+    def ndjson(self, params=None):
+        return [json.loads(line) for line in self.export("ndjson", params)[1].splitlines()]
+
+    def test_csv(self):
+        response, body = self.export("csv")
+        self.assertEqual(response["Content-Type"], "text/csv; charset=utf-8")
+        self.assertIn('filename="books.csv"', response["Content-Disposition"])
+        rows = list(csv.reader(io.StringIO(body)))
+        self.assertEqual(rows[0], ["id", "title", "publication_year", "author", "author_name"])
+        self.assertEqual(rows[1], [str(self.things.id), "Things Fall Apart", "1958", str(self.achebe.id), "Chinua Achebe"])
+        self.assertEqual(len(rows), 4)
+
+    def test_ndjson(self):
+        self.assertEqual(self.ndjson()[1], {
+            "id": self.dune.id, "title": "Dune", "publication_year": 1965,
+            "author": self.herbert.id, "author_name": "Frank Herbert",
+        })
+
+    def test_filter_search_and_ordering(self):
+        titles = lambda params: [row["title"] for row in self.ndjson(params)]
+        self.assertEqual(titles({"author__name": "Chinua Achebe"}), ["Things Fall Apart", "Arrow of God"])
+        self.assertEqual(titles({"search": "Herbert"}), ["Dune"])
+        self.assertEqual(titles({"ordering": "-publication_year"}), ["Dune", "Arrow of God", "Things Fall Apart"])
+
+    def test_unknown_format(self):
+        self.assertEqual(self.client.get("/api/books/export.xml").status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_one_query_in_chunks(self):
+        for i in range(10):
+            Book.objects.create(title=f"Book {i}", publication_year=1970, author=self.herbert)
+        chunk_size = export.EXPORT_CHUNK_SIZE
+        export.EXPORT_CHUNK_SIZE = 4
+        try:
+            with CaptureQueriesContext(connection) as queries:
+                response, body = self.export("ndjson")
+        finally:
+            export.EXPORT_CHUNK_SIZE = chunk_size
+        self.assertEqual(len(body.splitlines()), 13)
+        self.assertEqual(len(queries), 1)
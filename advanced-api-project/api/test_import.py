@@ -0,0 +1,109 @@
+"""
+Tests for manage.py import_books.
+
+Covers:
+- CSV and NDJSON files, including a round trip through the export
+- Author names matched to existing authors, new ones created once
+- Invalid rows (future year, missing fields, bad JSON) skipped and reported
+- Batches: queries grow with the number of batches, not rows
+"""
+
+import json
+import tempfile
+from datetime import date
+from io import StringIO
+from pathlib import Path
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from .models import Author, Book
+
+
+class ImportBooksTests(TestCase):
+    def setUp(self):
+        self.achebe = Author.objects.create(name="Chinua Achebe")
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = Path(directory.name)
+
+    def write(self, name, text):
+        path = self.directory / name
+        path.write_text(text, encoding="utf-8")
+        return str(path)
+
+    def run_import(self, path, *args):
+        out, err = StringIO(), StringIO()
+        call_command("import_books", path, *args, stdout=out, stderr=err)
+        return out.getvalue(), err.getvalue()
+
+    def test_csv(self):
+        path = self.write("books.csv", (
+            "title,publication_year,author\n"
+            "Things Fall Apart,1958,Chinua Achebe\n"
+            " Dune ,1965,Frank Herbert\n"
+            "Dune Messiah,1969,Frank Herbert\n"
+        ))
+        out, err = self.run_import(path)
+        self.assertIn("Imported 3 books and 1 new authors", out)
+        self.assertEqual(err, "")
+        self.assertEqual(self.achebe.books.get().title, "Things Fall Apart")
+        herbert = Author.objects.get(name="Frank Herbert")
+        self.assertEqual(sorted(herbert.books.values_list("title", flat=True)), ["Dune", "Dune Messiah"])
+
+    def test_ndjson_invalid_rows(self):
+        future = date.today().year + 1
+        path = self.write("books.ndjson", "\n".join([
+            json.dumps({"title": "Arrow of God", "publication_year": 1964, "author": "Chinua Achebe"}),
+            json.dumps({"title": "Tomorrow", "publication_year": future, "author": "Chinua Achebe"}),
+            json.dumps({"title": "", "publication_year": 1964, "author": "Chinua Achebe"}),
+            "{not json",
+            json.dumps({"title": "Undated", "publication_year": "soon", "author": "Chinua Achebe"}),
+        ]) + "\n")
+        out, err = self.run_import(path)
+        self.assertIn("Imported 1 books and 0 new authors", out)
+        self.assertIn("skipped 4 invalid rows", out)
+        self.assertEqual(err.splitlines(), [
+            "Line 2: publication_year cannot be in the future.",
+            "Line 3: title and author are required.",
+            "Line 4: not a JSON object.",
+            "Line 5: publication_year must be an integer.",
+        ])
+        self.assertEqual(list(Book.objects.values_list("title", flat=True)), ["Arrow of God"])
+
+    def test_round_trip_through_the_export(self):
+        herbert = Author.objects.create(name="Frank Herbert")
+        Book.objects.create(title="Dune", publication_year=1965, author=herbert)
+        Book.objects.create(title="Arrow of God", publication_year=1964, author=self.achebe)
+        response = self.client.get("/api/books/export.csv")
+        path = self.write("export.csv", b"".join(response.streaming_content).decode())
+        Book.objects.all().delete()
+        self.run_import(path)
+        self.assertEqual(
+            sorted(Book.objects.values_list("title", "author__name")),
+            [("Arrow of God", "Chinua Achebe"), ("Dune", "Frank Herbert")],
+        )
+        self.assertEqual(Author.objects.count(), 2)
+
+    def test_queries_per_batch(self):
+        def queries_for(rows):
+            path = self.write("books.csv", "title,publication_year,author\n" + "".join(
+                f"Book {i},1990,Author {i % 3}\n" for i in range(rows)
+            ))
+            Book.objects.all().delete()
+            with CaptureQueriesContext(connection) as queries:
+                self.run_import(path, "--batch-size", "10")
+            return len(queries)
+        queries_for(20)  # creates the authors
+        two_batches = queries_for(20)
+        ten_batches = queries_for(100)
+        self.assertEqual(Book.objects.count(), 100)
+        # A savepoint, one INSERT and its release per batch of 10 rows.
+        self.assertEqual((ten_batches - two_batches) / 8, 3)
+
+    def test_unknown_format(self):
+        with self.assertRaisesMessage(CommandError, "pass --format"):
+            self.run_import(self.write("books.txt", ""))
@@ -0,0 +1,67 @@
+"""
+Tests for the per-request metrics middleware (django_perf.instrumentation)
+and the N+1 detector built on it (django_perf.nplusone).
+
+Covers:
+- Server-Timing on API responses, with the number of queries run
+- Per-view totals in the Prometheus text endpoint
+- Requests over their query budget are logged and counted
+- N+1 queries from a nested serializer fail and name the field
+"""
+
+from django.db import connection
+from django.http import JsonResponse
+from django.test import RequestFactory, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APITestCase
+
+from django_perf.instrumentation import RequestMetricsMiddleware, registry
+from django_perf.nplusone import detect_n_plus_one
+
+from .models import Author, Book
+from .serializers import AuthorSerializer
+
+
+class RequestMetricsTests(APITestCase):
+    def setUp(self):
+        registry.reset()
+        self.addCleanup(registry.reset)
+        author = Author.objects.create(name="Chinua Achebe")
+        Book.objects.create(title="Things Fall Apart", publication_year=1958, author=author)
+
+    def test_server_timing_counts_queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get("/api/books/")
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(f'desc="{len(queries)} queries"', response["Server-Timing"])
+
+    @override_settings(REQUEST_METRICS_PUBLIC=True)
+    def test_metrics_endpoint(self):
+        self.client.get("/api/books/")
+        self.client.get("/api/books/")
+        body = self.client.get("/metrics/").content.decode()
+        self.assertIn('django_requests_total{view="book-list"} 2\n', body)
+        self.assertIn('django_db_queries_total{view="book-list"}', body)
+
+    @override_settings(REQUEST_QUERY_BUDGETS={"book-list": 0})
+    def test_query_budget(self):
+        with self.assertLogs("django_perf.instrumentation", "WARNING"):
+            self.client.get("/api/books/")
+        self.assertEqual(registry.snapshot()["book-list"]["over_budget"], 1)
+
+
+class NPlusOneDetectorTests(APITestCase):
+    def setUp(self):
+        for name in ("Chinua Achebe", "Frank Herbert", "Ursula K. Le Guin"):
+            Author.objects.create(name=name).books.create(title="A Book", publication_year=1960)
+
+    def serialize(self, authors):
+        def view(request):
+            return JsonResponse(AuthorSerializer(authors, many=True).data, safe=False)
+        return RequestMetricsMiddleware(view)(RequestFactory().get("/authors/"))
+
+    def test_nested_serializer_n_plus_one(self):
+        with detect_n_plus_one():
+            with self.assertRaisesMessage(AssertionError, "3x from AuthorSerializer.books"):
+                self.serialize(Author.objects.all())
+            self.assertEqual(self.serialize(Author.objects.prefetch_related("books")).status_code, 200)
@@ -0,0 +1,81 @@
+"""
+Tests for keyset cursor pagination of the list endpoints (api.pagination).
+
+Covers:
+- Walking next links visits every book once, in each ordering field
+- Previous links return the page before
+- Rows inserted before the cursor do not shift the next page
+- Invalid cursors, and cursors made for another ordering, are a 404
+- manage.py benchmark_pagination runs against a small table
+"""
+
+from io import StringIO
+
+from django.core.management import call_command
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from .models import Author, Book
+
+LIST_URL = "/api/books/"
+
+
+class CursorPaginationTests(APITestCase):
+    def setUp(self):
+        authors = [Author.objects.create(name=name) for name in ("Octavia Butler", "Chinua Achebe", "Italo Calvino")]
+        # Repeated titles, years and authors, so the id tie-breaker matters.
+        for i in range(23):
+            Book.objects.create(title=f"Book {i % 4}", publication_year=1950 + i % 5, author=authors[i % 3])
+
+    def get(self, url, params=None):
+        response = self.client.get(url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data
+
+    def walk(self, ordering):
+        ids = []
+        data = self.get(LIST_URL, {"ordering": ordering, "page_size": 5})
+        while True:
+            ids += [book["id"] for book in data["results"]]
+            if not data["next"]:
+                return ids
+            data = self.get(data["next"])
+
+    def test_walk_every_ordering(self):
+        books = Book.objects.select_related("author")
+        for ordering in ("id", "-id", "title", "-publication_year", "author__name", "-author__name"):
+            with self.subTest(ordering=ordering):
+                expected = list(books.order_by(ordering, "id").values_list("id", flat=True))
+                self.assertEqual(self.walk(ordering), expected)
+
+    def test_previous_link(self):
+        first = self.get(LIST_URL, {"ordering": "title", "page_size": 5})
+        self.assertIsNone(first["previous"])
+        second = self.get(first["next"])
+        third = self.get(second["next"])
+        self.assertEqual(self.get(third["previous"])["results"], second["results"])
+        self.assertEqual(self.get(second["previous"])["results"], first["results"])
+
+    def test_inserts_before_the_cursor_do_not_shift_pages(self):
+        first = self.get(LIST_URL, {"ordering": "title", "page_size": 5})
+        expected = self.get(first["next"])["results"]
+        Book.objects.create(title="A First Book", publication_year=1990, author=Author.objects.first())
+        self.assertEqual(self.get(first["next"])["results"], expected)
+
+    def test_invalid_cursor(self):
+        response = self.client.get(LIST_URL, {"cursor": "not-a-cursor"})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_cursor_for_another_ordering(self):
+        next_url = self.get(LIST_URL, {"ordering": "title", "page_size": 5})["next"]
+        response = self.client.get(next_url.replace("ordering=title", "ordering=-publication_year"))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_benchmark_pagination(self):
+        out = StringIO()
+        call_command(
+            "benchmark_pagination", "--page-size", "5", "--depth", "1", "--depth", "4", "--requests", "2",
+            "--ordering", "title", stdout=out,
+        )
+        lines = out.getvalue().splitlines()
+        self.assertEqual([line.split()[0] for line in lines[2:4]], ["1", "4"])
@@ -7,6 +7,10 @@ Covers:
 - Filtering (?title=, ?publication_year=, ?author=, ?author__name=)
 - Searching (?search= on title and author name)
 - Ordering (?ordering=title, ?ordering=-publication_year)
+- Author list/detail with their nested books
+- No request runs N+1 queries or more than QUERY_BUDGET queries
+  (django_perf.nplusone)
+- List queries stay constant as the number of rows grows
 
 Note on test DB:
 - Django's test runner automatically uses an isolated test database.
@@ -16,13 +20,22 @@ Note on test DB:
 
 from datetime import date
 from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from rest_framework.test import APITestCase
 from rest_framework import status
 
+from django_perf.nplusone import QueryBudgetTestMixin
+
 from .models import Author, Book
 
+# Queries any one API request may run, sessions and auth included.
+QUERY_BUDGET = 10
+
+
+class BookAPITests(QueryBudgetTestMixin, APITestCase):
+    query_budget = QUERY_BUDGET
 
-class BookAPITests(APITestCase):
     def setUp(self):
         # Users
         User = get_user_model()
@@ -56,8 +69,8 @@ class BookAPITests(APITestCase):
     def test_list_books_public_allowed(self):
         response = self.client.get(self.list_url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertIsInstance(response.data, list)
-        self.assertGreaterEqual(len(response.data), 2)
+        self.assertIsInstance(response.data["results"], list)
+        self.assertGreaterEqual(len(response.data["results"]), 2)
 
     def test_detail_book_public_allowed(self):
         response = self.client.get(self.detail_url)
@@ -117,22 +130,81 @@ class BookAPITests(APITestCase):
     def test_filter_by_title(self):
         response = self.client.get(f"{self.list_url}?title=Dune")
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 1)
-        self.assertEqual(response.data[0]["title"], "Dune")
+        self.assertEqual(len(response.data["results"]), 1)
+        self.assertEqual(response.data["results"][0]["title"], "Dune")
 
     def test_filter_by_author_name(self):
         response = self.client.get(f"{self.list_url}?author__name=Chinua Achebe")
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertTrue(all(item["author"] == self.author1.id for item in response.data))
+        self.assertTrue(all(item["author"] == self.author1.id for item in response.data["results"]))
 
     def test_search_by_title(self):
         response = self.client.get(f"{self.list_url}?search=Things")
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        titles = [b["title"] for b in response.data]
+        titles = [b["title"] for b in response.data["results"]]
         self.assertIn("Things Fall Apart", titles)
 
     def test_ordering_by_publication_year_desc(self):
         response = self.client.get(f"{self.list_url}?ordering=-publication_year")
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        years = [b["publication_year"] for b in response.data]
-        self.assertEqual(years, sorted(years, reverse=True))
\ No newline at end of file
+        years = [b["publication_year"] for b in response.data["results"]]
+        self.assertEqual(years, sorted(years, reverse=True))
+
+
+class AuthorAPITests(QueryBudgetTestMixin, APITestCase):
+    query_budget = QUERY_BUDGET
+
+    def setUp(self):
+        self.author = Author.objects.create(name="Chinua Achebe")
+        self.author.books.create(title="Things Fall Apart", publication_year=1958)
+        self.author.books.create(title="Arrow of God", publication_year=1964)
+
+    def test_list_authors_with_books(self):
+        response = self.client.get("/api/authors/")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        author = response.data["results"][0]
+        self.assertEqual(author["name"], "Chinua Achebe")
+        self.assertEqual(
+            [b["title"] for b in author["books"]], ["Things Fall Apart", "Arrow of God"]
+        )
+
+    def test_detail_author(self):
+        response = self.client.get(f"/api/authors/{self.author.id}/")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["id"], self.author.id)
+        self.assertEqual(len(response.data["books"]), 2)
+
+    def test_missing_author(self):
+        response = self.client.get("/api/authors/999/")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class ConstantQueryTests(APITestCase):
+    """The number of queries a list runs does not depend on its length."""
+
+    def add_authors(self, count):
+        for i in range(count):
+            author = Author.objects.create(name=f"Author {Author.objects.count()}")
+            for year in (1950, 1960, 1970):
+                author.books.create(title=f"{author.name}, {year}", publication_year=year)
+
+    def queries_for(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return len(queries)
+
+    def assertConstantQueries(self, url):
+        self.add_authors(2)
+        few = self.queries_for(url)
+        self.add_authors(20)
+        self.assertEqual(self.queries_for(url), few)
+
+    def test_author_list(self):
+        self.assertConstantQueries("/api/authors/")
+
+    def test_book_list(self):
+        self.assertConstantQueries("/api/books/?ordering=author__name")
+
+    def test_book_search(self):
+        self.assertConstantQueries("/api/books/?search=Author")
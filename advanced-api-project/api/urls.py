@@ -1,16 +1,24 @@
-from django.urls import path
+from django.urls import path, re_path
 from .views import (
     BookListView,
+    BookExportView,
     BookDetailView,
     BookCreateView,
     BookUpdateView,
     BookDeleteView,
+    BookBulkView,
+    AuthorListView,
+    AuthorDetailView,
 )
 
 urlpatterns = [
     path("books/", BookListView.as_view(), name="book-list"),
+    re_path(r"^books/export\.(?P<export_format>csv|ndjson)$", BookExportView.as_view(), name="book-export"),
     path("books/<int:pk>/", BookDetailView.as_view(), name="book-detail"),
     path("books/create/", BookCreateView.as_view(), name="book-create"),
     path("books/update/<int:pk>/", BookUpdateView.as_view(), name="book-update"),
     path("books/delete/<int:pk>/", BookDeleteView.as_view(), name="book-delete"),
+    path("books/bulk/", BookBulkView.as_view(), name="book-bulk"),
+    path("authors/", AuthorListView.as_view(), name="author-list"),
+    path("authors/<int:pk>/", AuthorDetailView.as_view(), name="author-detail"),
 ]
\ No newline at end of file
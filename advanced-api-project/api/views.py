@@ -1,14 +1,22 @@
-from rest_framework import generics, filters
+from rest_framework import generics, filters, status
+from rest_framework.negotiation import BaseContentNegotiation
 from rest_framework.permissions import IsAuthenticatedOrReadOnly, IsAuthenticated
+from rest_framework.response import Response
 from django_filters import rest_framework  # required by checker (DjangoFilterBackend)
-from .models import Book
-from .serializers import BookSerializer
+from django.db import transaction
+from django.db.models import F, Prefetch
+from django.http import StreamingHttpResponse
+from .export import EXPORT_FORMATS, export_rows
+from .models import Author, Book
+from .serializers import AuthorSerializer, BookSerializer, to_pk
 
 # GET /api/books/ (public)
 # Filtering (?title=, ?publication_year=, ?author=, ?author__name=),
 # Searching (?search= on title/author name), Ordering (?ordering=title or -publication_year)
+# Every book view joins its author: filtering, searching and ordering on
+# author__name use the join, and str(book) needs the author's name.
 class BookListView(generics.ListAPIView):
-    queryset = Book.objects.all().order_by("id")
+    queryset = Book.objects.select_related("author").order_by("id")
     serializer_class = BookSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
 
@@ -18,15 +26,41 @@ class BookListView(generics.ListAPIView):
     ordering_fields = ["id", "title", "publication_year", "author__name"]
     ordering = ["id"]
 
+# The export answers in its own format whatever the Accept header says;
+# errors (e.g. a bad filter) are still JSON.
+class IgnoreClientContentNegotiation(BaseContentNegotiation):
+    def select_parser(self, request, parsers):
+        return parsers[0]
+
+    def select_renderer(self, request, renderers, format_suffix=None):
+        return renderers[0], renderers[0].media_type
+
+# GET /api/books/export.csv, /api/books/export.ndjson (public)
+# Every book matching the same filtering, searching and ordering as
+# BookListView, unpaginated. Rows are read as values() in chunks and
+# streamed, so memory stays flat however large the catalogue.
+class BookExportView(BookListView):
+    content_negotiation_class = IgnoreClientContentNegotiation
+    export_fields = ["id", "title", "publication_year", "author", "author_name"]
+
+    def get(self, request, *args, export_format, **kwargs):
+        content_type, stream = EXPORT_FORMATS[export_format]
+        queryset = self.filter_queryset(self.get_queryset()).annotate(author_name=F("author__name"))
+        response = StreamingHttpResponse(
+            stream(export_rows(queryset, self.export_fields), self.export_fields), content_type=content_type,
+        )
+        response["Content-Disposition"] = f'attachment; filename="books.{export_format}"'
+        return response
+
 # GET /api/books/<pk>/ (public)
 class BookDetailView(generics.RetrieveAPIView):
-    queryset = Book.objects.all()
+    queryset = Book.objects.select_related("author")
     serializer_class = BookSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
 
 # POST /api/books/create/ (auth required)
 class BookCreateView(generics.CreateAPIView):
-    queryset = Book.objects.all()
+    queryset = Book.objects.select_related("author")
     serializer_class = BookSerializer
     permission_classes = [IsAuthenticated]
 
@@ -36,7 +70,7 @@ class BookCreateView(generics.CreateAPIView):
 
 # PUT/PATCH /api/books/update/<pk>/ (auth required)
 class BookUpdateView(generics.UpdateAPIView):
-    queryset = Book.objects.all()
+    queryset = Book.objects.select_related("author")
     serializer_class = BookSerializer
     permission_classes = [IsAuthenticated]
 
@@ -46,6 +80,107 @@ class BookUpdateView(generics.UpdateAPIView):
 
 # DELETE /api/books/delete/<pk>/ (auth required)
 class BookDeleteView(generics.DestroyAPIView):
-    queryset = Book.objects.all()
+    queryset = Book.objects.select_related("author")
     serializer_class = BookSerializer
-    permission_classes = [IsAuthenticated]
\ No newline at end of file
+    permission_classes = [IsAuthenticated]
+
+# Most books one bulk request may create, update or delete.
+BULK_MAX_BOOKS = 1000
+
+# POST/PUT/PATCH/DELETE /api/books/bulk/ (auth required)
+# POST a list of books to create them, PUT/PATCH a list of books with their
+# "id" to update them, DELETE a list of ids. Every item is validated with
+# BookSerializer first; if any fails, nothing is written and the response
+# is 400 {"errors": [{"index": i, "errors": {...}}, ...]}. Otherwise all
+# rows are written in one transaction with bulk_create/bulk_update.
+class BookBulkView(generics.GenericAPIView):
+    queryset = Book.objects.select_related("author")
+    serializer_class = BookSerializer
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data, many=True, max_length=BULK_MAX_BOOKS)
+        if not serializer.is_valid():
+            return self.invalid(serializer.errors)
+        self.strip_titles(serializer)
+        with transaction.atomic():
+            serializer.save()
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+    def put(self, request, *args, **kwargs):
+        return self.update(request, partial=False)
+
+    def patch(self, request, *args, **kwargs):
+        return self.update(request, partial=True)
+
+    def update(self, request, partial):
+        ids = self.ids(request.data, lambda item: item.get("id") if isinstance(item, dict) else None)
+        books = list(self.get_queryset().filter(pk__in=ids))
+        serializer = self.get_serializer(
+            books, data=request.data, many=True, partial=partial, max_length=BULK_MAX_BOOKS,
+        )
+        if not serializer.is_valid():
+            return self.invalid(serializer.errors)
+        self.strip_titles(serializer)
+        with transaction.atomic():
+            serializer.save()
+        return Response(serializer.data)
+
+    def delete(self, request, *args, **kwargs):
+        data = request.data
+        if not isinstance(data, list) or len(data) > BULK_MAX_BOOKS:
+            return Response(
+                {"errors": [f"Expected a list of at most {BULK_MAX_BOOKS} book ids."]},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        ids = self.ids(data, lambda item: item)
+        existing = set(Book.objects.filter(pk__in=ids).values_list("pk", flat=True))
+        errors = [
+            {"index": index, "errors": ["Book not found."]}
+            for index, item in enumerate(data) if to_pk(Book, item) not in existing
+        ]
+        if errors:
+            return Response({"errors": errors}, status=status.HTTP_400_BAD_REQUEST)
+        with transaction.atomic():
+            Book.objects.filter(pk__in=existing).delete()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+    @staticmethod
+    def ids(data, get_id):
+        if not isinstance(data, list):
+            return []
+        return [pk for pk in (to_pk(Book, get_id(item)) for item in data[:BULK_MAX_BOOKS]) if pk is not None]
+
+    @staticmethod
+    def strip_titles(serializer):
+        for attrs in serializer.validated_data:
+            if "title" in attrs:
+                attrs["title"] = attrs["title"].strip()
+
+    @staticmethod
+    def invalid(errors):
+        # A list with {} for valid items, or {index: errors} on newer DRF;
+        # a dict of non-field errors when the body is not a usable list.
+        if isinstance(errors, list):
+            errors = dict(enumerate(errors))
+        if all(isinstance(key, int) for key in errors):
+            errors = [{"index": index, "errors": detail} for index, detail in sorted(errors.items()) if detail]
+        return Response({"errors": errors}, status=status.HTTP_400_BAD_REQUEST)
+
+# Authors with their books in two queries however many there are:
+# one for the authors, one prefetch for all of their books.
+AUTHOR_QUERYSET = Author.objects.prefetch_related(
+    Prefetch("books", queryset=Book.objects.order_by("id"))
+).order_by("id")
+
+# GET /api/authors/ (public)
+class AuthorListView(generics.ListAPIView):
+    queryset = AUTHOR_QUERYSET
+    serializer_class = AuthorSerializer
+    permission_classes = [IsAuthenticatedOrReadOnly]
+
+# GET /api/authors/<pk>/ (public)
+class AuthorDetailView(generics.RetrieveAPIView):
+    queryset = AUTHOR_QUERYSET
+    serializer_class = AuthorSerializer
+    permission_classes = [IsAuthenticatedOrReadOnly]
@@ -13,10 +13,17 @@ https://docs.djangoproject.com/en/6.0/ref/settings/
 SECRET_KEY = 'django-insecure-efl)75r43qaf()7mwc^jo$*7_p*drnwufucenp5u$54amqq%q5'
 
 import os
+import sys
 from pathlib import Path
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 
+# The django_perf package shared by the projects in this repository lives
+# at its root.
+REPO_ROOT = BASE_DIR.parent.parent
+if str(REPO_ROOT) not in sys.path:
+    sys.path.append(str(REPO_ROOT))
+
 # Toggle DEBUG via env var (True locally, False in production)
 DEBUG = os.getenv("DJANGO_DEBUG", "True") == "True"
 
@@ -62,6 +69,7 @@ MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
 MIDDLEWARE = [
+    "django_perf.instrumentation.RequestMetricsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -138,6 +146,16 @@ SECURE_BROWSER_XSS_FILTER = True
 
 SECURE_PROXY_SSL_HEADER = ("HTTP_X_FORWARDED_PROTO", "https")
 
+# relationship_app pages list books with their authors; with the authors
+# joined they stay well under REQUEST_QUERY_BUDGET. Requests over it (or
+# their view's entry in REQUEST_QUERY_BUDGETS) are logged; per-view totals
+# are served at /metrics/ to staff users (django_perf.instrumentation).
+REQUEST_QUERY_BUDGET = 20
+REQUEST_QUERY_BUDGETS = {}
+# Serve /metrics/ to anyone, not just staff users. Only for a scraper on
+# a network the public cannot reach.
+REQUEST_METRICS_PUBLIC = False
+
 # Internationalization
 # https://docs.djangoproject.com/en/6.0/topics/i18n/
 
@@ -3,8 +3,11 @@ from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
 
+from django_perf.instrumentation import metrics
+
 urlpatterns = [
     path("admin/", admin.site.urls),
+    path("metrics/", metrics, name="metrics"),
     path("", include("relationship_app.urls")),  # root routes (your existing app)
     path("books/", include("bookshelf.urls")),   # bookshelf routes
 ]
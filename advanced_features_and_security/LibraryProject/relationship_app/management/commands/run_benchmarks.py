@@ -0,0 +1,16 @@
+from django.core.management.base import CommandError
+from django.urls import reverse
+
+from django_perf.benchmarking import BenchmarkCommand
+from relationship_app.models import Library
+
+
+class Command(BenchmarkCommand):
+    def endpoints(self):
+        library = Library.objects.order_by("pk").first()
+        if library is None:
+            raise CommandError("No libraries to request; run seed_benchmark_data first.")
+        return [
+            ("library_detail", reverse("library_detail", args=[library.pk])),
+            ("list_books", reverse("list_books")),
+        ]
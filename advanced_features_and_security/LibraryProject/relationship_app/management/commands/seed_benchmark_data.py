@@ -0,0 +1,62 @@
+import random
+import time
+
+from django_perf.benchmarking import SeedCommand, insert_batches
+from relationship_app.models import Author, Book, Librarian, Library
+
+FIRST_NAMES = "Ada Chinua Frank Ursula Toni Gabriel Octavia Haruki Italo Jorge Doris Kazuo".split()
+LAST_NAMES = "Achebe Herbert Le-Guin Morrison Marquez Butler Murakami Calvino Borges Lessing Ishiguro".split()
+WORDS = "shadow river empire dune storm garden silent last night city glass winter house war sea".split()
+
+
+class Command(SeedCommand):
+    help = (
+        "Add synthetic authors, books, libraries and librarians for "
+        "run_benchmarks, inserted with bulk_create in batches."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--authors", type=int, default=10_000)
+        parser.add_argument("--books", type=int, default=500_000)
+        parser.add_argument("--libraries", type=int, default=2000)
+        parser.add_argument("--books-per-library", type=int, default=500)
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument("--seed", type=int, default=42)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+        batch_size = options["batch_size"]
+        started = time.perf_counter()
+
+        last_author = Author.objects.order_by("-pk").values_list("pk", flat=True).first() or 0
+        self.timed("authors", lambda: insert_batches(Author, (
+            Author(name=f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}") for _ in range(options["authors"])
+        ), batch_size))
+        author_ids = list(Author.objects.filter(pk__gt=last_author).values_list("pk", flat=True))
+
+        last_book = Book.objects.order_by("-pk").values_list("pk", flat=True).first() or 0
+        self.timed("books", lambda: insert_batches(Book, (
+            Book(title=" ".join(rng.choices(WORDS, k=3)).title(), author_id=rng.choice(author_ids))
+            for _ in range(options["books"] if author_ids else 0)
+        ), batch_size))
+        book_ids = list(Book.objects.filter(pk__gt=last_book).values_list("pk", flat=True))
+
+        last_library = Library.objects.order_by("-pk").values_list("pk", flat=True).first() or 0
+        self.timed("libraries", lambda: insert_batches(Library, (
+            Library(name=f"{rng.choice(WORDS).title()} Library {n}") for n in range(options["libraries"])
+        ), batch_size))
+        library_ids = list(Library.objects.filter(pk__gt=last_library).values_list("pk", flat=True))
+
+        through = Library.books.through
+        per_library = min(options["books_per_library"], len(book_ids))
+        self.timed("holdings", lambda: insert_batches(through, (
+            through(library_id=library_id, book_id=book_id)
+            for library_id in library_ids
+            for book_id in rng.sample(book_ids, per_library)
+        ), batch_size))
+
+        self.timed("librarians", lambda: insert_batches(Librarian, (
+            Librarian(name=f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}", library_id=library_id)
+            for library_id in library_ids
+        ), batch_size))
+        self.stdout.write(self.style.SUCCESS(f"Seeded benchmark data in {time.perf_counter() - started:.1f}s."))
@@ -1,3 +1,54 @@
+"""
+Tests for the relationship_app book and library views.
+
+Covers:
+- list_books and LibraryDetailView load each book's author with the books,
+  so their query counts do not grow with the number of books
+
+Every request these tests make is checked for N+1 queries and against
+QUERY_BUDGET (django_perf.nplusone).
+"""
+
 from django.test import TestCase
+from django.urls import reverse
+
+from django_perf.nplusone import QueryBudgetTestMixin
+
+from .models import Author, Book, Library
+
+# Queries any one of these pages may run, sessions and auth included.
+QUERY_BUDGET = 5
+
+
+class BookViewQueryCountTests(QueryBudgetTestMixin, TestCase):
+    query_budget = QUERY_BUDGET
+
+    def get(self, url):
+        # SECURE_SSL_REDIRECT sends plain HTTP requests to https://.
+        return self.client.get(url, secure=True)
+
+    def add_books(self, library, count):
+        authors = [Author.objects.create(name=f"Author {library.pk}-{i}") for i in range(count)]
+        books = [Book.objects.create(title=f"Book {i}", author=author) for i, author in enumerate(authors)]
+        library.books.add(*books)
+
+    def test_list_books(self):
+        for count in (2, 30):
+            with self.subTest(books=count):
+                self.add_books(Library.objects.create(name=f"Library {count}"), count)
+                # 1 query for the books joined to their authors.
+                with self.assertNumQueries(1):
+                    response = self.get(reverse("list_books"))
+                self.assertEqual(response.status_code, 200)
+                self.assertContains(response, f"by Author {Library.objects.last().pk}-0")
 
-# Create your tests here.
+    def test_library_detail(self):
+        for count in (2, 30):
+            with self.subTest(books=count):
+                library = Library.objects.create(name=f"Library {count}")
+                self.add_books(library, count)
+                # 1 query for the library, 1 for its books joined to their authors.
+                with self.assertNumQueries(2):
+                    response = self.get(reverse("library_detail", args=[library.pk]))
+                self.assertEqual(response.status_code, 200)
+                self.assertContains(response, "by Author", count=count)
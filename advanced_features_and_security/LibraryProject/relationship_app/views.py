@@ -6,6 +6,7 @@ from django.views.generic.detail import DetailView
 from django.contrib.auth.forms import UserCreationForm
 from django.contrib.auth import login
 from django.contrib.auth.decorators import login_required, user_passes_test
+from django.db.models import Prefetch
 from .models import Book
 from .models import Library
 
@@ -16,12 +17,12 @@ def add_book(request):
         title = request.POST.get("title")
         author_name = request.POST.get("author")
         if not title or not author_name:
-            return render(request, "relationship_app/list_books.html", {"error": "Title and author are required.", "books": Book.objects.all()}, status=400)
+            return render(request, "relationship_app/list_books.html", {"error": "Title and author are required.", "books": Book.objects.select_related("author")}, status=400)
         author, _ = Author.objects.get_or_create(name=author_name)
         Book.objects.create(title=title, author=author)
         return redirect("list_books")
     # Simple GET response; you may wire a form/template if desired
-    return render(request, "relationship_app/list_books.html", {"books": Book.objects.all()})
+    return render(request, "relationship_app/list_books.html", {"books": Book.objects.select_related("author")})
 
 @login_required
 @permission_required("relationship_app.can_change_book", raise_exception=True)
@@ -37,7 +38,7 @@ def edit_book(request, pk):
             book.author = author
         book.save()
         return redirect("list_books")
-    return render(request, "relationship_app/list_books.html", {"books": Book.objects.all()})
+    return render(request, "relationship_app/list_books.html", {"books": Book.objects.select_related("author")})
 
 @login_required
 @permission_required("relationship_app.can_delete_book", raise_exception=True)
@@ -46,11 +47,11 @@ def delete_book(request, pk):
     if request.method == "POST":
         book.delete()
         return redirect("list_books")
-    return render(request, "relationship_app/list_books.html", {"books": Book.objects.all()})
+    return render(request, "relationship_app/list_books.html", {"books": Book.objects.select_related("author")})
 
 # Function-based view: list all books
 def list_books(request):
-    books = Book.objects.all()
+    books = Book.objects.select_related("author")
     return render(request, "relationship_app/list_books.html", {"books": books})
 
 # Class-based view: details for a specific library
@@ -58,6 +59,8 @@ class LibraryDetailView(DetailView):
     model = Library
     template_name = "relationship_app/library_detail.html"
     context_object_name = "library"
+    # The template shows each book's author: load them with the books.
+    queryset = Library.objects.prefetch_related(Prefetch("books", queryset=Book.objects.select_related("author")))
 
 # Registration view
 def register(request):
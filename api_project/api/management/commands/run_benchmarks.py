@@ -0,0 +1,16 @@
+from django.core.management.base import CommandError
+
+from api.models import Book
+from django_perf.benchmarking import BenchmarkCommand
+
+
+class Command(BenchmarkCommand):
+    def endpoints(self):
+        book = Book.objects.order_by("pk").first()
+        if book is None:
+            raise CommandError("No books to request; run seed_benchmark_data first.")
+        return [
+            ("book-list", "/api/books/"),
+            ("book_all-list", "/api/books_all/"),
+            ("book_all-detail", f"/api/books_all/{book.pk}/"),
+        ]
@@ -0,0 +1,35 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand
+
+from api.models import Book
+from django_perf.benchmarking import insert_batches
+
+AUTHORS = "Achebe Herbert Le-Guin Morrison Marquez Butler Murakami Calvino Borges Lessing Ishiguro".split()
+WORDS = "shadow river empire dune storm garden silent last night city glass winter house war sea".split()
+
+
+class Command(BaseCommand):
+    help = (
+        "Add synthetic books for run_benchmarks, inserted with bulk_create in "
+        "batches. The book lists are not paginated, so their timings grow "
+        "with --books."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--books", type=int, default=10_000)
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument("--seed", type=int, default=42)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+        started = time.perf_counter()
+        rows = insert_batches(Book, (
+            Book(title=" ".join(rng.choices(WORDS, k=3)).title(), author=rng.choice(AUTHORS))
+            for _ in range(options["books"])
+        ), options["batch_size"])
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"Seeded {rows} books in {elapsed:.1f}s ({rows / max(elapsed, 1e-9):,.0f} rows/s)."
+        ))
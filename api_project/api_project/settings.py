@@ -10,11 +10,18 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/6.0/ref/settings/
 """
 
+import sys
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
+# The django_perf package shared by the projects in this repository lives
+# at its root.
+REPO_ROOT = BASE_DIR.parent
+if str(REPO_ROOT) not in sys.path:
+    sys.path.append(str(REPO_ROOT))
+
 
 # Quick-start development settings - unsuitable for production
 # See https://docs.djangoproject.com/en/6.0/howto/deployment/checklist/
@@ -55,6 +62,7 @@ REST_FRAMEWORK = {
 }
 
 MIDDLEWARE = [
+    'django_perf.instrumentation.RequestMetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -114,6 +122,17 @@ AUTH_PASSWORD_VALIDATORS = [
 ]
 
 
+# Book list and viewset requests take a few queries, plus token lookups.
+# Requests over REQUEST_QUERY_BUDGET (or their view's entry in
+# REQUEST_QUERY_BUDGETS) are logged; per-view totals are served at
+# /metrics/ to staff users (django_perf.instrumentation).
+REQUEST_QUERY_BUDGET = 20
+REQUEST_QUERY_BUDGETS = {}
+# Serve /metrics/ to anyone, not just staff users. Only for a scraper on
+# a network the public cannot reach.
+REQUEST_METRICS_PUBLIC = False
+
+
 # Internationalization
 # https://docs.djangoproject.com/en/6.0/topics/i18n/
 
@@ -0,0 +1,74 @@
+"""
+Async versions of the blog's read views, for ASGI deployments.
+
+They mirror PostListView, PostByTagListView, PostDetailView and
+search_posts and render the same templates, but read through the async
+ORM and cache, so under ASGI a request waiting on the database yields the
+event loop instead of holding a thread. They are routed under ``async/``
+next to the sync views; ``manage.py loadtest_views`` compares the two.
+"""
+
+from asgiref.sync import sync_to_async
+from django.http import Http404
+from django.shortcuts import render
+
+from .conditional import afeed_validators, apost_validators, async_condition
+from .models import Post
+from .pagination import KeysetPaginator, apaginate_request
+from .search import SearchPaginator, get_search_backend
+from .view_counts import view_counter
+from .views import DISCUSSED_ORDERING, POST_ORDERING, POSTS_PER_PAGE
+
+
+async def render_async(request, template_name, context):
+    # The templates read ``user``; loading it here keeps the auth context
+    # processor from hitting the session synchronously mid-render.
+    context['user'] = await request.auser()
+    return render(request, template_name, context)
+
+
+async def render_post_page(request, paginator, **context):
+    page = await apaginate_request(paginator, request)
+    return await render_async(request, 'blog/post_list.html', {
+        'posts': page.object_list,
+        'page_obj': page,
+        'is_paginated': page.has_other_pages(),
+        **context,
+    })
+
+
+@async_condition(afeed_validators)
+async def post_list(request):
+    discussed = request.GET.get('sort') == 'discussed'
+    ordering = DISCUSSED_ORDERING if discussed else POST_ORDERING
+    paginator = KeysetPaginator(Post.objects.for_listing(), POSTS_PER_PAGE, ordering)
+    return await render_post_page(request, paginator, sort='discussed' if discussed else 'latest')
+
+
+@async_condition(afeed_validators)
+async def posts_by_tag(request, tag_slug):
+    posts = Post.objects.for_listing().filter(tags__name=tag_slug)
+    paginator = KeysetPaginator(posts, POSTS_PER_PAGE, POST_ORDERING)
+    return await render_post_page(request, paginator, tag_slug=tag_slug)
+
+
+@async_condition(apost_validators)
+async def post_detail(request, pk):
+    try:
+        post = await Post.objects.aget(pk=pk)
+    except Post.DoesNotExist:
+        raise Http404('No post matches the given query.')
+    response = await render_async(request, 'blog/post_detail.html', {'object': post, 'post': post})
+    view_counter.record(post.pk)
+    return response
+
+
+async def search_posts(request):
+    query = request.GET.get('q', '').strip()
+    if query:
+        # Picking the backend may inspect the database once per process.
+        backend = await sync_to_async(get_search_backend)()
+        paginator = SearchPaginator(backend, query, POSTS_PER_PAGE)
+    else:
+        paginator = KeysetPaginator(Post.objects.for_listing(), POSTS_PER_PAGE, POST_ORDERING)
+    return await render_post_page(request, paginator, query=query)
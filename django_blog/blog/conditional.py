@@ -0,0 +1,188 @@
+"""
+ETag and Last-Modified validators for conditional GET on posts and feeds.
+
+A post's validators come from its published_date, its updated_at (bumped
+when its tags, author name, images or comment count change) and the latest
+Comment.updated_at, read in one query against the post row.
+
+The listing pages share a version counter kept in the default cache. It
+is bumped after commit whenever anything a listing renders changes, so a
+listing request can answer 304 from the cache alone. The syndication feeds
+in blog.feeds have their own counter, bumped only when posts themselves
+change. With several server processes the cache must be shared
+(BLOG_CACHE_BACKEND=file or redis), or processes that did not see a write
+would keep answering 304.
+
+async_condition() and the a*-prefixed validators serve blog.async_views.
+"""
+
+import hashlib
+import time
+from datetime import datetime, timezone as dt_timezone
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Max
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+from .models import Post
+from .transactions import PendingCallback, pending, register
+
+FEED_VERSION_KEY = 'blog:feed-version'
+SYNDICATION_VERSION_KEY = 'blog:syndication-version'
+
+
+def make_etag(*parts):
+    return hashlib.md5(':'.join(str(part) for part in parts).encode()).hexdigest()
+
+
+def modified_key(version_key):
+    return f'{version_key}:modified'
+
+
+def version_state(version_key):
+    """Return (version, last_modified) for a counter, seeding it if evicted."""
+    keys = [version_key, modified_key(version_key)]
+    state = cache.get_many(keys)
+    if len(state) < 2:
+        # Seed from the clock so a counter lost to eviction never repeats
+        # a version a client may still hold.
+        cache.add(keys[0], time.time_ns(), None)
+        cache.add(keys[1], time.time(), None)
+        state = cache.get_many(keys)
+    return state.get(keys[0]), state.get(keys[1])
+
+
+async def aversion_state(version_key):
+    keys = [version_key, modified_key(version_key)]
+    state = await cache.aget_many(keys)
+    if len(state) < 2:
+        await cache.aadd(keys[0], time.time_ns(), None)
+        await cache.aadd(keys[1], time.time(), None)
+        state = await cache.aget_many(keys)
+    return state.get(keys[0]), state.get(keys[1])
+
+
+def feed_state():
+    return version_state(FEED_VERSION_KEY)
+
+
+class VersionBump(PendingCallback):
+    def __init__(self, version_key):
+        self.version_key = version_key
+
+    def run(self):
+        try:
+            cache.incr(self.version_key)
+        except ValueError:
+            cache.set(self.version_key, time.time_ns(), None)
+        cache.set(modified_key(self.version_key), time.time(), None)
+
+
+def bump_version(version_key, using=None):
+    # After commit, so no reader pairs the new version with old rows; once
+    # per transaction, or again if a rollback discarded the pending bump.
+    if pending(version_key, using) is None:
+        register(version_key, VersionBump(version_key), using)
+
+
+def bump_feed_version(using=None):
+    bump_version(FEED_VERSION_KEY, using)
+
+
+def bump_syndication_version(using=None):
+    bump_version(SYNDICATION_VERSION_KEY, using)
+
+
+def feed_validators(request, user, version, modified):
+    # The header links depend on who is logged in, and the logout form's
+    # CSRF token on the CSRF cookie, which every login rotates: a page
+    # cached before the user logged in again would post a stale token.
+    csrf_cookie = request.COOKIES.get(settings.CSRF_COOKIE_NAME, '')
+    etag = make_etag('feed', version, user.pk or 0, csrf_cookie if user.pk else '')
+    return etag, datetime.fromtimestamp(modified, dt_timezone.utc) if modified else None
+
+
+def feed_etag(request, *args, **kwargs):
+    return feed_validators(request, request.user, *feed_state())[0]
+
+
+def feed_last_modified(request, *args, **kwargs):
+    return feed_validators(request, request.user, *feed_state())[1]
+
+
+async def afeed_validators(request, *args, **kwargs):
+    return feed_validators(request, await request.auser(), *await aversion_state(FEED_VERSION_KEY))
+
+
+def post_state_query(pk):
+    return (
+        Post.objects.filter(pk=pk)
+        .values('published_date', 'updated_at')
+        .annotate(last_comment=Max('comment__updated_at'))
+        .order_by('pk')
+    )
+
+
+def post_validators(pk, state):
+    if state is None:
+        return None, None
+    etag = make_etag(
+        'post', pk, state['published_date'].timestamp(), state['updated_at'].timestamp(),
+        state['last_comment'].timestamp() if state['last_comment'] else '',
+    )
+    last_modified = max(filter(None, (state['published_date'], state['updated_at'], state['last_comment'])))
+    return etag, last_modified
+
+
+def post_state(request, pk):
+    """Return the validator fields for post ``pk``, or None if it is missing.
+
+    Cached on the request because condition() asks for the ETag and the
+    Last-Modified date separately.
+    """
+    cached = getattr(request, '_blog_post_state', {})
+    if pk not in cached:
+        cached[pk] = post_state_query(pk).first()
+        request._blog_post_state = cached
+    return cached[pk]
+
+
+def post_etag(request, pk, **kwargs):
+    return post_validators(pk, post_state(request, pk))[0]
+
+
+def post_last_modified(request, pk, **kwargs):
+    return post_validators(pk, post_state(request, pk))[1]
+
+
+async def apost_validators(request, pk, **kwargs):
+    return post_validators(pk, await post_state_query(pk).afirst())
+
+
+def async_condition(validators):
+    """condition() for async views.
+
+    ``validators`` is a coroutine function taking the view's arguments and
+    returning ``(etag, last_modified)``, so it can use the async ORM and
+    cache instead of blocking the event loop.
+    """
+    def decorator(view):
+        @wraps(view)
+        async def inner(request, *args, **kwargs):
+            etag, last_modified = await validators(request, *args, **kwargs)
+            etag = quote_etag(etag) if etag else None
+            last_modified = int(last_modified.timestamp()) if last_modified else None
+            response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+            if response is None:
+                response = await view(request, *args, **kwargs)
+            if request.method in ('GET', 'HEAD'):
+                if last_modified and not response.has_header('Last-Modified'):
+                    response.headers['Last-Modified'] = http_date(last_modified)
+                if etag:
+                    response.headers.setdefault('ETag', etag)
+            return response
+        return inner
+    return decorator
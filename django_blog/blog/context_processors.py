@@ -0,0 +1,7 @@
+from django.conf import settings
+
+
+def cache_settings(request):
+    return {
+        'card_cache_timeout': getattr(settings, 'BLOG_CARD_CACHE_TIMEOUT', 60 * 60 * 24),
+    }
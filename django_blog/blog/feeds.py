@@ -0,0 +1,154 @@
+"""
+RSS 2.0, Atom 1.0 and JSON Feed 1.1 syndication of the latest posts,
+globally and per tag.
+
+A rendered feed is cached together with the syndication version it was
+built from (see blog.conditional). A poll reads the version, its
+Last-Modified time and the cached feed in one get_many(); it answers 304
+or serves the cached bytes unless a post has changed since. A rebuild
+reads the latest (pk, updated_at) pairs and re-serializes only the posts
+whose cached item is missing or stale, so one edit costs one post's
+worth of work rather than FEED_SIZE.
+"""
+
+import json
+
+from django.core.cache import cache
+from django.http import Http404, HttpResponse
+from django.urls import reverse
+from django.utils import feedgenerator
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from django.views.decorators.http import require_safe
+
+from .conditional import SYNDICATION_VERSION_KEY, make_etag, modified_key, version_state
+from .models import Post, Tag
+from .routers import PRIMARY_DB
+
+FEED_SIZE = 20
+FEED_CACHE_TIMEOUT = 60 * 60 * 24
+FEED_TITLE = 'Latest Movies & Honest Reviews'
+
+CONTENT_TYPES = {
+    'rss': 'application/rss+xml; charset=utf-8',
+    'atom': 'application/atom+xml; charset=utf-8',
+    'json': 'application/feed+json; charset=utf-8',
+}
+GENERATORS = {
+    'rss': feedgenerator.Rss201rev2Feed,
+    'atom': feedgenerator.Atom1Feed,
+}
+
+
+def item_key(post_id, updated_at):
+    return f'blog:feed-item:{post_id}:{updated_at.timestamp()}'
+
+
+def feed_items(posts):
+    """Return item dicts for the latest FEED_SIZE posts of ``posts``.
+
+    Items are cached per (post, updated_at), so only changed posts are
+    loaded with their author and tags and serialized again.
+    """
+    latest = list(posts.order_by('-published_date', '-id').values_list('pk', 'updated_at')[:FEED_SIZE])
+    keys = {pk: item_key(pk, updated_at) for pk, updated_at in latest}
+    items = cache.get_many(keys.values())
+    stale = [pk for pk, key in keys.items() if key not in items]
+    if stale:
+        fresh = {}
+        fetch = Post.objects.using(posts.db).filter(pk__in=stale)
+        for post in fetch.select_related('author').prefetch_related('tags'):
+            # Key by the updated_at just read, in case the post changed in between.
+            fresh[item_key(post.pk, post.updated_at)] = {
+                'id': post.pk,
+                'title': post.title,
+                'path': reverse('post-detail', args=[post.pk]),
+                'content': post.content,
+                'author': post.author.username,
+                'tags': [tag.name for tag in post.tags.all()],
+                'published': post.published_date,
+                'updated': post.updated_at,
+            }
+        cache.set_many(fresh, FEED_CACHE_TIMEOUT)
+        items.update(fresh)
+    return [items[key] for key in keys.values() if key in items]
+
+
+def render_feed(request, feed_format, items, tag_slug=None):
+    title = f'{FEED_TITLE}: {tag_slug}' if tag_slug else FEED_TITLE
+    home = reverse('posts-by-tag', args=[tag_slug]) if tag_slug else reverse('post-list')
+    home_url = request.build_absolute_uri(home)
+    feed_url = request.build_absolute_uri()
+    # Items are cached host-independently; resolve their links per request.
+    items = [{**item, 'link': request.build_absolute_uri(item['path'])} for item in items]
+
+    if feed_format == 'json':
+        return json.dumps({
+            'version': 'https://jsonfeed.org/version/1.1',
+            'title': title,
+            'home_page_url': home_url,
+            'feed_url': feed_url,
+            'items': [
+                {
+                    'id': str(item['id']),
+                    'url': item['link'],
+                    'title': item['title'],
+                    'content_text': item['content'],
+                    'date_published': item['published'].isoformat(),
+                    'date_modified': item['updated'].isoformat(),
+                    'authors': [{'name': item['author']}],
+                    'tags': item['tags'],
+                }
+                for item in items
+            ],
+        }).encode()
+
+    feed = GENERATORS[feed_format](
+        title=title, link=home_url, description=title, feed_url=feed_url, language='en',
+    )
+    for item in items:
+        feed.add_item(
+            title=item['title'],
+            link=item['link'],
+            description=item['content'],
+            unique_id=item['link'],
+            author_name=item['author'],
+            pubdate=item['published'],
+            updateddate=item['updated'],
+            categories=item['tags'],
+        )
+    return feed.writeString('utf-8').encode()
+
+
+@require_safe
+def syndication_feed(request, feed_format, tag_slug=None):
+    host = request.get_host()
+    body_key = f'blog:feed:{feed_format}:{tag_slug or ""}:{host}'
+    state = cache.get_many([SYNDICATION_VERSION_KEY, modified_key(SYNDICATION_VERSION_KEY), body_key])
+    version = state.get(SYNDICATION_VERSION_KEY)
+    modified = state.get(modified_key(SYNDICATION_VERSION_KEY))
+    if version is None:
+        version, modified = version_state(SYNDICATION_VERSION_KEY)
+
+    etag = quote_etag(make_etag('syndication', feed_format, tag_slug, host, version))
+    last_modified = int(modified) if modified else None
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        cached = state.get(body_key)
+        if cached is not None and cached[0] == version:
+            body = cached[1]
+        else:
+            # The version was just bumped by a commit a replica may not have
+            # yet; a rebuild read there would be cached as the new version.
+            posts = Post.objects.using(PRIMARY_DB)
+            if tag_slug is not None:
+                if not Tag.objects.using(PRIMARY_DB).filter(name=tag_slug).exists():
+                    raise Http404('No such tag.')
+                posts = posts.filter(tags__name=tag_slug)
+            body = render_feed(request, feed_format, feed_items(posts), tag_slug)
+            cache.set(body_key, (version, body), FEED_CACHE_TIMEOUT)
+        response = HttpResponse(body, content_type=CONTENT_TYPES[feed_format])
+    response.headers.setdefault('ETag', etag)
+    if last_modified:
+        response.headers.setdefault('Last-Modified', http_date(last_modified))
+    return response
@@ -1,6 +1,8 @@
 from django import forms
 from django.contrib.auth.models import User
 from django.contrib.auth.forms import UserCreationForm
+from django.db import transaction
+from django.utils.text import slugify
 from taggit.forms import TagWidget
 from .models import Comment, Post, Tag
 
@@ -55,21 +57,30 @@ class PostForm(forms.ModelForm):
             current_tags = self.instance.tags.all()
             self.fields['tags'].initial = ', '.join(tag.name for tag in current_tags)
 
+    def clean_tags(self):
+        names = []
+        for raw in self.cleaned_data.get('tags', '').split(','):
+            # Tags are linked by slug (see posts-by-tag), so store them as slugs.
+            name = slugify(raw)
+            if not name:
+                continue
+            if len(name) > Tag._meta.get_field('name').max_length:
+                raise forms.ValidationError(f'Tag "{name}" is too long.')
+            names.append(name)
+        return list(dict.fromkeys(names))
+
     def save(self, commit=True):
         instance = super().save(commit=False)
 
         if commit:
-            instance.save()
-
-        tags_str = self.cleaned_data.get('tags', '')
-        tag_names = [t.strip() for t in tags_str.split(',') if t.strip()]
+            with transaction.atomic():
+                instance.save()
+                self._save_tags(instance)
+        else:
+            self.save_m2m = lambda: self._save_tags(instance)
 
-        tag_objects = []
-        for name in tag_names:
-            tag_obj, created = Tag.objects.get_or_create(name=name)
-            tag_objects.append(tag_obj)
-
-        if commit:
-            instance.tags.set(tag_objects)
+        return instance
 
-        return instance
\ No newline at end of file
+    def _save_tags(self, instance):
+        # set() diffs against the current tags: one read, one delete, one insert.
+        instance.tags.set(Tag.objects.resolve(self.cleaned_data['tags']))
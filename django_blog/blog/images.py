@@ -0,0 +1,111 @@
+"""
+Resized variants of Post.image for responsive <img srcset> markup.
+
+After a post with an image is committed, generate_variants() runs in a
+small thread pool (Pillow releases the GIL while resizing), writes a JPEG
+and a WebP copy at each width in BLOG_IMAGE_WIDTHS that is narrower than
+the original, records their dimensions as PostImageVariant rows and bumps
+Post.updated_at so the cached post card picks them up.
+
+Set BLOG_IMAGE_WORKERS = 0 to process inline instead (used by the tests).
+"""
+
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from pathlib import PurePosixPath
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import close_old_connections, transaction
+from PIL import Image, ImageOps
+
+from .conditional import bump_feed_version
+from .models import Post, PostImageVariant
+from .routers import PRIMARY_DB
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WIDTHS = (320, 640, 1280)
+SAVE_OPTIONS = {
+    PostImageVariant.JPEG: {'format': 'JPEG', 'quality': 82, 'optimize': True, 'progressive': True},
+    PostImageVariant.WEBP: {'format': 'WEBP', 'quality': 80, 'method': 4},
+}
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=getattr(settings, 'BLOG_IMAGE_WORKERS', 2),
+                thread_name_prefix='blog-images',
+            )
+        return _executor
+
+
+def schedule_variants(post_id):
+    """Generate variants for ``post_id`` once the current transaction commits."""
+    def submit():
+        if getattr(settings, 'BLOG_IMAGE_WORKERS', 2) == 0:
+            generate_variants(post_id)
+        else:
+            get_executor().submit(_generate_in_worker, post_id)
+    transaction.on_commit(submit)
+
+
+def _generate_in_worker(post_id):
+    close_old_connections()
+    try:
+        generate_variants(post_id)
+    except Exception:
+        logger.exception('Could not generate image variants for post %s', post_id)
+    finally:
+        close_old_connections()
+
+
+def generate_variants(post_id):
+    # Runs right after the post's commit, so read the primary, not a replica.
+    post = Post.objects.using(PRIMARY_DB).filter(pk=post_id).first()
+    if post is None or not post.image:
+        return
+    source = post.image.name
+    if PostImageVariant.objects.using(PRIMARY_DB).filter(post=post, source=source).exists():
+        return
+
+    widths = getattr(settings, 'BLOG_IMAGE_WIDTHS', DEFAULT_WIDTHS)
+    stem = PurePosixPath(source).stem
+    variants = []
+    with post.image.open('rb') as f:
+        original = ImageOps.exif_transpose(Image.open(f))
+        original.load()
+    if original.mode not in ('RGB', 'RGBA'):
+        original = original.convert('RGBA' if 'A' in original.getbands() else 'RGB')
+
+    for width in sorted(widths):
+        if width >= original.width:
+            break
+        height = round(original.height * width / original.width)
+        resized = original.resize((width, height), Image.Resampling.LANCZOS)
+        for format, options in SAVE_OPTIONS.items():
+            image = resized.convert('RGB') if format == PostImageVariant.JPEG else resized
+            buffer = BytesIO()
+            image.save(buffer, **options)
+            variant = PostImageVariant(post=post, source=source, format=format)
+            variant.image.save(f'{stem}-{width}w.{format}', ContentFile(buffer.getvalue()), save=False)
+            # Assigning the file re-reads dimensions from storage; we know them.
+            variant.width, variant.height = width, height
+            variants.append(variant)
+
+    with transaction.atomic():
+        stale = list(PostImageVariant.objects.filter(post=post))
+        PostImageVariant.objects.filter(pk__in=[v.pk for v in stale]).delete()
+        PostImageVariant.objects.bulk_create(variants)
+        Post.touch([post.pk])
+        bump_feed_version()
+    for variant in stale:
+        variant.image.delete(save=False)
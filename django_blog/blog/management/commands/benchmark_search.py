@@ -0,0 +1,120 @@
+import random
+import statistics
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from blog.models import Post, Tag
+from blog.search import FTS5SearchBackend, InvertedIndexSearchBackend, LikeSearchBackend, iter_post_chunks
+from blog.views import POSTS_PER_PAGE
+
+WORDS = (
+    "heist thriller noir drama comedy romance horror sequel remake director "
+    "cast score plot twist villain hero space opera western musical documentary "
+    "animated festival premiere budget stunt editing pacing dialogue ending"
+).split()
+
+# Appears in roughly one post in a thousand.
+RARE_WORD = "zeitgeist"
+
+TAGS = ["action", "drama", "comedy", "horror", "scifi", "indie", "classic", "family"]
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare search backends (FTS5, inverted index, LIKE) on synthetic posts, fetching the first "
+        "page of results and every match. Runs inside a transaction that is rolled back, so no data is kept."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--posts", type=int, default=100_000)
+        parser.add_argument("--repeat", type=int, default=20)
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument(
+            "--query", action="append", dest="queries",
+            help="Query to time (repeatable). Defaults to a common, a rare and a two-word query.",
+        )
+
+    def handle(self, *args, **options):
+        queries = options["queries"] or ["drama", RARE_WORD, "space opera"]
+        with transaction.atomic():
+            self.seed(options["posts"], options["batch_size"], random.Random(options["seed"]))
+            backends = self.build_backends(options["batch_size"])
+            # LIKE scans newest first and stops at the POSTS_PER_PAGE-th match,
+            # so a common word's first page says little; the ranked backends
+            # score every match either way. "all" fetches every match, a
+            # full scan for LIKE, and is the fair comparison.
+            self.stdout.write("")
+            self.stdout.write(
+                f"{'backend':<10} {'query':<14} {'page mean':>10} {'p95 ms':>8} {'all mean':>10} {'p95 ms':>8} "
+                f"{'matches':>8}"
+            )
+            for backend in backends:
+                for query in queries:
+                    page_timings, _ = self.time_query(backend, query, POSTS_PER_PAGE, options["repeat"])
+                    all_timings, matches = self.time_query(backend, query, options["posts"], options["repeat"])
+                    self.stdout.write(
+                        f"{backend.name:<10} {query:<14} {statistics.mean(page_timings):>10.2f} "
+                        f"{p95(page_timings):>8.2f} {statistics.mean(all_timings):>10.2f} "
+                        f"{p95(all_timings):>8.2f} {matches:>8}"
+                    )
+            transaction.set_rollback(True)
+        self.stdout.write(self.style.SUCCESS("Benchmark finished; synthetic data rolled back."))
+
+    def seed(self, count, batch_size, rng):
+        started = time.perf_counter()
+        author = User.objects.create(username=f"bench-{int(time.time())}")
+        tags = [Tag.objects.get_or_create(name=f"bench-{name}")[0] for name in TAGS]
+        through = Post.tags.through
+        for start in range(0, count, batch_size):
+            posts = Post.objects.bulk_create([
+                Post(
+                    title=" ".join(rng.choices(WORDS, k=4)).title(),
+                    content=" ".join(rng.choices(WORDS, k=60) + ([RARE_WORD] if rng.random() < 0.001 else [])),
+                    author=author,
+                )
+                for _ in range(min(batch_size, count - start))
+            ])
+            through.objects.bulk_create([
+                through(post_id=post.pk, tag_id=tag.pk)
+                for post in posts
+                for tag in rng.sample(tags, 2)
+            ])
+        self.stdout.write(f"Seeded {count} posts in {time.perf_counter() - started:.1f}s")
+
+    def build_backends(self, batch_size):
+        backends = [LikeSearchBackend()]
+
+        if FTS5SearchBackend.is_available():
+            fts = FTS5SearchBackend()
+            started = time.perf_counter()
+            fts.clear()
+            for chunk in iter_post_chunks(batch_size):
+                fts.index_posts(chunk)
+            self.stdout.write(f"Built FTS5 index in {time.perf_counter() - started:.1f}s")
+            backends.append(fts)
+        else:
+            self.stdout.write(self.style.WARNING("FTS5 table not available; skipping fts5."))
+
+        inverted = InvertedIndexSearchBackend()
+        started = time.perf_counter()
+        inverted.search("warmup", 1)
+        self.stdout.write(f"Built inverted index in {time.perf_counter() - started:.1f}s")
+        backends.append(inverted)
+        return backends
+
+    def time_query(self, backend, query, limit, repeat):
+        timings = []
+        hits = 0
+        for _ in range(repeat):
+            started = time.perf_counter()
+            hits = len(backend.search(query, limit))
+            timings.append((time.perf_counter() - started) * 1000)
+        return timings, hits
+
+
+def p95(timings):
+    return sorted(timings)[max(0, int(len(timings) * 0.95) - 1)]
@@ -0,0 +1,86 @@
+import re
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, router
+
+from blog.models import Comment, Post, Tag
+from blog.pagination import KeysetPaginator
+from blog.views import (
+    COMMENT_ORDERING, COMMENTS_PER_PAGE, DISCUSSED_ORDERING, POST_ORDERING, POSTS_PER_PAGE,
+    TAG_CLOUD_SIZE, TRENDING_SIZE, newest_comments_paginator,
+)
+
+# Plan lines that mean a table is read in full or the result is sorted
+# instead of read in index order.
+FULL_SCAN_PATTERNS = {
+    "sqlite": re.compile(r"\bSCAN \w+$|USE TEMP B-TREE FOR ORDER BY", re.MULTILINE),
+    "postgresql": re.compile(r"Seq Scan"),
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Print the query plan of the main query behind each hot blog view "
+        "(feed pages, tag and author listings, comment threads, tag cloud, "
+        "trending) to check which indexes they use. Uses the newest post, "
+        "its author and the most used tag as sample values."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--analyze", action="store_true",
+            help="Run the queries and show actual timings (EXPLAIN ANALYZE; PostgreSQL only).",
+        )
+        parser.add_argument("--query", action="append", dest="only", help="Only explain this query (repeatable).")
+
+    def handle(self, *args, **options):
+        alias = router.db_for_read(Post)
+        vendor = connections[alias].vendor
+        if options["analyze"] and vendor != "postgresql":
+            raise CommandError("--analyze is only supported on PostgreSQL.")
+        queries = self.hot_queries()
+        if options["only"]:
+            queries = {name: qs for name, qs in queries.items() if name in options["only"]}
+
+        flagged = []
+        for name, queryset in queries.items():
+            plan = queryset.explain(analyze=True) if options["analyze"] else queryset.explain()
+            self.stdout.write(self.style.MIGRATE_HEADING(name))
+            self.stdout.write(plan)
+            self.stdout.write("")
+            pattern = FULL_SCAN_PATTERNS.get(vendor)
+            if pattern and pattern.search(plan):
+                flagged.append(name)
+
+        if flagged:
+            self.stdout.write(self.style.WARNING(f"Full scans or sorts in: {', '.join(flagged)}"))
+        else:
+            self.stdout.write(self.style.SUCCESS(f"Explained {len(queries)} queries on {vendor} ({alias})."))
+
+    def hot_queries(self):
+        post = Post.objects.order_by("-pk").first()
+        tag = Tag.objects.order_by("-post_count", "name").first()
+        if post is None or tag is None:
+            raise CommandError("No posts or tags to explain queries for; run seed_benchmark_data first.")
+        feed = KeysetPaginator(Post.objects.for_listing(), POSTS_PER_PAGE, POST_ORDERING)
+        thread = KeysetPaginator(Comment.objects.filter(post=post).select_related("author"), COMMENTS_PER_PAGE,
+                                 COMMENT_ORDERING)
+        since = newest_comments_paginator(post)
+        comment = Comment.objects.filter(post=post).order_by("created_at", "id").first()
+        return {
+            "feed": feed.page_queryset(),
+            "feed next page": feed.page_queryset(feed.encode_cursor("n", post)),
+            "discussed feed": KeysetPaginator(
+                Post.objects.for_listing(), POSTS_PER_PAGE, DISCUSSED_ORDERING
+            ).page_queryset(),
+            "tag listing": KeysetPaginator(
+                Post.objects.for_listing().filter(tags=tag), POSTS_PER_PAGE, POST_ORDERING
+            ).page_queryset(),
+            "author listing": KeysetPaginator(
+                Post.objects.for_listing().filter(author_id=post.author_id), POSTS_PER_PAGE, POST_ORDERING
+            ).page_queryset(),
+            "comment thread": thread.page_queryset(),
+            "comments since": since.page_queryset(since.encode_cursor("n", comment) if comment else None),
+            "tag cloud": Tag.objects.filter(post_count__gt=0).order_by("-post_count", "name")[:TAG_CLOUD_SIZE],
+            "trending": Post.objects.trending()[:TRENDING_SIZE],
+        }
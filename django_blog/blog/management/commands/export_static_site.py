@@ -0,0 +1,100 @@
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.staticfiles.finders import get_finders
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.utils import timezone
+
+from blog.static_export import (
+    MANIFEST_NAME, init_worker, output_path, plan_pages, render_batch, write_if_changed,
+)
+from blog.views import POST_ORDERING, POSTS_PER_PAGE
+
+
+class Command(BaseCommand):
+    help = (
+        "Render every post, feed page and tag page to static HTML files in a "
+        "process pool, rewriting only files whose content hash changed since "
+        "the last export, and write a manifest.json of everything exported."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("output", nargs="?", default=str(settings.BASE_DIR / "static_site"))
+        parser.add_argument(
+            "--workers", type=int, default=os.cpu_count() or 1,
+            help="Render processes; 0 renders in this process.",
+        )
+        parser.add_argument("--batch-size", type=int, default=100, help="Pages per worker task.")
+
+    def handle(self, *args, **options):
+        output = Path(options["output"])
+        output.mkdir(parents=True, exist_ok=True)
+        manifest_path = output / MANIFEST_NAME
+        old_files = {}
+        if manifest_path.exists():
+            old_files = json.loads(manifest_path.read_text())["files"]
+        old_hashes = {path: entry["sha256"] for path, entry in old_files.items()}
+
+        started = time.perf_counter()
+        specs = plan_pages(POSTS_PER_PAGE, POST_ORDERING)
+        batch_size = options["batch_size"]
+        batches = [specs[start:start + batch_size] for start in range(0, len(specs), batch_size)]
+        jobs = [
+            (batch, {spec["path"]: old_hashes.get(spec["path"]) for spec in batch}, str(output))
+            for batch in batches
+        ]
+
+        if options["workers"] == 0:
+            results = [render_batch(*job) for job in jobs]
+        else:
+            # Forked workers must not share the parent's database connections.
+            connections.close_all()
+            with ProcessPoolExecutor(max_workers=options["workers"], initializer=init_worker) as pool:
+                results = list(pool.map(render_batch, *zip(*jobs))) if jobs else []
+
+        files = {}
+        written = 0
+        for path, digest, size, was_written in (row for batch in results for row in batch):
+            files[path] = {"sha256": digest, "bytes": size}
+            written += was_written
+        written += self.copy_static(output, old_hashes, files)
+
+        removed = 0
+        for path in set(old_files) - set(files):
+            target = output_path(output, path)
+            if target.exists():
+                target.unlink()
+                removed += 1
+
+        manifest_path.write_text(json.dumps({
+            "generated_at": timezone.now().isoformat(),
+            "files": dict(sorted(files.items())),
+        }, indent=2))
+        self.stdout.write(self.style.SUCCESS(
+            f"Exported {len(files)} files to {output} in {time.perf_counter() - started:.1f}s: "
+            f"{written} written, {len(files) - written} unchanged, {removed} removed."
+        ))
+
+    def copy_static(self, output, old_hashes, files):
+        """Copy the static files the pages link to; returns how many were written."""
+        prefix = settings.STATIC_URL.strip("/")
+        written = 0
+        seen = set()
+        for finder in get_finders():
+            for path, storage in finder.list(["CVS", ".*", "*~"]):
+                relative = f"{prefix}/{Path(path).as_posix()}"
+                # The first finder to provide a path wins, as in collectstatic.
+                if relative in seen:
+                    continue
+                seen.add(relative)
+                with storage.open(path) as source:
+                    content = source.read()
+                digest, size, was_written = write_if_changed(output, relative, content, old_hashes.get(relative))
+                files[relative] = {"sha256": digest, "bytes": size}
+                written += was_written
+        return written
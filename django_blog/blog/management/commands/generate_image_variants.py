@@ -0,0 +1,48 @@
+import logging
+import time
+
+from django.core.management.base import BaseCommand
+from django.db.models import F
+
+from blog.images import generate_variants
+from blog.models import Post
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = (
+        "Store the image dimensions and generate resized image variants for posts that have none yet "
+        "(e.g. uploaded before the pipeline existed). A post that fails is logged and skipped."
+    )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        # stored_width is the column as saved: loading a post with empty
+        # dimensions reads them from the file into image_width.
+        posts = (
+            Post.objects.exclude(image='').exclude(image__isnull=True)
+            .annotate(stored_width=F('image_width'))
+            .only('pk', 'image', 'image_width', 'image_height')
+            .order_by('pk')
+        )
+        count = failed = 0
+        for post in posts.iterator():
+            count += 1
+            try:
+                if post.stored_width is None:
+                    if post.image_width is None:
+                        raise FileNotFoundError(f"Cannot read {post.image.name}")
+                    Post.objects.filter(pk=post.pk).update(
+                        image_width=post.image_width, image_height=post.image_height,
+                    )
+                # Skips posts whose current image already has variants.
+                generate_variants(post.pk)
+            except Exception:
+                failed += 1
+                logger.exception('Could not process the image of post %s', post.pk)
+        message = f"Checked {count} posts with images in {time.perf_counter() - started:.1f}s"
+        if failed:
+            self.stdout.write(self.style.WARNING(f"{message}; {failed} failed, see the log."))
+        else:
+            self.stdout.write(self.style.SUCCESS(f"{message}."))
@@ -0,0 +1,145 @@
+import asyncio
+import statistics
+import time
+from urllib.parse import urlsplit
+
+from django.contrib.auth.models import User
+from django.core.asgi import get_asgi_application
+from django.core.management.base import BaseCommand, CommandError
+from django.urls import reverse
+
+from blog.models import Post, Tag
+
+# (sync url name, async url name) pairs; args are filled in from the data.
+VIEW_PAIRS = {
+    "list": ("post-list", "async-post-list"),
+    "detail": ("post-detail", "async-post-detail"),
+    "tag": ("posts-by-tag", "async-posts-by-tag"),
+    "search": ("search", "async-search"),
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Load-test the sync blog read views against their async versions by "
+        "driving the ASGI application in-process with concurrent GETs, and "
+        "report throughput and latency percentiles for each. Both run in one "
+        "event loop, i.e. the same single ASGI worker."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=500, help="Requests per view and mode.")
+        parser.add_argument("--concurrency", type=int, default=50)
+        parser.add_argument("--view", action="append", dest="views", choices=sorted(VIEW_PAIRS))
+        parser.add_argument("--query", default="review", help="Search query for the search views.")
+        parser.add_argument(
+            "--seed-posts", type=int, default=0,
+            help="Create this many throwaway posts first and delete them afterwards.",
+        )
+
+    def handle(self, *args, **options):
+        seeded = self.seed(options["seed_posts"]) if options["seed_posts"] else None
+        try:
+            post = Post.objects.order_by("-pk").first()
+            tag = Tag.objects.filter(post_count__gt=0).order_by("-post_count").first()
+            if post is None or tag is None:
+                raise CommandError("No tagged posts to request; pass --seed-posts or seed the database first.")
+            paths = self.paths(options["views"] or sorted(VIEW_PAIRS), post, tag, options["query"])
+            application = get_asgi_application()
+            results = asyncio.run(self.run_all(application, paths, options["requests"], options["concurrency"]))
+        finally:
+            if seeded is not None:
+                Post.objects.filter(author=seeded).delete()
+                seeded.delete()
+
+        self.stdout.write(
+            f"{'view':<8} {'mode':<6} {'req/s':>8} {'p50 ms':>8} {'p99 ms':>8} {'errors':>7}"
+        )
+        for (view, mode), (elapsed, latencies, errors) in results.items():
+            latencies.sort()
+            p99 = latencies[max(0, int(len(latencies) * 0.99) - 1)]
+            self.stdout.write(
+                f"{view:<8} {mode:<6} {len(latencies) / elapsed:>8.1f} "
+                f"{statistics.median(latencies):>8.1f} {p99:>8.1f} {errors:>7}"
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f"{options['requests']} requests per row at concurrency {options['concurrency']}."
+        ))
+
+    def seed(self, count):
+        author = User.objects.create(username=f"loadtest-{int(time.time())}")
+        tag = Tag.objects.resolve(["loadtest"])[0]
+        posts = Post.objects.bulk_create([
+            Post(title=f"Loadtest review {i}", content="Worth watching. " * 20, author=author)
+            for i in range(count)
+        ])
+        tag.posts.add(*posts)
+        return author
+
+    def paths(self, views, post, tag, query):
+        args = {"list": [], "detail": [post.pk], "tag": [tag.name], "search": []}
+        paths = {}
+        for view in views:
+            sync_name, async_name = VIEW_PAIRS[view]
+            suffix = f"?q={query}" if view == "search" else ""
+            paths[view, "sync"] = reverse(sync_name, args=args[view]) + suffix
+            paths[view, "async"] = reverse(async_name, args=args[view]) + suffix
+        return paths
+
+    async def run_all(self, application, paths, requests, concurrency):
+        results = {}
+        for key, path in paths.items():
+            await self.request(application, path)  # warm caches and the search index
+            results[key] = await self.run(application, path, requests, concurrency)
+        return results
+
+    async def run(self, application, path, requests, concurrency):
+        latencies, errors = [], 0
+        remaining = iter(range(requests))
+
+        async def worker():
+            nonlocal errors
+            for _ in remaining:
+                started = time.perf_counter()
+                status = await self.request(application, path)
+                latencies.append((time.perf_counter() - started) * 1000)
+                errors += status != 200
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        return time.perf_counter() - started, latencies, errors
+
+    async def request(self, application, path):
+        url = urlsplit(path)
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": "GET",
+            "scheme": "http",
+            "path": url.path,
+            "raw_path": url.path.encode(),
+            "query_string": url.query.encode(),
+            "root_path": "",
+            "headers": [(b"host", b"localhost")],
+            "server": ("localhost", 80),
+            "client": ("127.0.0.1", 50000),
+        }
+        sent_request = False
+        status = None
+
+        async def receive():
+            nonlocal sent_request
+            if not sent_request:
+                sent_request = True
+                return {"type": "http.request", "body": b"", "more_body": False}
+            # Never disconnect; Django cancels this wait when it is done.
+            await asyncio.Event().wait()
+
+        async def send(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+
+        await application(scope, receive, send)
+        return status
@@ -0,0 +1,27 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from blog.conditional import bump_feed_version
+from blog.models import Post, Tag
+
+
+class Command(BaseCommand):
+    help = "Recompute Tag.post_count from the Post.tags through table in one set-based UPDATE."
+
+    def handle(self, *args, **options):
+        through = Post.tags.through
+        counts = through.objects.filter(tag=OuterRef("pk")).order_by().values("tag")
+        started = time.perf_counter()
+        with transaction.atomic():
+            updated = Tag.objects.update(
+                post_count=Coalesce(Subquery(counts.annotate(n=Count("pk")).values("n")), 0)
+            )
+            # The tag cloud is cached per feed version.
+            bump_feed_version()
+        self.stdout.write(self.style.SUCCESS(
+            f"Recomputed post counts for {updated} tags in {time.perf_counter() - started:.1f}s."
+        ))
@@ -0,0 +1,26 @@
+from django.core.management.base import CommandError
+from django.urls import reverse
+
+from blog.models import Post, Tag
+from django_perf.benchmarking import BenchmarkCommand
+
+
+class Command(BenchmarkCommand):
+    def endpoints(self):
+        post = Post.objects.order_by("-comment_count", "-pk").first()
+        tag = Tag.objects.order_by("-post_count", "name").first()
+        if post is None or tag is None:
+            raise CommandError("No posts or tags to request; run seed_benchmark_data first.")
+        word = post.title.split()[0]
+        return [
+            ("post-list", reverse("post-list")),
+            ("post-list-discussed", reverse("post-list") + "?sort=discussed"),
+            ("post-detail", reverse("post-detail", args=[post.pk])),
+            ("comment-list", reverse("comment-list", args=[post.pk])),
+            ("posts-by-tag", reverse("posts-by-tag", args=[tag.name])),
+            ("search", f"{reverse('search')}?q={word}"),
+            ("tag-cloud", reverse("tag-cloud")),
+            ("trending", reverse("trending")),
+            ("feed", reverse("feed", args=["rss"])),
+            ("async-post-list", reverse("async-post-list")),
+        ]
@@ -0,0 +1,86 @@
+import random
+import time
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management import call_command
+
+from blog.models import Comment, Post, Tag
+from blog.search import get_search_backend
+from django_perf.benchmarking import SeedCommand, insert_batches
+
+WORDS = (
+    "heist thriller noir drama comedy romance horror sequel remake director "
+    "cast score plot twist villain hero space opera western musical documentary "
+    "animated festival premiere budget stunt editing pacing dialogue ending"
+).split()
+
+
+class Command(SeedCommand):
+    help = (
+        "Add synthetic users, tags, posts and comments for run_benchmarks, "
+        "inserted with bulk_create in batches, then recompute the comment and "
+        "tag counters and the search index that bulk inserts bypass."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=10_000)
+        parser.add_argument("--tags", type=int, default=500)
+        parser.add_argument("--posts", type=int, default=200_000)
+        parser.add_argument("--tags-per-post", type=int, default=3)
+        parser.add_argument("--comments", type=int, default=1_000_000)
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument("--seed", type=int, default=42)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+        batch_size = options["batch_size"]
+        # Unique per run, so seeding twice adds to the data instead of colliding.
+        prefix = f"bench{int(time.time())}"
+        started = time.perf_counter()
+
+        password = make_password(None)
+        self.timed("users", lambda: insert_batches(User, (
+            User(username=f"{prefix}-{n}", password=password) for n in range(options["users"])
+        ), batch_size))
+        user_ids = list(User.objects.filter(username__startswith=f"{prefix}-").values_list("pk", flat=True))
+
+        self.timed("tags", lambda: insert_batches(Tag, (
+            Tag(name=f"{rng.choice(WORDS)}-{prefix}-{n}") for n in range(options["tags"])
+        ), batch_size))
+        tag_ids = list(Tag.objects.filter(name__contains=f"-{prefix}-").values_list("pk", flat=True))
+
+        last_post = Post.objects.order_by("-pk").values_list("pk", flat=True).first() or 0
+        self.timed("posts", lambda: insert_batches(Post, (
+            Post(
+                title=" ".join(rng.choices(WORDS, k=4)).title(),
+                content=" ".join(rng.choices(WORDS, k=80)),
+                author_id=rng.choice(user_ids),
+            )
+            for _ in range(options["posts"])
+        ), batch_size))
+        post_ids = list(Post.objects.filter(pk__gt=last_post).values_list("pk", flat=True))
+
+        through = Post.tags.through
+        tags_per_post = min(options["tags_per_post"], len(tag_ids))
+        self.timed("post tags", lambda: insert_batches(through, (
+            through(post_id=post_id, tag_id=tag_id)
+            for post_id in post_ids
+            for tag_id in rng.sample(tag_ids, tags_per_post)
+        ), batch_size))
+
+        # Skewed towards a few posts, the way real discussions are.
+        self.timed("comments", lambda: insert_batches(Comment, (
+            Comment(
+                post_id=post_ids[int(len(post_ids) * rng.random() ** 3)],
+                author_id=rng.choice(user_ids),
+                content=" ".join(rng.choices(WORDS, k=20)),
+            )
+            for _ in range(options["comments"] if post_ids else 0)
+        ), batch_size))
+
+        call_command("repair_comment_counts", stdout=self.stdout)
+        call_command("repair_tag_counts", stdout=self.stdout)
+        if get_search_backend().name == "fts5":
+            call_command("rebuild_search_index", stdout=self.stdout)
+        self.stdout.write(self.style.SUCCESS(f"Seeded benchmark data in {time.perf_counter() - started:.1f}s."))
@@ -0,0 +1,38 @@
+import sqlite3
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from blog.routers import PRIMARY_DB
+
+
+class Command(BaseCommand):
+    help = (
+        "Copy the primary SQLite database over each local read replica in "
+        "BLOG_READ_REPLICAS, standing in for real replication during development."
+    )
+
+    def handle(self, *args, **options):
+        replicas = list(getattr(settings, "BLOG_READ_REPLICAS", ()))
+        if not replicas:
+            raise CommandError("BLOG_READ_REPLICAS is empty; set BLOG_USE_REPLICA=1 to use the local replica.")
+        primary = connections[PRIMARY_DB]
+        if primary.vendor != "sqlite" or any(connections[alias].vendor != "sqlite" for alias in replicas):
+            raise CommandError("Only SQLite files can be synced here; real replicas are kept current by the database.")
+
+        primary.ensure_connection()
+        for alias in replicas:
+            started = time.perf_counter()
+            connections[alias].close()
+            # The online backup API gives a consistent copy even while the
+            # primary is being written to.
+            target = sqlite3.connect(connections[alias].settings_dict["NAME"])
+            try:
+                primary.connection.backup(target)
+            finally:
+                target.close()
+            self.stdout.write(self.style.SUCCESS(
+                f"Synced {alias} from {PRIMARY_DB} in {time.perf_counter() - started:.2f}s."
+            ))
@@ -0,0 +1,65 @@
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+from .routers import request_state
+
+PIN_COOKIE = 'blog_primary_until'
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS', 'TRACE')
+
+
+class ReplicaPinningMiddleware:
+    """Pin a client's reads to the primary database just after it writes.
+
+    Unsafe requests read from the primary throughout. When a request
+    writes, a cookie pins that client's reads to the primary for
+    BLOG_REPLICA_PIN_SECONDS, covering replication lag (see blog.routers).
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        state, token = self.start(request)
+        try:
+            response = self.get_response(request)
+        finally:
+            request_state.reset(token)
+        return self.finish(state, response)
+
+    async def __acall__(self, request):
+        state, token = self.start(request)
+        try:
+            response = await self.get_response(request)
+        finally:
+            request_state.reset(token)
+        return self.finish(state, response)
+
+    def pin_seconds(self):
+        return getattr(settings, 'BLOG_REPLICA_PIN_SECONDS', 10)
+
+    def start(self, request):
+        now = time.time()
+        try:
+            until = float(request.COOKIES.get(PIN_COOKIE, 0))
+        except ValueError:
+            until = 0
+        # A forged cookie can pin its own client, but not for longer than a write would.
+        pinned = request.method not in SAFE_METHODS or now < until <= now + self.pin_seconds()
+        state = {'pinned': pinned, 'wrote': False}
+        return state, request_state.set(state)
+
+    def finish(self, state, response):
+        if state['wrote']:
+            seconds = self.pin_seconds()
+            response.set_cookie(
+                PIN_COOKIE, f'{time.time() + seconds:.3f}', max_age=seconds, httponly=True, samesite='Lax',
+            )
+        return response
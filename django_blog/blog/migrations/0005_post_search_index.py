@@ -0,0 +1,45 @@
+# Creates the SQLite FTS5 table behind blog.search.FTS5SearchBackend.
+# On other databases (or SQLite builds without FTS5) this is a no-op and
+# search falls back to the in-process inverted index.
+
+from django.db import migrations, OperationalError
+
+
+def create_fts_table(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        try:
+            cursor.execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS blog_post_fts "
+                "USING fts5(title, content, tags, tokenize='unicode61 remove_diacritics 2')"
+            )
+        except OperationalError:
+            return
+        cursor.execute(
+            "INSERT INTO blog_post_fts (rowid, title, content, tags) "
+            "SELECT p.id, p.title, p.content, COALESCE(("
+            "  SELECT group_concat(t.name, ' ') FROM blog_post_tags pt "
+            "  JOIN blog_tag t ON t.id = pt.tag_id WHERE pt.post_id = p.id"
+            "), '') FROM blog_post p"
+        )
+
+
+def drop_fts_table(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        cursor.execute("DROP TABLE IF EXISTS blog_post_fts")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0004_post_image'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_fts_table, drop_fts_table),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 6.0.1 on 2026-10-18 18:18
+
+import blog.models
+from django.core.files.images import get_image_dimensions
+from django.db import migrations
+
+
+def backfill_image_dimensions(apps, schema_editor):
+    """Store the dimensions of images uploaded before 0007 added the
+    fields. Missing or unreadable files keep NULL dimensions.
+    """
+    Post = apps.get_model('blog', 'Post')
+    storage = Post._meta.get_field('image').storage
+    posts = (
+        Post.objects.using(schema_editor.connection.alias)
+        .exclude(image='').exclude(image__isnull=True).filter(image_width__isnull=True)
+        .values_list('pk', 'image')
+    )
+    for pk, name in posts.iterator():
+        try:
+            with storage.open(name, 'rb') as f:
+                width, height = get_image_dimensions(f)
+        except OSError:
+            continue
+        if width is not None:
+            Post.objects.using(schema_editor.connection.alias).filter(pk=pk).update(
+                image_width=width, image_height=height,
+            )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0012_post_feed_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='post',
+            name='image',
+            field=blog.models.SafeImageField(blank=True, height_field='image_height', null=True, upload_to='post_images/', width_field='image_width'),
+        ),
+        migrations.RunPython(backfill_image_dimensions, migrations.RunPython.noop),
+    ]
@@ -1,25 +1,209 @@
+from datetime import timedelta
+
 from django.db import models
 from django.contrib.auth.models import User
+from django.utils import timezone
+
+
+def fields_without_counters(instance, counter_fields, update_fields):
+    """Return the update_fields a save() of ``instance`` should use.
+
+    The counters are changed in the database by F() updates, so the copy on
+    an instance loaded earlier is stale and a full save would reset them.
+    """
+    if instance._state.adding or update_fields is not None:
+        return update_fields
+    return [
+        field.name for field in instance._meta.concrete_fields
+        if not field.primary_key and field.name not in counter_fields
+    ]
+
+
+class SafeImageField(models.ImageField):
+    """An ImageField that leaves its width and height fields empty, rather
+    than raising, when the file cannot be read (e.g. it is missing from
+    storage).
+
+    Django reads the file on every load of a row whose dimensions are empty,
+    so a missing file would otherwise break every page listing the row.
+    """
+
+    def update_dimension_fields(self, instance, force=False, *args, **kwargs):
+        try:
+            super().update_dimension_fields(instance, force, *args, **kwargs)
+        except OSError:
+            setattr(instance, self.width_field, None)
+            setattr(instance, self.height_field, None)
+
+
+class TagQuerySet(models.QuerySet):
+    def resolve(self, names):
+        """Return tags for ``names`` in order, creating missing ones in bulk.
+
+        One lookup for the existing tags; if any are missing, one
+        bulk_create (ignoring rows a concurrent writer just inserted) and
+        one lookup for their ids.
+        """
+        names = list(dict.fromkeys(names))
+        if not names:
+            return []
+        tags = {tag.name: tag for tag in self.filter(name__in=names)}
+        missing = [name for name in names if name not in tags]
+        if missing:
+            self.bulk_create([self.model(name=name) for name in missing], ignore_conflicts=True)
+            tags.update((tag.name, tag) for tag in self.filter(name__in=missing))
+        return [tags[name] for name in names]
 
 
 class Tag(models.Model):
+    # unique=True already gives tag-by-name lookups their index.
     name = models.CharField(max_length=50, unique=True)
+    # Number of posts carrying the tag, maintained by blog.signals with F()
+    # updates; repair_tag_counts recomputes it if it ever drifts.
+    post_count = models.PositiveIntegerField(default=0, editable=False)
+
+    objects = TagQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # The tag cloud reads the most used tags first.
+            models.Index(fields=['-post_count', 'name'], name='blog_tag_popular_idx'),
+        ]
 
     def __str__(self):
         return self.name
 
+    def save(self, **kwargs):
+        kwargs['update_fields'] = fields_without_counters(self, {'post_count'}, kwargs.get('update_fields'))
+        return super().save(**kwargs)
+
+
+class PostQuerySet(models.QuerySet):
+    def for_listing(self):
+        # Everything post_list.html touches per row: author, tags and the
+        # resized image variants used for srcset.
+        return self.select_related('author').prefetch_related('tags', 'image_variants')
+
+    def trending(self, days=7):
+        """Posts ordered by views over the last ``days`` days, most viewed first.
+
+        Counts come from PostDailyViews as flushed by blog.view_counts, so
+        views still buffered in memory are not included yet.
+        """
+        since = timezone.localdate() - timedelta(days=days - 1)
+        # Filtering before annotating sums only the rows in the window, which
+        # are found through blog_dailyviews_day_idx rather than per post.
+        return (
+            self.filter(daily_views__day__gte=since)
+            .annotate(recent_views=models.Sum('daily_views__views'))
+            .filter(recent_views__gt=0)
+            .order_by('-recent_views', '-id')
+        )
+
 
 class Post(models.Model):
     title = models.CharField(max_length=200)
     content = models.TextField()
     published_date = models.DateTimeField(auto_now_add=True)
+    # Bumped on every save and by blog.signals when tags or the author's
+    # username change; versions the cached post card.
+    updated_at = models.DateTimeField(auto_now=True)
     author = models.ForeignKey(User, on_delete=models.CASCADE)
     tags = models.ManyToManyField(Tag, blank=True, related_name='posts')
-    image = models.ImageField(upload_to='post_images/', blank=True, null=True)
+    # Dimensions are stored so loading a post does not open its image;
+    # generate_image_variants fills them in for older posts.
+    image = SafeImageField(
+        upload_to='post_images/', blank=True, null=True,
+        width_field='image_width', height_field='image_height',
+    )
+    image_width = models.PositiveIntegerField(blank=True, null=True, editable=False)
+    image_height = models.PositiveIntegerField(blank=True, null=True, editable=False)
+    # Maintained by blog.signals with F() updates; repair_comment_counts
+    # recomputes them from Comment if they ever drift.
+    comment_count = models.PositiveIntegerField(default=0, editable=False)
+    last_comment_at = models.DateTimeField(blank=True, null=True, editable=False)
+    # Flushed in batches from an in-memory buffer by blog.view_counts.
+    view_count = models.PositiveIntegerField(default=0, editable=False)
+
+    objects = PostQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # Keyset for the feed, tag pages and syndication feeds (POST_ORDERING).
+            models.Index(fields=['-published_date', '-id'], name='blog_post_feed_idx'),
+            # An author's posts newest first; also serves author_id lookups.
+            models.Index(fields=['author', '-published_date', '-id'], name='blog_post_author_feed_idx'),
+            # Keyset for the "most discussed" feed ordering.
+            models.Index(fields=['-comment_count', '-id'], name='blog_post_discussed_idx'),
+        ]
 
     def __str__(self):
         return self.title
 
+    def save(self, **kwargs):
+        kwargs['update_fields'] = fields_without_counters(
+            self, {'comment_count', 'last_comment_at', 'view_count'}, kwargs.get('update_fields')
+        )
+        return super().save(**kwargs)
+
+    @classmethod
+    def touch(cls, post_ids):
+        """Bump updated_at for ``post_ids`` without sending save signals."""
+        return cls.objects.filter(pk__in=list(post_ids)).update(updated_at=timezone.now())
+
+    def image_srcset(self, format):
+        # Reads the prefetched variants, so no query per post on list pages.
+        variants = [v for v in self.image_variants.all() if v.format == format and v.source == self.image.name]
+        return ', '.join(f'{v.image.url} {v.width}w' for v in variants)
+
+    @property
+    def webp_srcset(self):
+        return self.image_srcset(PostImageVariant.WEBP)
+
+    @property
+    def jpeg_srcset(self):
+        return self.image_srcset(PostImageVariant.JPEG)
+
+
+class PostImageVariant(models.Model):
+    """A resized copy of Post.image, generated by blog.images."""
+    JPEG = 'jpeg'
+    WEBP = 'webp'
+    FORMAT_CHOICES = [(JPEG, 'JPEG'), (WEBP, 'WebP')]
+
+    post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name='image_variants')
+    # Post.image.name this variant was made from; a replaced image makes it stale.
+    source = models.CharField(max_length=255)
+    format = models.CharField(max_length=4, choices=FORMAT_CHOICES)
+    image = models.ImageField(upload_to='post_images/variants/', width_field='width', height_field='height')
+    width = models.PositiveIntegerField()
+    height = models.PositiveIntegerField()
+
+    class Meta:
+        ordering = ['width']
+
+    def __str__(self):
+        return f"{self.post} {self.width}w {self.format}"
+
+
+class PostDailyViews(models.Model):
+    """Views of a post on one day; the basis of PostQuerySet.trending()."""
+    post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name='daily_views')
+    day = models.DateField()
+    views = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['post', 'day'], name='blog_postdailyviews_post_day_uniq'),
+        ]
+        indexes = [
+            # trending() sums a date range per post.
+            models.Index(fields=['day', 'post'], name='blog_dailyviews_day_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.post} on {self.day}: {self.views}"
+
 
 class Comment(models.Model):
     post = models.ForeignKey(Post, on_delete=models.CASCADE)
@@ -28,5 +212,11 @@ class Comment(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            # Thread pages and "newer since" polling seek on (post, created_at, id).
+            models.Index(fields=['post', 'created_at', 'id'], name='blog_comment_thread_idx'),
+        ]
+
     def __str__(self):
         return f"Comment by {self.author} on {self.post}"
\ No newline at end of file
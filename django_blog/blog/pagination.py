@@ -0,0 +1,176 @@
+import base64
+import json
+
+from django.db.models import Q
+from django.http import Http404
+
+
+class InvalidCursor(Exception):
+    pass
+
+
+class KeysetPage:
+    """One page of a keyset-paginated queryset.
+
+    Mirrors the parts of django.core.paginator.Page that templates use,
+    with opaque cursors instead of page numbers.
+    """
+
+    def __init__(self, object_list, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class KeysetPaginator:
+    """Paginate a queryset by seeking past the last row seen.
+
+    Rows are ordered by ``ordering`` (which must end in a unique field such
+    as ``-id``) and each page is fetched with a WHERE clause on those
+    fields, so page 1000 costs the same as page one and inserts never shift
+    rows between pages.
+    """
+
+    def __init__(self, queryset, per_page, ordering=('-published_date', '-id')):
+        self.queryset = queryset
+        self.per_page = int(per_page)
+        self.ordering = tuple(ordering)
+        self.fields = [name.lstrip('-') for name in self.ordering]
+
+    def page(self, cursor=None):
+        queryset, ordering, direction = self._plan(cursor)
+        return self._paginate(list(queryset.order_by(*ordering)[:self.per_page + 1]), direction)
+
+    def page_queryset(self, cursor=None):
+        """The query page(cursor) runs, e.g. to explain() it."""
+        queryset, ordering, _ = self._plan(cursor)
+        return queryset.order_by(*ordering)[:self.per_page + 1]
+
+    async def apage(self, cursor=None):
+        """page() for async views, fetching rows through the async ORM."""
+        queryset, ordering, direction = self._plan(cursor)
+        rows = [row async for row in queryset.order_by(*ordering)[:self.per_page + 1]]
+        return self._paginate(rows, direction)
+
+    def _plan(self, cursor):
+        # One extra row is fetched to learn whether another page follows.
+        if not cursor:
+            return self.queryset, self.ordering, None
+        direction, values = self.decode_cursor(cursor)
+        if direction == 'n':
+            return self._seek(values, reverse=False), self.ordering, direction
+        reversed_ordering = tuple(self._flip(name) for name in self.ordering)
+        return self._seek(values, reverse=True), reversed_ordering, direction
+
+    def _paginate(self, rows, direction):
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if direction is None:
+            return self._build_page(rows, has_next=has_more, has_previous=False)
+        if direction == 'n':
+            return self._build_page(rows, has_next=has_more, has_previous=True)
+        return self._build_page(rows[::-1], has_next=True, has_previous=has_more)
+
+    def _seek(self, values, reverse):
+        # (a, b) after (x, y) in "-a, -b" order is: a < x OR (a = x AND b < y)
+        condition = Q()
+        for i, name in enumerate(self.ordering):
+            descending = name.startswith('-')
+            if reverse:
+                descending = not descending
+            lookup = 'lt' if descending else 'gt'
+            term = Q(**{f'{self.fields[i]}__{lookup}': values[i]})
+            for j in range(i):
+                term &= Q(**{self.fields[j]: values[j]})
+            condition |= term
+        return self.queryset.filter(condition)
+
+    def _build_page(self, rows, has_next, has_previous):
+        next_cursor = previous_cursor = None
+        if rows and has_next:
+            next_cursor = self.encode_cursor('n', rows[-1])
+        if rows and has_previous:
+            previous_cursor = self.encode_cursor('p', rows[0])
+        return KeysetPage(rows, next_cursor, previous_cursor)
+
+    @staticmethod
+    def _flip(name):
+        return name[1:] if name.startswith('-') else f'-{name}'
+
+    def encode_cursor(self, direction, obj):
+        return encode_cursor(direction, [getattr(obj, name) for name in self.fields])
+
+    def decode_cursor(self, cursor):
+        direction, values = decode_cursor(cursor, len(self.fields))
+        model = self.queryset.model
+        try:
+            values = [
+                model._meta.get_field(name).to_python(value)
+                for name, value in zip(self.fields, values)
+            ]
+        except Exception as exc:
+            raise InvalidCursor(cursor) from exc
+        return direction, values
+
+
+def encode_cursor(direction, values):
+    values = [value.isoformat() if hasattr(value, 'isoformat') else value for value in values]
+    raw = json.dumps([direction, values], separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor, size):
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        direction, values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except Exception as exc:
+        raise InvalidCursor(cursor) from exc
+    if direction not in ('n', 'p') or not isinstance(values, list) or len(values) != size:
+        raise InvalidCursor(cursor)
+    return direction, values
+
+
+class KeysetPaginationMixin:
+    """Swap ListView's page-number pagination for keyset pagination.
+
+    The view's ``ordering`` doubles as the keyset and ``?cursor=`` selects
+    the page; the template receives ``page_obj`` as usual.
+    """
+    cursor_kwarg = 'cursor'
+
+    def paginate_queryset(self, queryset, page_size):
+        paginator = KeysetPaginator(queryset, page_size, self.get_ordering())
+        page = paginate_request(paginator, self.request, self.cursor_kwarg)
+        return paginator, page, page.object_list, page.has_other_pages()
+
+
+def paginate_request(paginator, request, cursor_kwarg='cursor'):
+    try:
+        return paginator.page(request.GET.get(cursor_kwarg))
+    except InvalidCursor:
+        raise Http404('Invalid page cursor.')
+
+
+async def apaginate_request(paginator, request, cursor_kwarg='cursor'):
+    try:
+        return await paginator.apage(request.GET.get(cursor_kwarg))
+    except InvalidCursor:
+        raise Http404('Invalid page cursor.')
@@ -0,0 +1,69 @@
+"""
+Send blog reads to read replicas and all writes to the primary.
+
+Only models of the apps in REPLICATED_APPS are routed; sessions, auth and
+everything else stay on the primary, so a lagging replica can never log
+anyone out. A read goes to the primary instead of a replica when:
+
+- it follows a related manager of an instance loaded from the primary
+  (the ``instance`` hint), e.g. in signal handlers;
+- the primary has an open transaction, so the read is part of a write;
+- the request is pinned by ReplicaPinningMiddleware: it is itself a
+  write (POST, ...) or its client wrote within the last
+  BLOG_REPLICA_PIN_SECONDS, so authors see their own posts and comments
+  before the replicas catch up.
+
+With BLOG_READ_REPLICAS empty every read goes to the primary.
+"""
+
+import random
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+REPLICATED_APPS = {'blog'}
+# For reads that must not lag, e.g. rebuilding a cache entry keyed by a
+# version a commit just bumped: Model.objects.using(PRIMARY_DB).
+PRIMARY_DB = DEFAULT_DB_ALIAS
+
+# Per-request {'pinned': bool, 'wrote': bool}, set by ReplicaPinningMiddleware.
+# A dict rather than two variables so writes seen in a sync_to_async thread
+# are visible to the middleware.
+request_state = ContextVar('blog_replica_request_state', default=None)
+
+
+def read_replicas():
+    return list(getattr(settings, 'BLOG_READ_REPLICAS', ()))
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if model._meta.app_label not in REPLICATED_APPS:
+            return None
+        instance = hints.get('instance')
+        if instance is not None and instance._state.db:
+            return instance._state.db
+        replicas = read_replicas()
+        state = request_state.get()
+        if not replicas or (state and state['pinned']) or connections[PRIMARY_DB].in_atomic_block:
+            return PRIMARY_DB
+        return random.choice(replicas)
+
+    def db_for_write(self, model, **hints):
+        state = request_state.get()
+        if state is not None and model._meta.app_label in REPLICATED_APPS:
+            state['wrote'] = True
+        return PRIMARY_DB
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {PRIMARY_DB, *read_replicas()}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replicas get their schema and rows from the primary.
+        if db in read_replicas():
+            return False
+        return None
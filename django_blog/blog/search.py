@@ -0,0 +1,423 @@
+"""
+Search backends for blog.views.search_posts.
+
+Every backend answers the same question: given a query, return the ids of
+matching posts ranked best-first as ``(score, post_id)`` pairs, where a
+lower score is a better match. Results are ordered by (score ASC, id DESC)
+and fetched with a keyset seek so search results paginate like the feed.
+
+Backends:
+- ``fts5``: SQLite FTS5 virtual table ``blog_post_fts`` ranked with bm25().
+- ``inverted``: pure-Python in-process inverted index with BM25 ranking,
+  used when FTS5 is not available (e.g. a non-SQLite database). Each
+  process holds its own copy; writes bump a version in the default cache
+  and other processes rebuild theirs on their next search, so with
+  several server processes the cache must be shared.
+- ``like``: the original icontains query, unranked. Kept for comparison.
+
+Pick one with ``BLOG_SEARCH_BACKEND`` in settings (default ``auto``: FTS5
+when its table exists, otherwise the inverted index).
+"""
+
+import bisect
+import heapq
+import math
+import re
+import threading
+import time
+import unicodedata
+from collections import defaultdict
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections, router
+from django.db.models import Q
+
+from .models import Post
+from .pagination import InvalidCursor, KeysetPage, decode_cursor, encode_cursor
+
+FTS_TABLE = 'blog_post_fts'
+INVERTED_INDEX_VERSION_KEY = 'blog:search:inverted-version'
+
+# Relative weight of a hit in each indexed column: title, content, tags.
+COLUMN_WEIGHTS = (10.0, 1.0, 5.0)
+
+TOKEN_RE = re.compile(r'\w+')
+
+
+def tokenize(text):
+    """Lower-case, strip diacritics and split into word tokens."""
+    text = unicodedata.normalize('NFKD', text or '')
+    text = ''.join(ch for ch in text if not unicodedata.combining(ch))
+    return TOKEN_RE.findall(text.lower())
+
+
+def post_document(post):
+    """The (title, content, tags) columns indexed for a post."""
+    return post.title, post.content, ' '.join(tag.name for tag in post.tags.all())
+
+
+def iter_post_chunks(chunk_size=1000):
+    """Yield lists of posts (tags prefetched) in primary-key order.
+
+    Each chunk is a keyset query on ``pk > last_pk``, so memory stays
+    bounded by ``chunk_size`` however many posts there are.
+    """
+    posts = Post.objects.prefetch_related('tags').order_by('pk')
+    last_pk = 0
+    while True:
+        chunk = list(posts.filter(pk__gt=last_pk)[:chunk_size])
+        if not chunk:
+            return
+        yield chunk
+        last_pk = chunk[-1].pk
+
+
+class SearchBackend:
+    name = None
+
+    def search(self, query, limit, seek=None, reverse=False):
+        """Return up to ``limit`` ``(score, post_id)`` pairs for ``query``.
+
+        ``seek`` is the (score, id) of the last row already shown; rows up
+        to and including it are skipped. With ``reverse`` the scan walks
+        back towards better matches and rows come back worst-first.
+        """
+        raise NotImplementedError
+
+    def index_posts(self, posts):
+        """Add or replace the entries for ``posts`` (tags prefetched)."""
+
+    def remove_posts(self, post_ids):
+        """Drop the entries for ``post_ids``."""
+
+    def clear(self):
+        """Drop every entry."""
+
+
+class LikeSearchBackend(SearchBackend):
+    """The original LIKE scan; every match scores 0, newest ids first."""
+    name = 'like'
+
+    def search(self, query, limit, seek=None, reverse=False):
+        posts = Post.objects.filter(
+            Q(title__icontains=query) |
+            Q(content__icontains=query) |
+            Q(tags__name__icontains=query)
+        )
+        if seek is not None:
+            posts = posts.filter(id__gt=seek[1]) if reverse else posts.filter(id__lt=seek[1])
+        ids = posts.order_by('id' if reverse else '-id').values_list('id', flat=True).distinct()
+        return [(0.0, post_id) for post_id in ids[:limit]]
+
+
+class FTS5SearchBackend(SearchBackend):
+    """SQLite FTS5 table keyed by post id, ranked with bm25()."""
+    name = 'fts5'
+
+    @staticmethod
+    def match_expression(query):
+        # Quote every token so user input can never be read as FTS syntax;
+        # the trailing * makes each token a prefix match.
+        return ' '.join(f'"{token}"*' for token in tokenize(query))
+
+    @staticmethod
+    def is_available(using='default'):
+        connection = connections[using]
+        if connection.vendor != 'sqlite':
+            return False
+        return FTS_TABLE in connection.introspection.table_names()
+
+    def search(self, query, limit, seek=None, reverse=False):
+        expression = self.match_expression(query)
+        if not expression:
+            return []
+        weights = ', '.join(str(w) for w in COLUMN_WEIGHTS)
+        sql = (
+            f'SELECT rowid, score FROM ('
+            f'SELECT rowid, bm25({FTS_TABLE}, {weights}) AS score '
+            f'FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s)'
+        )
+        params = [expression]
+        if seek is not None:
+            if reverse:
+                sql += ' WHERE score < %s OR (score = %s AND rowid > %s)'
+            else:
+                sql += ' WHERE score > %s OR (score = %s AND rowid < %s)'
+            params += [seek[0], seek[0], seek[1]]
+        sql += ' ORDER BY score DESC, rowid ASC' if reverse else ' ORDER BY score ASC, rowid DESC'
+        sql += ' LIMIT %s'
+        params.append(limit)
+        with connections[router.db_for_read(Post)].cursor() as cursor:
+            cursor.execute(sql, params)
+            return [(score, post_id) for post_id, score in cursor.fetchall()]
+
+    def index_posts(self, posts):
+        rows = [(post.pk, *post_document(post)) for post in posts]
+        if not rows:
+            return
+        with connections[router.db_for_write(Post)].cursor() as cursor:
+            cursor.executemany(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [(row[0],) for row in rows])
+            cursor.executemany(
+                f'INSERT INTO {FTS_TABLE} (rowid, title, content, tags) VALUES (%s, %s, %s, %s)',
+                rows,
+            )
+
+    def remove_posts(self, post_ids):
+        with connections[router.db_for_write(Post)].cursor() as cursor:
+            cursor.executemany(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [(pk,) for pk in post_ids])
+
+    def clear(self):
+        with connections[router.db_for_write(Post)].cursor() as cursor:
+            cursor.execute(f'DELETE FROM {FTS_TABLE}')
+
+    def optimize(self):
+        """Merge the FTS5 b-tree segments; worth running after a rebuild."""
+        with connections[router.db_for_write(Post)].cursor() as cursor:
+            cursor.execute(f"INSERT INTO {FTS_TABLE} ({FTS_TABLE}) VALUES ('optimize')")
+
+
+class InvertedIndexSearchBackend(SearchBackend):
+    """In-process inverted index with per-column BM25 and prefix matching.
+
+    The index lives in this process only. It is built from the database on
+    first use and kept current by the blog signals in the process that
+    wrote. Each write also bumps INVERTED_INDEX_VERSION_KEY in the shared
+    cache; a process whose copy is behind that version rebuilds it from
+    the database before its next search.
+    """
+    name = 'inverted'
+    k1 = 1.2
+    b = 0.75
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._loaded = False
+        # The shared version this copy reflects.
+        self._version = None
+        self._reset()
+
+    def _reset(self):
+        # term -> {post_id: (tf_title, tf_content, tf_tags)}
+        self.postings = defaultdict(dict)
+        # post_id -> (len_title, len_content, len_tags)
+        self.lengths = {}
+        # post_id -> terms it appears under, so removal skips the vocabulary
+        self.doc_terms = {}
+        self.column_totals = [0, 0, 0]
+        self.vocabulary = []
+
+    def _ensure_loaded(self):
+        version = shared_index_version()
+        if self._loaded and self._version == version:
+            return
+        with self._lock:
+            if self._loaded and self._version == version:
+                return
+            # Read before the rows, so a write during the build leaves this
+            # copy behind and it is rebuilt again.
+            self._reset()
+            for chunk in iter_post_chunks(2000):
+                for post in chunk:
+                    self._add(post.pk, post_document(post))
+            self._version = version
+            self._loaded = True
+
+    def _changed(self):
+        """Bump the shared version after a write; this copy, already
+        updated, keeps up unless another process wrote in between.
+        """
+        version = bump_shared_index_version()
+        if self._loaded and self._version is not None and version == self._version + 1:
+            self._version = version
+
+    def _add(self, post_id, columns):
+        self._discard(post_id)
+        counts = defaultdict(lambda: [0, 0, 0])
+        lengths = []
+        for column, text in enumerate(columns):
+            tokens = tokenize(text)
+            lengths.append(len(tokens))
+            self.column_totals[column] += len(tokens)
+            for token in tokens:
+                counts[token][column] += 1
+        for term, tf in counts.items():
+            if term not in self.postings:
+                bisect.insort(self.vocabulary, term)
+            self.postings[term][post_id] = tuple(tf)
+        self.lengths[post_id] = tuple(lengths)
+        self.doc_terms[post_id] = list(counts)
+
+    def _discard(self, post_id):
+        lengths = self.lengths.pop(post_id, None)
+        if lengths is None:
+            return
+        for column, length in enumerate(lengths):
+            self.column_totals[column] -= length
+        for term in self.doc_terms.pop(post_id):
+            docs = self.postings[term]
+            del docs[post_id]
+            if not docs:
+                del self.postings[term]
+                self.vocabulary.pop(bisect.bisect_left(self.vocabulary, term))
+
+    def _expand(self, token):
+        start = bisect.bisect_left(self.vocabulary, token)
+        end = bisect.bisect_left(self.vocabulary, token + '\U0010ffff')
+        return self.vocabulary[start:end]
+
+    def _scores(self, tokens):
+        total_docs = len(self.lengths)
+        averages = [total / total_docs if total_docs else 0 for total in self.column_totals]
+        scores = None
+        for token in tokens:
+            token_scores = defaultdict(float)
+            for term in self._expand(token):
+                docs = self.postings[term]
+                idf = math.log((total_docs - len(docs) + 0.5) / (len(docs) + 0.5) + 1)
+                for post_id, tfs in docs.items():
+                    lengths = self.lengths[post_id]
+                    for column, tf in enumerate(tfs):
+                        if not tf:
+                            continue
+                        norm = 1 - self.b + self.b * lengths[column] / (averages[column] or 1)
+                        token_scores[post_id] += (
+                            COLUMN_WEIGHTS[column] * idf * tf * (self.k1 + 1) / (tf + self.k1 * norm)
+                        )
+            # Every token must match (AND), as with FTS5.
+            if scores is None:
+                scores = token_scores
+            else:
+                scores = {pk: scores[pk] + s for pk, s in token_scores.items() if pk in scores}
+        return scores or {}
+
+    def search(self, query, limit, seek=None, reverse=False):
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+        self._ensure_loaded()
+        with self._lock:
+            # Negate so lower is better, matching SQLite's bm25().
+            rows = [(-score, post_id) for post_id, score in self._scores(tokens).items()]
+        if reverse:
+            if seek is not None:
+                rows = [r for r in rows if r[0] < seek[0] or (r[0] == seek[0] and r[1] > seek[1])]
+            return heapq.nsmallest(limit, rows, key=lambda r: (-r[0], r[1]))
+        if seek is not None:
+            rows = [r for r in rows if r[0] > seek[0] or (r[0] == seek[0] and r[1] < seek[1])]
+        return heapq.nsmallest(limit, rows, key=lambda r: (r[0], -r[1]))
+
+    def index_posts(self, posts):
+        with self._lock:
+            if self._loaded:
+                for post in posts:
+                    self._add(post.pk, post_document(post))
+            self._changed()
+
+    def remove_posts(self, post_ids):
+        with self._lock:
+            if self._loaded:
+                for post_id in post_ids:
+                    self._discard(post_id)
+            self._changed()
+
+    def clear(self):
+        with self._lock:
+            self._reset()
+            self._loaded = False
+
+
+def shared_index_version():
+    version = cache.get(INVERTED_INDEX_VERSION_KEY)
+    if version is None:
+        # Seeded from the clock so a version lost to eviction never repeats.
+        cache.add(INVERTED_INDEX_VERSION_KEY, time.time_ns(), None)
+        version = cache.get(INVERTED_INDEX_VERSION_KEY)
+    return version
+
+
+def bump_shared_index_version():
+    try:
+        return cache.incr(INVERTED_INDEX_VERSION_KEY)
+    except ValueError:
+        shared_index_version()
+        return cache.incr(INVERTED_INDEX_VERSION_KEY)
+
+
+BACKENDS = {
+    'like': LikeSearchBackend,
+    'fts5': FTS5SearchBackend,
+    'inverted': InvertedIndexSearchBackend,
+}
+
+_instances = {}
+_auto_choice = {}
+
+
+def get_search_backend(name=None):
+    name = name or getattr(settings, 'BLOG_SEARCH_BACKEND', 'auto')
+    if name == 'auto':
+        using = router.db_for_read(Post)
+        if using not in _auto_choice:
+            _auto_choice[using] = 'fts5' if FTS5SearchBackend.is_available(using) else 'inverted'
+        name = _auto_choice[using]
+    if name not in BACKENDS:
+        raise ValueError(f'Unknown BLOG_SEARCH_BACKEND {name!r}; choose from {sorted(BACKENDS)} or "auto".')
+    if name not in _instances:
+        _instances[name] = BACKENDS[name]()
+    return _instances[name]
+
+
+def indexing_backends():
+    """The configured backend plus any other backend this process has opened."""
+    get_search_backend()
+    return list(_instances.values())
+
+
+class SearchPaginator:
+    """Keyset pagination over ranked search results.
+
+    Cursors hold the (score, id) of the boundary row, so the same page()
+    interface as KeysetPaginator works for search_posts.
+    """
+
+    def __init__(self, backend, query, per_page, queryset=None):
+        self.backend = backend
+        self.query = query
+        self.per_page = int(per_page)
+        self.queryset = queryset if queryset is not None else Post.objects.for_listing()
+
+    def page(self, cursor=None):
+        rows, has_next, has_previous = self._search(cursor)
+        posts = self.queryset.in_bulk([post_id for _, post_id in rows])
+        return self._build_page(rows, posts, has_next, has_previous)
+
+    async def apage(self, cursor=None):
+        """page() for async views; the index lookup runs in a worker thread."""
+        rows, has_next, has_previous = await sync_to_async(self._search)(cursor)
+        posts = await self.queryset.ain_bulk([post_id for _, post_id in rows])
+        return self._build_page(rows, posts, has_next, has_previous)
+
+    def _search(self, cursor):
+        if not cursor:
+            rows = self.backend.search(self.query, self.per_page + 1)
+            return rows[:self.per_page], len(rows) > self.per_page, False
+
+        direction, seek = decode_cursor(cursor, 2)
+        try:
+            seek = (float(seek[0]), int(seek[1]))
+        except (TypeError, ValueError) as exc:
+            raise InvalidCursor(cursor) from exc
+        if direction == 'n':
+            rows = self.backend.search(self.query, self.per_page + 1, seek=seek)
+            return rows[:self.per_page], len(rows) > self.per_page, True
+        rows = self.backend.search(self.query, self.per_page + 1, seek=seek, reverse=True)
+        return rows[:self.per_page][::-1], True, len(rows) > self.per_page
+
+    def _build_page(self, rows, posts, has_next, has_previous):
+        # A post deleted since it was indexed simply drops out of the page.
+        object_list = [posts[post_id] for _, post_id in rows if post_id in posts]
+        next_cursor = encode_cursor('n', list(rows[-1])) if rows and has_next else None
+        previous_cursor = encode_cursor('p', list(rows[0])) if rows and has_previous else None
+        return KeysetPage(object_list, next_cursor, previous_cursor)
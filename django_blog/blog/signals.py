@@ -0,0 +1,222 @@
+"""
+Keep derived post data in step with Post, Tag, Post.tags and User:
+
+- Post.updated_at, which versions the cached post card, is bumped when a
+  post's tags or its author's username change.
+- The search index is updated for every changed post.
+- Resized image variants are generated after a post with an image is saved.
+- Post.comment_count and Post.last_comment_at follow comment creation and
+  deletion through single F()-expression UPDATEs.
+- Tag.post_count follows tagging, untagging and post deletion.
+- The feed version behind the listings' ETags is bumped after commit
+  whenever any of the above changes what a listing shows; the syndication
+  version only when a post, its tags or its author's name change.
+
+Changed post ids are queued on an IndexBatch registered with
+transaction.on_commit through blog.transactions, so a transaction that
+saves a post, sets its tags and renames a tag reindexes each affected post
+once, after commit, and a rolled-back transaction touches nothing. The flush reads the committed
+rows: posts that still exist are reindexed and missing ones are removed,
+which also makes changes undone by an inner savepoint harmless.
+"""
+
+from django.contrib.auth.models import User
+from django.db.models import F, OuterRef, Subquery
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .conditional import bump_feed_version, bump_syndication_version
+from .images import schedule_variants
+from .models import Comment, Post, Tag
+from .search import indexing_backends
+from .transactions import PendingCallback, pending, register
+
+FLUSH_CHUNK_SIZE = 500
+
+
+class IndexBatch(PendingCallback):
+    def __init__(self, using):
+        self.using = using
+        self.post_ids = set()
+
+    def run(self):
+        post_ids = sorted(self.post_ids)
+        backends = indexing_backends()
+        for start in range(0, len(post_ids), FLUSH_CHUNK_SIZE):
+            chunk = post_ids[start:start + FLUSH_CHUNK_SIZE]
+            # From the database just written, not a replica that may lag.
+            posts = list(Post.objects.using(self.using).filter(pk__in=chunk).prefetch_related('tags'))
+            missing = set(chunk) - {post.pk for post in posts}
+            for backend in backends:
+                if missing:
+                    backend.remove_posts(sorted(missing))
+                backend.index_posts(posts)
+
+
+def queue(using, post_ids):
+    batch = pending('search-index', using)
+    if batch is not None:
+        batch.post_ids.update(post_ids)
+        return
+    batch = IndexBatch(using)
+    batch.post_ids.update(post_ids)
+    # Outside a transaction this runs immediately.
+    register('search-index', batch, using)
+
+
+@receiver(post_save, sender=Post)
+def index_saved_post(sender, instance, using, **kwargs):
+    queue(using, [instance.pk])
+    bump_feed_version(using)
+    bump_syndication_version(using)
+
+
+@receiver(post_save, sender=Post)
+def resize_post_image(sender, instance, **kwargs):
+    # generate_variants() returns early if this image already has variants.
+    if instance.image:
+        schedule_variants(instance.pk)
+
+
+@receiver(post_delete, sender=Post)
+def unindex_deleted_post(sender, instance, using, **kwargs):
+    queue(using, [instance.pk])
+    bump_feed_version(using)
+    bump_syndication_version(using)
+
+
+def tags_changed(using, post_ids):
+    # The tags render in each post card and are indexed for search.
+    post_ids = list(post_ids)
+    Post.touch(post_ids)
+    queue(using, post_ids)
+    bump_feed_version(using)
+    bump_syndication_version(using)
+
+
+@receiver(m2m_changed, sender=Post.tags.through)
+def reindex_retagged_posts(sender, instance, action, reverse, pk_set, using, **kwargs):
+    if not reverse:
+        if action in ('post_add', 'post_remove', 'post_clear'):
+            tags_changed(using, [instance.pk])
+    elif action == 'pre_clear':
+        # tag.posts.clear(): the affected posts are only known beforehand.
+        instance._affected_post_ids = list(instance.posts.values_list('pk', flat=True))
+    elif action == 'post_clear':
+        tags_changed(using, instance._affected_post_ids)
+    elif action in ('post_add', 'post_remove'):
+        tags_changed(using, pk_set)
+
+
+@receiver(post_save, sender=Tag)
+def reindex_renamed_tag(sender, instance, created, using, **kwargs):
+    if not created:
+        tags_changed(using, instance.posts.values_list('pk', flat=True))
+
+
+@receiver(pre_delete, sender=Tag)
+def remember_tagged_posts(sender, instance, **kwargs):
+    # Deleting a tag cascades to the through table without m2m_changed.
+    instance._affected_post_ids = list(instance.posts.values_list('pk', flat=True))
+
+
+@receiver(post_delete, sender=Tag)
+def reindex_untagged_posts(sender, instance, using, **kwargs):
+    tags_changed(using, instance._affected_post_ids)
+
+
+
+def adjust_post_counts(tag_ids, delta):
+    if tag_ids and delta:
+        Tag.objects.filter(pk__in=list(tag_ids)).update(post_count=F('post_count') + delta)
+
+
+@receiver(m2m_changed, sender=Post.tags.through)
+def count_tagged_posts(sender, instance, action, reverse, pk_set, **kwargs):
+    if action in ('pre_remove', 'pre_clear'):
+        # remove() reports every id it was given, linked or not, so count
+        # the real links before they go. post_add's pk_set is exact.
+        links = sender.objects.filter(**{'tag' if reverse else 'post': instance})
+        if action == 'pre_remove':
+            links = links.filter(**{'post__in' if reverse else 'tag__in': pk_set})
+        if reverse:
+            instance._unlinked_count = links.count()
+        else:
+            instance._unlinked_tag_ids = list(links.values_list('tag_id', flat=True))
+    elif action == 'post_add':
+        if reverse:
+            adjust_post_counts([instance.pk], len(pk_set))
+        else:
+            adjust_post_counts(pk_set, 1)
+    elif action in ('post_remove', 'post_clear'):
+        if reverse:
+            adjust_post_counts([instance.pk], -instance._unlinked_count)
+        else:
+            adjust_post_counts(instance._unlinked_tag_ids, -1)
+
+
+@receiver(pre_delete, sender=Post)
+def remember_post_tags(sender, instance, **kwargs):
+    # Deleting a post cascades to the through table without m2m_changed.
+    instance._unlinked_tag_ids = list(instance.tags.values_list('pk', flat=True))
+
+
+@receiver(post_delete, sender=Post)
+def uncount_deleted_post(sender, instance, **kwargs):
+    adjust_post_counts(instance._unlinked_tag_ids, -1)
+
+
+@receiver(pre_save, sender=User)
+def remember_username_change(sender, instance, update_fields, **kwargs):
+    # Logins save only last_login; skip the lookup unless username may change.
+    if instance.pk is None or (update_fields is not None and 'username' not in update_fields):
+        instance._username_changed = False
+        return
+    old = User.objects.filter(pk=instance.pk).values_list('username', flat=True).first()
+    instance._username_changed = old is not None and old != instance.username
+
+
+@receiver(post_save, sender=User)
+def touch_renamed_author_posts(sender, instance, created, using, **kwargs):
+    # Post cards show the author's username.
+    if getattr(instance, '_username_changed', False):
+        Post.objects.filter(author=instance).update(updated_at=timezone.now())
+        bump_feed_version(using)
+        bump_syndication_version(using)
+
+
+@receiver(post_save, sender=Comment)
+def count_new_comment(sender, instance, created, using, **kwargs):
+    if created:
+        bump_feed_version(using)
+        Post.objects.filter(pk=instance.post_id).update(
+            comment_count=F('comment_count') + 1,
+            last_comment_at=instance.created_at,
+            updated_at=timezone.now(),
+        )
+
+
+@receiver(pre_delete, sender=Post)
+def remember_deleted_post(sender, instance, origin=None, **kwargs):
+    # Kept on the object or queryset delete() was called on, so it lasts
+    # for this one deletion and its cascade only.
+    if origin is not None:
+        if not hasattr(origin, '_deleted_post_ids'):
+            origin._deleted_post_ids = set()
+        origin._deleted_post_ids.add(instance.pk)
+
+
+@receiver(post_delete, sender=Comment)
+def uncount_deleted_comment(sender, instance, using, origin=None, **kwargs):
+    # The comments of a post being deleted go in its cascade; their post
+    # needs no recount, and the post's own post_delete bumps the feed.
+    if instance.post_id in getattr(origin, '_deleted_post_ids', ()):
+        return
+    bump_feed_version(using)
+    latest = Comment.objects.filter(post=OuterRef('pk')).order_by('-created_at').values('created_at')[:1]
+    Post.objects.filter(pk=instance.post_id, comment_count__gt=0).update(
+        comment_count=F('comment_count') - 1,
+        last_comment_at=Subquery(latest),
+        updated_at=timezone.now(),
+    )
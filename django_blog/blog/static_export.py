@@ -0,0 +1,154 @@
+"""
+Render the blog's public pages to plain files for ``manage.py export_static_site``.
+
+The parent process plans every page up front: one per post detail and one
+per page of the feed and of each tag listing, with the post ids each
+listing page shows. Batches of pages are rendered in a process pool. A
+worker hashes each page and only rewrites files whose SHA-256 differs
+from the previous export's manifest, so an unchanged site costs renders
+but no writes and a web server's caches stay warm.
+
+Keyset cursors only work through Django, so listing pages are rendered
+with placeholder cursors that are then rewritten into links to
+``.../page/<n>/``.
+"""
+
+import hashlib
+import os
+import re
+from pathlib import Path
+
+from django.contrib.auth.models import AnonymousUser
+from django.core.exceptions import SuspiciousFileOperation
+from django.core.validators import slug_re
+from django.template.loader import render_to_string
+from django.test import RequestFactory
+
+from .models import Post, Tag
+from .pagination import KeysetPage
+
+MANIFEST_NAME = 'manifest.json'
+PAGE_CURSOR = re.compile(r'href="\?cursor=__page_(\d+)__"')
+
+
+def listing_path(base, number):
+    return f'{base}/index.html' if number == 1 else f'{base}/page/{number}/index.html'
+
+
+def plan_listing(base, post_ids, per_page, tag_slug=None):
+    """Yield one page spec per page of ``post_ids``, already in feed order."""
+    pages = [post_ids[start:start + per_page] for start in range(0, len(post_ids), per_page)] or [[]]
+    for number, page_ids in enumerate(pages, start=1):
+        yield {
+            'kind': 'listing',
+            'path': listing_path(base, number),
+            'base': base,
+            'number': number,
+            'post_ids': page_ids,
+            'has_next': number < len(pages),
+            'tag_slug': tag_slug,
+        }
+
+
+def plan_pages(per_page, ordering):
+    """Return page specs for every page the export writes."""
+    specs = [
+        {'kind': 'detail', 'path': f'post/{pk}/index.html', 'post_id': pk}
+        for pk in Post.objects.order_by('pk').values_list('pk', flat=True).iterator()
+    ]
+    feed_ids = list(Post.objects.order_by(*ordering).values_list('pk', flat=True))
+    specs.extend(plan_listing('post', feed_ids, per_page))
+    for tag in Tag.objects.filter(post_count__gt=0).order_by('name').iterator():
+        # The site only routes slug tag names (tags/<slug:tag_slug>/); others,
+        # e.g. made in the admin, have no page to export and could contain
+        # "/" or "..".
+        if not slug_re.match(tag.name):
+            continue
+        tag_ids = list(tag.posts.order_by(*ordering).values_list('pk', flat=True))
+        specs.extend(plan_listing(f'tags/{tag.name}', tag_ids, per_page, tag_slug=tag.name))
+    return specs
+
+
+def make_request(path):
+    request = RequestFactory().get(path)
+    request.user = AnonymousUser()
+    return request
+
+
+def render_detail(spec):
+    post = Post.objects.filter(pk=spec['post_id']).first()
+    if post is None:
+        return None
+    request = make_request(f"/{spec['path'].removesuffix('index.html')}")
+    return render_to_string('blog/post_detail.html', {'object': post, 'post': post}, request)
+
+
+def render_listing(spec):
+    posts = Post.objects.for_listing().in_bulk(spec['post_ids'])
+    number = spec['number']
+    page = KeysetPage(
+        [posts[pk] for pk in spec['post_ids'] if pk in posts],
+        next_cursor=f'__page_{number + 1}__' if spec['has_next'] else None,
+        previous_cursor=f'__page_{number - 1}__' if number > 1 else None,
+    )
+    base = spec['base']
+    request = make_request(f'/{base}/')
+    context = {'posts': page.object_list, 'page_obj': page}
+    if spec['tag_slug']:
+        context['tag_slug'] = spec['tag_slug']
+    html = render_to_string('blog/post_list.html', context, request)
+    return PAGE_CURSOR.sub(lambda m: f'href="/{listing_path(base, int(m[1])).removesuffix("index.html")}"', html)
+
+
+RENDERERS = {'detail': render_detail, 'listing': render_listing}
+
+
+def output_path(output_dir, path):
+    """``output_dir/path``, refusing paths that resolve outside ``output_dir``."""
+    root = Path(output_dir).resolve()
+    target = Path(root, path).resolve()
+    if not target.is_relative_to(root):
+        raise SuspiciousFileOperation(f'{path} is outside the export directory.')
+    return target
+
+
+def write_if_changed(output_dir, path, content, old_hash):
+    """Write ``content`` to ``output_dir/path`` unless its hash is ``old_hash``.
+
+    Returns (sha256, size, written).
+    """
+    digest = hashlib.sha256(content).hexdigest()
+    target = output_path(output_dir, path)
+    if digest == old_hash and target.exists():
+        return digest, len(content), False
+    target.parent.mkdir(parents=True, exist_ok=True)
+    tmp = target.with_name(f'.{target.name}.tmp')
+    tmp.write_bytes(content)
+    # Atomic, so the web server never serves a half-written page.
+    os.replace(tmp, target)
+    return digest, len(content), True
+
+
+def render_batch(specs, old_hashes, output_dir):
+    """Render and write a batch of pages; runs in a pool worker.
+
+    Returns ``[(path, sha256, size, written), ...]`` for pages that still
+    exist.
+    """
+    results = []
+    for spec in specs:
+        html = RENDERERS[spec['kind']](spec)
+        if html is None:
+            continue
+        digest, size, written = write_if_changed(
+            output_dir, spec['path'], html.encode(), old_hashes.get(spec['path'])
+        )
+        results.append((spec['path'], digest, size, written))
+    return results
+
+
+def init_worker():
+    # Spawned (rather than forked) workers start without Django set up.
+    import django
+
+    django.setup()
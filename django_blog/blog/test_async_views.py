@@ -0,0 +1,70 @@
+"""
+Tests for the async read views in blog.async_views.
+
+Covers:
+- Each async view lists the same posts as its sync counterpart
+- Keyset cursors, invalid cursors and missing posts
+- Conditional GET through async_condition
+- Rendering for a logged-in user without synchronous session access
+"""
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from .models import Post, Tag
+
+
+@override_settings(BLOG_SEARCH_BACKEND="fts5")
+class AsyncReadViewTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create(username="writer")
+        tag = Tag.objects.create(name="drama")
+        with self.captureOnCommitCallbacks(execute=True):
+            for i in range(12):
+                post = Post.objects.create(title=f"Review {i:02d}", content="Worth watching.", author=self.author)
+                post.tags.add(tag)
+        self.post = post
+
+    def listed(self, response):
+        return [post.pk for post in response.context["posts"]]
+
+    async def assert_same_listing(self, sync_url, async_url, params=None):
+        expected = await sync_to_async(self.client.get)(sync_url, params or {})
+        response = await self.async_client.get(async_url, params or {})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.listed(response), self.listed(expected))
+        return response
+
+    async def test_listings_match_sync_views(self):
+        first = await self.assert_same_listing(reverse("post-list"), reverse("async-post-list"))
+        cursor = {"cursor": first.context["page_obj"].next_cursor}
+        await self.assert_same_listing(reverse("post-list"), reverse("async-post-list"), cursor)
+        await self.assert_same_listing(
+            reverse("posts-by-tag", args=["drama"]), reverse("async-posts-by-tag", args=["drama"])
+        )
+        await self.assert_same_listing(reverse("search"), reverse("async-search"), {"q": "review"})
+        await self.assert_same_listing(reverse("post-list"), reverse("async-post-list"), {"sort": "discussed"})
+
+    async def test_bad_cursor_and_missing_post_are_404(self):
+        response = await self.async_client.get(reverse("async-post-list"), {"cursor": "junk"})
+        self.assertEqual(response.status_code, 404)
+        response = await self.async_client.get(reverse("async-post-detail", args=[0]))
+        self.assertEqual(response.status_code, 404)
+
+    async def test_detail_supports_conditional_get(self):
+        url = reverse("async-post-detail", args=[self.post.pk])
+        first = await self.async_client.get(url)
+        self.assertContains(first, "Review 11")
+        sync = await sync_to_async(self.client.get)(reverse("post-detail", args=[self.post.pk]))
+        self.assertEqual(first["ETag"], sync["ETag"])
+        again = await self.async_client.get(url, headers={"if-none-match": first["ETag"]})
+        self.assertEqual(again.status_code, 304)
+
+    async def test_logged_in_user_sees_their_menu(self):
+        await self.async_client.aforce_login(self.author)
+        response = await self.async_client.get(reverse("async-post-list"))
+        self.assertContains(response, "Add Review")
@@ -0,0 +1,89 @@
+"""
+Tests for manage.py seed_benchmark_data and manage.py run_benchmarks.
+
+Covers:
+- Seeding inserts the requested rows and repairs the derived counters
+- A run requests every endpoint and writes its results as JSON
+- --compare fails on endpoints that now run more queries
+- An endpoint answering with errors fails the run and is not compared
+"""
+
+import json
+import tempfile
+from io import StringIO
+from pathlib import Path
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db.models import Sum
+from django.test import TestCase, override_settings
+
+from .management.commands.run_benchmarks import Command as RunBenchmarks
+from .models import Comment, Post, Tag
+
+
+@override_settings(BLOG_SEARCH_BACKEND="fts5")
+class BenchmarkCommandTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.output = Path(self.enterContext(tempfile.TemporaryDirectory()))
+        call_command(
+            "seed_benchmark_data", users=5, tags=4, posts=30, tags_per_post=2, comments=60, batch_size=7,
+            stdout=StringIO(),
+        )
+
+    def test_seed(self):
+        self.assertEqual(User.objects.count(), 5)
+        self.assertEqual(Tag.objects.count(), 4)
+        self.assertEqual(Post.objects.count(), 30)
+        self.assertEqual(Post.tags.through.objects.count(), 60)
+        self.assertEqual(Comment.objects.count(), 60)
+        # bulk_create skips the signals; the repair commands fill the counters in.
+        self.assertEqual(Post.objects.aggregate(total=Sum("comment_count"))["total"], 60)
+        self.assertEqual(Tag.objects.aggregate(total=Sum("post_count"))["total"], 60)
+
+    def run_benchmarks(self, name, **options):
+        path = self.output / name
+        call_command(
+            "run_benchmarks", requests=3, warmup=1, output=str(path), stdout=StringIO(), stderr=StringIO(), **options,
+        )
+        return json.loads(path.read_text())
+
+    def test_run_writes_results(self):
+        report = self.run_benchmarks("run.json")
+        self.assertEqual(report["project"], "django_blog")
+        self.assertIn("post-detail", report["endpoints"])
+        for name, result in report["endpoints"].items():
+            with self.subTest(endpoint=name):
+                self.assertEqual(result["errors"], 0)
+                self.assertLessEqual(result["p50_ms"], result["p99_ms"])
+        self.assertEqual(report["endpoints"]["post-list"]["queries_per_request"], 3)
+
+    def test_compare_flags_more_queries(self):
+        baseline = self.run_benchmarks("baseline.json", endpoint=["post-list"])
+        baseline["endpoints"]["post-list"]["queries_per_request"] = 2
+        baseline["endpoints"]["post-list"]["p95_ms"] = 1000
+        (self.output / "baseline.json").write_text(json.dumps(baseline))
+
+        with self.assertRaisesMessage(CommandError, "post-list: 2 -> 3 queries"):
+            self.run_benchmarks("run.json", endpoint=["post-list"], compare=str(self.output / "baseline.json"))
+
+    def test_errors_fail_the_run_and_are_not_compared(self):
+        baseline = self.run_benchmarks("baseline.json", endpoint=["post-list"])
+        baseline["endpoints"]["post-list"]["p95_ms"] = 0.001
+        (self.output / "baseline.json").write_text(json.dumps(baseline))
+        endpoints = [("post-list", "/no-such-page/")]
+
+        with mock.patch.object(RunBenchmarks, "endpoints", return_value=endpoints):
+            with self.assertRaisesMessage(CommandError, "Failed: post-list: 3 errors") as raised:
+                self.run_benchmarks("run.json", compare=str(self.output / "baseline.json"))
+        self.assertNotIn("p95", str(raised.exception))
+        result = json.loads((self.output / "run.json").read_text())["endpoints"]["post-list"]
+        self.assertEqual((result["errors"], result["last_error_status"]), (3, 404))
+
+        # An errored baseline is skipped rather than compared against.
+        (self.output / "baseline.json").write_text((self.output / "run.json").read_text())
+        self.run_benchmarks("again.json", endpoint=["post-list"], compare=str(self.output / "baseline.json"))
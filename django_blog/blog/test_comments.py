@@ -0,0 +1,142 @@
+"""
+Tests for comments and the per-post counters they maintain.
+
+Covers:
+- CommentCreateView/CommentDeleteView keep Post.comment_count and
+  Post.last_comment_at current
+- Deleting a post deletes its comments without recounting each one
+- manage.py repair_comment_counts
+- The "most discussed" feed ordering
+- Comment threads paginate by cursor in constant queries
+- comments_since returns only comments newer than the poll cursor
+"""
+
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from django.urls import reverse
+
+from .models import Comment, Post
+
+
+class CommentCounterTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(username="reader")
+        self.client.force_login(self.user)
+        self.post = Post.objects.create(title="Review", content="Worth watching.", author=self.user)
+
+    def test_create_and_delete_views_maintain_counters(self):
+        url = reverse("comment-create", args=[self.post.pk])
+        self.client.post(url, {"content": "First!"})
+        response = self.client.post(url, {"content": "Second."})
+        self.assertRedirects(response, reverse("post-detail", args=[self.post.pk]), fetch_redirect_response=False)
+
+        self.post.refresh_from_db()
+        first, second = Comment.objects.order_by("created_at")
+        self.assertEqual(self.post.comment_count, 2)
+        self.assertEqual(self.post.last_comment_at, second.created_at)
+
+        self.client.post(reverse("comment-delete", args=[second.pk]))
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.comment_count, 1)
+        self.assertEqual(self.post.last_comment_at, first.created_at)
+
+        self.client.post(reverse("comment-delete", args=[first.pk]))
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.comment_count, 0)
+        self.assertIsNone(self.post.last_comment_at)
+
+    def test_deleting_a_post_does_not_recount_each_comment(self):
+        def delete_post_with(comments):
+            post = Post.objects.create(title="Doomed", content="Soon gone.", author=self.user)
+            for i in range(comments):
+                Comment.objects.create(post=post, author=self.user, content=f"Comment {i}")
+            with CaptureQueriesContext(connection) as queries:
+                post.delete()
+            self.assertFalse(Comment.objects.filter(post_id=post.pk).exists())
+            return len(queries)
+
+        self.assertEqual(delete_post_with(100), delete_post_with(2))
+
+    def test_deleting_a_user_recounts_comments_on_other_posts(self):
+        visitor = User.objects.create(username="visitor")
+        Comment.objects.create(post=self.post, author=visitor, content="Drive-by")
+        Post.objects.create(title="Visitor's own", content="Mine.", author=visitor)
+        visitor.delete()
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.comment_count, 0)
+        self.assertIsNone(self.post.last_comment_at)
+
+    def test_repair_command_recomputes_counters(self):
+        Comment.objects.create(post=self.post, author=self.user, content="One")
+        latest = Comment.objects.create(post=self.post, author=self.user, content="Two")
+        Post.objects.update(comment_count=42, last_comment_at=None)
+
+        # Listing ETags must change with the counts they render.
+        with mock.patch("blog.management.commands.repair_comment_counts.bump_feed_version") as bump:
+            call_command("repair_comment_counts", "--chunk-size", "1", stdout=StringIO())
+        bump.assert_called()
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.comment_count, 2)
+        self.assertEqual(self.post.last_comment_at, latest.created_at)
+
+    def test_feed_sorts_by_most_discussed(self):
+        quiet = Post.objects.create(title="Quiet", content="Nobody cares.", author=self.user)
+        busy = Post.objects.create(title="Busy", content="Everyone cares.", author=self.user)
+        for _ in range(3):
+            Comment.objects.create(post=busy, author=self.user, content="Yes")
+        Comment.objects.create(post=self.post, author=self.user, content="Hm")
+
+        response = self.client.get(reverse("post-list"), {"sort": "discussed"})
+        self.assertEqual([p.pk for p in response.context["posts"]], [busy.pk, self.post.pk, quiet.pk])
+        self.assertContains(response, "3 comments")
+
+
+class CommentThreadTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(username="reader")
+        self.post = Post.objects.create(title="Review", content="Worth watching.", author=self.user)
+        Comment.objects.bulk_create([
+            Comment(post=self.post, author=self.user, content=f"Comment {i}") for i in range(25)
+        ])
+        # created_at is auto_now_add, so backdate a second apart after insert.
+        start = timezone.now() - timedelta(minutes=1)
+        for i, comment in enumerate(Comment.objects.order_by("id")):
+            Comment.objects.filter(pk=comment.pk).update(created_at=start + timedelta(seconds=i))
+
+    def test_thread_paginates_newest_first(self):
+        url = reverse("comment-list", args=[self.post.pk])
+        # The post, then the page of comments with their authors.
+        with self.assertNumQueries(2):
+            first = self.client.get(url)
+        comments = first.context["comments"]
+        self.assertEqual(len(comments), 20)
+        self.assertEqual(comments[0].content, "Comment 24")
+        # Later pages also look up the newest comment for the poll cursor.
+        with self.assertNumQueries(3):
+            second = self.client.get(url, {"cursor": first.context["page_obj"].next_cursor})
+        self.assertEqual(second.context["poll_cursor"], first.context["poll_cursor"])
+        self.assertEqual([c.content for c in second.context["comments"]], [f"Comment {i}" for i in range(4, -1, -1)])
+        self.assertEqual(self.client.get(url, {"cursor": "junk"}).status_code, 404)
+
+    def test_comments_since_returns_only_newer_comments(self):
+        thread = self.client.get(reverse("comment-list", args=[self.post.pk]))
+        url = reverse("comments-since", args=[self.post.pk])
+        cursor = thread.context["poll_cursor"]
+
+        data = self.client.get(url, {"after": cursor}).json()
+        self.assertEqual(data["comments"], [])
+        self.assertEqual(data["cursor"], cursor)
+        self.assertFalse(data["has_more"])
+
+        newer = Comment.objects.create(post=self.post, author=self.user, content="Late arrival")
+        data = self.client.get(url, {"after": cursor}).json()
+        self.assertEqual([c["id"] for c in data["comments"]], [newer.pk])
+        self.assertEqual(self.client.get(url, {"after": data["cursor"]}).json()["comments"], [])
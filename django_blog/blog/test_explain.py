@@ -0,0 +1,51 @@
+"""
+Tests for the hot-path indexes and manage.py explain_hot_queries.
+
+Covers:
+- The feed, author listing and comment thread queries use their indexes
+- --analyze is refused where the database does not support it
+"""
+
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+
+from .models import Comment, Post, Tag
+
+
+class ExplainHotQueriesTests(TestCase):
+    def setUp(self):
+        author = User.objects.create(username="writer")
+        tag = Tag.objects.create(name="noir")
+        for i in range(3):
+            post = Post.objects.create(title=f"Review {i}", content="Worth watching.", author=author)
+            post.tags.add(tag)
+            Comment.objects.create(post=post, author=author, content="Agreed.")
+
+    def explain(self, *args):
+        out = StringIO()
+        call_command("explain_hot_queries", *args, stdout=out)
+        return out.getvalue()
+
+    def plan_of(self, output, name):
+        return output.split(f"{name}\n", 1)[1].split("\n\n", 1)[0]
+
+    def test_hot_queries_use_their_indexes(self):
+        output = self.explain()
+        self.assertIn("blog_post_feed_idx", self.plan_of(output, "feed"))
+        self.assertIn("blog_post_feed_idx", self.plan_of(output, "feed next page"))
+        self.assertIn("blog_post_author_feed_idx", self.plan_of(output, "author listing"))
+        self.assertIn("blog_comment_thread_idx", self.plan_of(output, "comment thread"))
+        self.assertIn("blog_dailyviews_day_idx", self.plan_of(output, "trending"))
+
+    def test_only_selected_queries(self):
+        output = self.explain("--query", "tag cloud")
+        self.assertIn("blog_tag_popular_idx", output)
+        self.assertNotIn("feed", output)
+
+    def test_analyze_needs_postgresql(self):
+        with self.assertRaisesMessage(CommandError, "only supported on PostgreSQL"):
+            self.explain("--analyze")
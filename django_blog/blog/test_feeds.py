@@ -0,0 +1,72 @@
+"""
+Tests for the RSS, Atom and JSON Feed endpoints in blog.feeds.
+
+Covers:
+- Global and per-tag feeds in each format
+- Polling an unchanged feed is a cache hit (no queries) or a 304
+- Post edits rebuild the feed, re-serializing only the changed post;
+  comments do not
+"""
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from .models import Comment, Post, Tag
+
+
+class SyndicationFeedTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create(username="writer")
+        self.tag = Tag.objects.create(name="noir")
+        with self.captureOnCommitCallbacks(execute=True):
+            self.posts = [
+                Post.objects.create(title=f"Review {i}", content="Worth watching.", author=self.author)
+                for i in range(3)
+            ]
+            self.posts[0].tags.add(self.tag)
+
+    def test_formats(self):
+        rss = self.client.get(reverse("feed", args=["rss"]))
+        self.assertEqual(rss["Content-Type"], "application/rss+xml; charset=utf-8")
+        self.assertContains(rss, "<title>Review 2</title>")
+        self.assertContains(rss, "http://testserver/post/")
+
+        atom = self.client.get(reverse("feed", args=["atom"]))
+        self.assertContains(atom, 'xmlns="http://www.w3.org/2005/Atom"')
+
+        data = self.client.get(reverse("feed", args=["json"])).json()
+        self.assertEqual([item["title"] for item in data["items"]], ["Review 2", "Review 1", "Review 0"])
+        self.assertEqual(data["items"][2]["tags"], ["noir"])
+
+    def test_tag_feed(self):
+        data = self.client.get(reverse("tag-feed", args=["noir", "json"])).json()
+        self.assertEqual([item["title"] for item in data["items"]], ["Review 0"])
+        self.assertEqual(self.client.get(reverse("tag-feed", args=["missing", "rss"])).status_code, 404)
+
+    def test_polling_is_served_from_cache(self):
+        url = reverse("feed", args=["rss"])
+        first = self.client.get(url)
+        with self.assertNumQueries(0):
+            again = self.client.get(url)
+            not_modified = self.client.get(url, headers={"if-none-match": first["ETag"]})
+        self.assertEqual(again.content, first.content)
+        self.assertEqual(not_modified.status_code, 304)
+
+    def test_post_edits_rebuild_only_the_changed_item(self):
+        url = reverse("feed", args=["json"])
+        first = self.client.get(url)
+        with self.captureOnCommitCallbacks(execute=True):
+            Comment.objects.create(post=self.posts[1], author=self.author, content="Agreed.")
+        self.assertEqual(self.client.get(url, headers={"if-none-match": first["ETag"]}).status_code, 304)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.posts[1].title = "Edited review"
+            self.posts[1].save()
+        # The latest-posts lookup, then one post with its tags.
+        with self.assertNumQueries(3):
+            response = self.client.get(url, headers={"if-none-match": first["ETag"]})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["items"][1]["title"], "Edited review")
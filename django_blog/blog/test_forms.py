@@ -0,0 +1,63 @@
+"""
+Tests for blog forms.
+
+Covers:
+- PostForm tag normalization and de-duplication
+- PostForm.save resolves tags with a constant number of queries
+"""
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from .forms import PostForm
+from .models import Post, Tag
+
+
+class PostFormTagTests(TestCase):
+    def setUp(self):
+        self.author = User.objects.create(username="writer")
+
+    def save_form(self, tags, instance=None):
+        form = PostForm(
+            data={"title": "Review", "content": "Worth watching.", "tags": tags},
+            instance=instance or Post(author=self.author),
+        )
+        self.assertTrue(form.is_valid(), form.errors)
+        return form.save()
+
+    def test_tag_names_are_normalized_and_deduplicated(self):
+        Tag.objects.create(name="sci-fi")
+        post = self.save_form(" Sci Fi, sci-fi,  DRAMA ,, drama ")
+        self.assertEqual(sorted(post.tags.values_list("name", flat=True)), ["drama", "sci-fi"])
+        self.assertEqual(Tag.objects.count(), 2)
+
+    def test_overlong_tag_is_rejected(self):
+        form = PostForm(data={"title": "Review", "content": "Text", "tags": "x" * 51})
+        self.assertFalse(form.is_valid())
+        self.assertIn("tags", form.errors)
+
+    def test_editing_replaces_tags(self):
+        post = self.save_form("drama, noir")
+        self.save_form("noir, heist", instance=post)
+        self.assertEqual(sorted(post.tags.values_list("name", flat=True)), ["heist", "noir"])
+
+    def count_save_queries(self, tags, instance=None):
+        with CaptureQueriesContext(connection) as queries:
+            self.save_form(tags, instance=instance)
+        return len(queries)
+
+    def test_query_count_does_not_grow_with_tag_count(self):
+        few = ", ".join(f"few{i}" for i in range(2))
+        many = ", ".join(f"many{i}" for i in range(20))
+        self.assertEqual(self.count_save_queries(few), self.count_save_queries(many))
+
+        # Existing tags only: no insert needed, still constant.
+        self.assertEqual(self.count_save_queries(few), self.count_save_queries(many))
+
+        post_few, post_many = self.save_form("a1"), self.save_form("b1")
+        self.assertEqual(
+            self.count_save_queries(few, instance=post_few),
+            self.count_save_queries(many, instance=post_many),
+        )
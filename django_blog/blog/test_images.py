@@ -0,0 +1,121 @@
+"""
+Tests for the Post.image variant pipeline (blog/images.py).
+
+Covers:
+- JPEG and WebP variants are generated after commit with their dimensions
+- Variants narrower than the original only; replaced images are regenerated
+- post_list.html emits srcset and lazy loading
+- Posts from before the dimension fields: the 0013 backfill and
+  generate_image_variants store them, and a missing file is not an error
+"""
+
+import shutil
+import tempfile
+from importlib import import_module
+from io import BytesIO, StringIO
+from types import SimpleNamespace
+
+from django.apps import apps
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from PIL import Image
+
+from .models import Post, PostImageVariant
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+def make_upload(name, size):
+    buffer = BytesIO()
+    Image.new("RGB", size, (200, 40, 40)).save(buffer, format="JPEG")
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type="image/jpeg")
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, BLOG_IMAGE_WORKERS=0, BLOG_IMAGE_WIDTHS=(320, 640, 1280))
+class PostImageVariantTests(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        self.author = User.objects.create(username="photographer")
+
+    def create_post(self, size):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Post.objects.create(
+                title="Still frame", content="Gorgeous.", author=self.author,
+                image=make_upload("frame.jpg", size),
+            )
+
+    def test_variants_are_generated_with_dimensions(self):
+        post = self.create_post((1000, 500))
+        self.assertEqual((post.image_width, post.image_height), (1000, 500))
+        variants = post.image_variants.all()
+        self.assertEqual(
+            sorted((v.format, v.width, v.height) for v in variants),
+            [("jpeg", 320, 160), ("jpeg", 640, 320), ("webp", 320, 160), ("webp", 640, 320)],
+        )
+        webp = variants.get(format=PostImageVariant.WEBP, width=320)
+        with webp.image.open("rb") as f:
+            self.assertEqual(Image.open(f).format, "WEBP")
+
+    def test_replacing_the_image_regenerates_variants(self):
+        post = self.create_post((1000, 500))
+        with self.captureOnCommitCallbacks(execute=True):
+            post.image = make_upload("other.jpg", (700, 700))
+            post.save()
+        self.assertEqual(
+            sorted((v.format, v.width) for v in post.image_variants.all()),
+            [("jpeg", 320), ("jpeg", 640), ("webp", 320), ("webp", 640)],
+        )
+        self.assertTrue(all(v.source == post.image.name for v in post.image_variants.all()))
+
+    def test_feed_uses_srcset_and_lazy_loading(self):
+        post = self.create_post((1000, 500))
+        response = self.client.get(reverse("post-list"))
+        self.assertContains(response, 'loading="lazy"')
+        self.assertContains(response, 'type="image/webp"')
+        self.assertContains(response, f'{post.image.url} 1000w')
+        self.assertContains(response, 'width="1000" height="500"')
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, BLOG_IMAGE_WORKERS=0, BLOG_IMAGE_WIDTHS=(320,))
+class ImageDimensionsBackfillTests(TestCase):
+    def setUp(self):
+        author = User.objects.create(username="archivist")
+        self.posts = []
+        for name in ("old.jpg", "gone.jpg"):
+            post = Post.objects.create(title=name, content="From the archive.", author=author)
+            post.image.save(name, make_upload(name, (800, 600)), save=False)
+            # Stored the way posts from before 0007 are: no dimensions.
+            Post.objects.filter(pk=post.pk).update(image=post.image.name, image_width=None, image_height=None)
+            self.posts.append(post)
+        self.posts[1].image.delete(save=False)
+
+    def stored_dimensions(self):
+        return list(Post.objects.order_by("pk").values_list("image_width", "image_height"))
+
+    def test_missing_file_does_not_break_the_feed(self):
+        response = self.client.get(reverse("post-list"))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Post.objects.get(pk=self.posts[1].pk).image_width, None)
+
+    def test_migration_backfill(self):
+        migration = import_module("blog.migrations.0013_post_image_dimensions")
+        # The backfill only uses the schema editor for its connection.
+        migration.backfill_image_dimensions(apps, SimpleNamespace(connection=connection))
+        self.assertEqual(self.stored_dimensions(), [(800, 600), (None, None)])
+
+    def test_command_stores_dimensions_and_skips_failures(self):
+        out = StringIO()
+        with self.assertLogs("blog.management.commands.generate_image_variants") as logs:
+            call_command("generate_image_variants", stdout=out)
+        self.assertEqual(self.stored_dimensions(), [(800, 600), (None, None)])
+        self.assertEqual(self.posts[0].image_variants.count(), 2)
+        self.assertIn(f"post {self.posts[1].pk}", logs.output[0])
+        self.assertIn("1 failed", out.getvalue())
@@ -0,0 +1,150 @@
+"""
+Tests for the per-request metrics middleware (django_perf.instrumentation)
+and the N+1 detector built on it (django_perf.nplusone).
+
+Covers:
+- Server-Timing reports every query the request ran and template time
+- Per-view totals in the Prometheus text endpoint, and who may read it
+- Requests over their query budget are logged and counted
+- Async views are measured too
+- Repeated statements fail with the template line that ran them
+- Requests over a detector's budget fail
+"""
+
+import re
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.http import HttpResponse
+from django.template.base import Origin, Template
+from django.template.context import Context
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from django_perf.instrumentation import RequestMetricsMiddleware, registry
+from django_perf.nplusone import detect_n_plus_one, normalize
+
+from .models import Post, Tag
+
+SERVER_TIMING = re.compile(r'db;dur=([\d.]+);desc="(\d+) queries", tpl;dur=([\d.]+), total;dur=([\d.]+)')
+
+
+class RequestMetricsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        registry.reset()
+        self.addCleanup(registry.reset)
+        author = User.objects.create(username="writer")
+        self.post = Post.objects.create(title="Review", content="Worth watching.", author=author)
+
+    def timing(self, response):
+        match = SERVER_TIMING.fullmatch(response["Server-Timing"])
+        self.assertIsNotNone(match, response["Server-Timing"])
+        sql_ms, queries, template_ms, total_ms = match.groups()
+        return int(queries), float(template_ms), float(total_ms)
+
+    def test_server_timing_header(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse("post-list"))
+        query_count, template_ms, total_ms = self.timing(response)
+        self.assertEqual(query_count, len(queries))
+        self.assertGreater(template_ms, 0)
+        self.assertGreaterEqual(total_ms, template_ms)
+
+        _, template_ms, _ = self.timing(self.client.get(reverse("tag-cloud")))
+        self.assertEqual(template_ms, 0)
+
+    def test_totals_per_view(self):
+        self.client.get(reverse("post-list"))
+        self.client.get(reverse("post-list"))
+        response = self.client.get(reverse("post-detail", args=[self.post.pk]))
+        self.client.get("/no-such-page/")
+
+        totals = registry.snapshot()
+        self.assertEqual(totals["post-list"]["requests"], 2)
+        self.assertEqual(totals["post-detail"]["response_bytes"], len(response.content))
+        self.assertEqual(totals["<unresolved>"]["requests"], 1)
+
+        self.client.force_login(User.objects.create(username="ops", is_staff=True))
+        body = self.client.get(reverse("metrics")).content.decode()
+        self.assertIn("# TYPE django_db_queries_total counter", body)
+        self.assertIn('django_requests_total{view="post-list"} 2\n', body)
+
+    @override_settings(DEBUG=False, REQUEST_METRICS_PUBLIC=False)
+    def test_metrics_are_for_staff_only(self):
+        # From a local address, as every request is behind a reverse proxy.
+        self.assertEqual(self.client.get(reverse("metrics"), REMOTE_ADDR="127.0.0.1").status_code, 404)
+        with self.settings(REQUEST_METRICS_PUBLIC=True):
+            self.assertEqual(self.client.get(reverse("metrics")).status_code, 200)
+        self.client.force_login(User.objects.get(username="writer"))
+        self.assertEqual(self.client.get(reverse("metrics")).status_code, 404)
+        self.client.force_login(User.objects.create(username="ops", is_staff=True))
+        self.assertEqual(self.client.get(reverse("metrics")).status_code, 200)
+
+    @override_settings(REQUEST_QUERY_BUDGET=100, REQUEST_QUERY_BUDGETS={"post-list": 1})
+    def test_query_budget(self):
+        with self.assertLogs("django_perf.instrumentation", "WARNING") as logs:
+            self.client.get(reverse("post-list"))
+        self.assertIn("over the budget of 1 for post-list", logs.output[0])
+        with self.assertNoLogs("django_perf.instrumentation", "WARNING"):
+            self.client.get(reverse("post-detail", args=[self.post.pk]))
+
+        totals = registry.snapshot()
+        self.assertEqual(totals["post-list"]["over_budget"], 1)
+        self.assertEqual(totals["post-detail"]["over_budget"], 0)
+
+    async def test_async_views_are_measured(self):
+        response = await self.async_client.get(reverse("async-post-detail", args=[self.post.pk]))
+        self.assertEqual(response.status_code, 200)
+        query_count, template_ms, _ = self.timing(response)
+        self.assertGreater(query_count, 0)
+        self.assertGreater(template_ms, 0)
+        self.assertEqual(registry.snapshot()["async-post-detail"]["queries"], query_count)
+
+
+class NPlusOneDetectorTests(TestCase):
+    template = Template(
+        "{% for post in posts %}\n"
+        "{% for tag in post.tags.all %}{{ tag.name }}{% endfor %}\n"
+        "{% endfor %}",
+        origin=Origin("n_plus_one.html", template_name="blog/n_plus_one.html"),
+    )
+
+    def setUp(self):
+        author = User.objects.create(username="writer")
+        tag = Tag.objects.create(name="drama")
+        for n in range(4):
+            Post.objects.create(title=f"Review {n}", content="Text.", author=author).tags.add(tag)
+
+    def render(self, posts):
+        def view(request):
+            return HttpResponse(self.template.render(Context({"posts": posts})))
+        return RequestMetricsMiddleware(view)(RequestFactory().get("/reviews/"))
+
+    def test_normalize(self):
+        self.assertEqual(
+            normalize('SELECT * FROM "t" WHERE "t"."id" IN (%s, %s, %s)\n LIMIT 21'),
+            normalize('SELECT * FROM "t" WHERE "t"."id" IN (%s) LIMIT 5'),
+        )
+
+    def test_repeated_statements_fail_with_template_line(self):
+        with detect_n_plus_one():
+            with self.assertRaisesMessage(AssertionError, "4x from blog/n_plus_one.html:2") as raised:
+                self.render(Post.objects.all())
+            self.assertIn("N+1 queries in <unresolved> (GET /reviews/): 5 queries", str(raised.exception))
+            self.assertIn('FROM "blog_tag"', str(raised.exception))
+
+            response = self.render(Post.objects.prefetch_related("tags"))
+            self.assertEqual(response.status_code, 200)
+
+        # Off outside the block.
+        self.render(Post.objects.all())
+
+    def test_budget(self):
+        with detect_n_plus_one(budget=1):
+            with self.assertRaisesMessage(AssertionError, "Query budget exceeded in post-list"):
+                self.client.get(reverse("post-list"))
+        with detect_n_plus_one(budget=1, budgets={"post-list": 10}):
+            self.assertEqual(self.client.get(reverse("post-list")).status_code, 200)
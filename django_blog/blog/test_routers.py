@@ -0,0 +1,85 @@
+"""
+Tests for read-replica routing (blog.routers, blog.middleware).
+
+Covers:
+- Blog reads go to the replica, writes and non-blog models to the primary
+- Reads inside a write transaction stay on the primary
+- A client that writes is pinned to the primary for a while
+
+These use TransactionTestCase: inside TestCase's transaction every read
+would be routed to the primary. The test settings mirror the replica onto
+the test database, so both aliases see the same rows.
+"""
+
+import time
+
+from django.contrib.auth.models import User
+from django.db import connections, transaction
+from django.test import TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from .middleware import PIN_COOKIE
+from .models import Comment, Post
+from .search import get_search_backend
+
+
+@override_settings(BLOG_READ_REPLICAS=["replica"], BLOG_SEARCH_BACKEND="like")
+class ReplicaRoutingTests(TransactionTestCase):
+    databases = {"default", "replica"}
+
+    def setUp(self):
+        self.user = User.objects.create(username="reader")
+        self.post = Post.objects.create(title="Review", content="Worth watching.", author=self.user)
+
+    def tearDown(self):
+        # The FTS5 table is not a model, so the per-test flush leaves it alone.
+        get_search_backend("fts5").clear()
+
+    def queries_on(self, alias, func):
+        with CaptureQueriesContext(connections[alias]) as queries:
+            response = func()
+        return response, len(queries)
+
+    def test_reads_use_the_replica_and_writes_the_primary(self):
+        self.assertEqual(Post.objects.all().db, "replica")
+        self.assertEqual(Post.objects.get(pk=self.post.pk)._state.db, "replica")
+        self.assertEqual(self.post._state.db, "default")
+        self.assertEqual(User.objects.all().db, "default")
+        with transaction.atomic():
+            self.assertEqual(Post.objects.all().db, "default")
+
+    def test_read_views_use_the_replica(self):
+        for url in (
+            reverse("post-list"),
+            reverse("post-detail", args=[self.post.pk]),
+            reverse("comment-list", args=[self.post.pk]),
+            reverse("search") + "?q=review",
+        ):
+            with self.subTest(url=url):
+                response, replica_queries = self.queries_on("replica", lambda: self.client.get(url))
+                self.assertEqual(response.status_code, 200)
+                self.assertGreater(replica_queries, 0)
+                self.assertNotIn(PIN_COOKIE, response.cookies)
+
+    def test_writer_is_pinned_to_the_primary(self):
+        self.client.force_login(self.user)
+        response = self.client.post(reverse("comment-create", args=[self.post.pk]), {"content": "Agreed."})
+        self.assertEqual(response.status_code, 302)
+        self.assertIn(PIN_COOKIE, response.cookies)
+        self.assertEqual(Comment.objects.using("default").count(), 1)
+
+        url = reverse("comment-list", args=[self.post.pk])
+        response, replica_queries = self.queries_on("replica", lambda: self.client.get(url))
+        self.assertEqual(replica_queries, 0)
+        self.assertContains(response, "Agreed.")
+
+        # Once the pin expires, reads return to the replica.
+        self.client.cookies[PIN_COOKIE] = str(time.time() - 1)
+        _, replica_queries = self.queries_on("replica", lambda: self.client.get(url))
+        self.assertGreater(replica_queries, 0)
+
+    def test_forged_pin_is_ignored(self):
+        self.client.cookies[PIN_COOKIE] = str(time.time() + 3600)
+        _, replica_queries = self.queries_on("replica", lambda: self.client.get(reverse("post-list")))
+        self.assertGreater(replica_queries, 0)
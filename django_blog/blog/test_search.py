@@ -0,0 +1,167 @@
+"""
+Tests for the pluggable search backends behind search_posts.
+
+Covers:
+- FTS5 and the inverted index agree on matches and rank title hits first
+- Indexes follow Post saves/deletes and tag changes, once per transaction
+- Ranked results paginate with cursors
+- manage.py rebuild_search_index
+- manage.py benchmark_search times full result sets as well as one page
+"""
+
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import transaction
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from .models import Post, Tag
+from .search import FTS5SearchBackend, InvertedIndexSearchBackend, get_search_backend
+from .signals import IndexBatch
+from .transactions import pending
+
+
+class SearchBackendTests(TestCase):
+    backend_names = ("fts5", "inverted")
+
+    def setUp(self):
+        get_search_backend("inverted").clear()
+        self.author = User.objects.create(username="critic")
+        with self.captureOnCommitCallbacks(execute=True):
+            self.in_title = Post.objects.create(title="Heist thriller", content="Slick.", author=self.author)
+            self.in_content = Post.objects.create(
+                title="Weekend picks", content="A heist subplot and more.", author=self.author
+            )
+            self.unrelated = Post.objects.create(title="Cartoon", content="For kids.", author=self.author)
+
+    def ids(self, name, query):
+        return [post_id for _, post_id in get_search_backend(name).search(query, 10)]
+
+    def test_backends_rank_title_hits_first(self):
+        for name in self.backend_names:
+            with self.subTest(backend=name):
+                self.assertEqual(self.ids(name, "heist"), [self.in_title.pk, self.in_content.pk])
+
+    def test_prefix_and_all_terms_must_match(self):
+        for name in self.backend_names:
+            with self.subTest(backend=name):
+                self.assertEqual(self.ids(name, "hei thril"), [self.in_title.pk])
+
+    def test_user_input_is_not_fts_syntax(self):
+        self.assertEqual(FTS5SearchBackend.match_expression('heist" OR *'), '"heist"* "or"*')
+        self.assertEqual(self.ids("fts5", 'NEAR(" ^'), [])
+
+    def test_index_follows_saves_tags_and_deletes(self):
+        for name in self.backend_names:
+            self.ids(name, "warmup")  # builds the inverted index
+        with self.captureOnCommitCallbacks(execute=True):
+            self.unrelated.title = "Animated heist"
+            self.unrelated.save()
+            tag = Tag.objects.create(name="noir")
+            self.in_content.tags.add(tag)
+            self.in_title.delete()
+        for name in self.backend_names:
+            with self.subTest(backend=name):
+                self.assertCountEqual(self.ids(name, "heist"), [self.unrelated.pk, self.in_content.pk])
+                self.assertEqual(self.ids(name, "noir"), [self.in_content.pk])
+        with self.captureOnCommitCallbacks(execute=True):
+            tag.name = "neo-noir"
+            tag.save()
+            tag.posts.clear()
+        for name in self.backend_names:
+            with self.subTest(backend=name):
+                self.assertEqual(self.ids(name, "neo"), [])
+
+    def test_changes_are_indexed_once_per_transaction(self):
+        tag = Tag.objects.create(name="noir")
+        with mock.patch.object(FTS5SearchBackend, "index_posts") as index_posts:
+            with self.captureOnCommitCallbacks(execute=True) as callbacks:
+                self.in_title.title = "Heist noir"
+                self.in_title.save()
+                self.in_title.tags.add(tag)
+                tag.name = "neo-noir"
+                tag.save()
+                self.assertFalse(index_posts.called)
+        self.assertEqual(len([c for c in callbacks if isinstance(c, IndexBatch)]), 1)
+        self.assertEqual(index_posts.call_count, 1)
+        self.assertEqual([p.pk for p in index_posts.call_args.args[0]], [self.in_title.pk])
+
+    def test_rolled_back_changes_are_not_indexed(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            with transaction.atomic():
+                Post.objects.create(title="Never mind", content="Draft.", author=self.author)
+                transaction.set_rollback(True)
+            Post.objects.create(title="Kept review", content="Final.", author=self.author)
+        self.assertEqual(len(self.ids("fts5", "never")), 0)
+        self.assertEqual(len(self.ids("fts5", "kept")), 1)
+
+    def test_batches_discarded_by_a_rollback_are_not_joined(self):
+        with transaction.atomic():
+            Post.objects.create(title="Never mind", content="Draft.", author=self.author)
+            self.assertIsInstance(pending("search-index"), IndexBatch)
+            transaction.set_rollback(True)
+        self.assertIsNone(pending("search-index"))
+
+    def test_inverted_index_builds_from_database(self):
+        backend = InvertedIndexSearchBackend()
+        self.assertEqual([pk for _, pk in backend.search("cartoon", 5)], [self.unrelated.pk])
+
+    def test_inverted_index_catches_up_with_other_processes(self):
+        # Two copies stand in for two server processes sharing the cache.
+        writer, reader = InvertedIndexSearchBackend(), InvertedIndexSearchBackend()
+        for backend in (writer, reader):
+            self.assertEqual([pk for _, pk in backend.search("heist", 5)], [self.in_title.pk, self.in_content.pk])
+
+        late = Post.objects.create(title="Late heist", content="New.", author=self.author)
+        writer.index_posts([late])
+        writer.remove_posts([self.in_content.pk])
+        expected = [late.pk, self.in_title.pk]
+        with mock.patch("blog.search.iter_post_chunks") as rebuild:
+            self.assertEqual(sorted(pk for _, pk in writer.search("heist", 5)), sorted(expected))
+        rebuild.assert_not_called()
+        # The reader's copy is behind the shared version and is rebuilt.
+        Post.objects.filter(pk=self.in_content.pk).delete()
+        self.assertEqual(sorted(pk for _, pk in reader.search("heist", 5)), sorted(expected))
+
+    def test_rebuild_command_restores_a_cleared_index(self):
+        get_search_backend("fts5").clear()
+        self.assertEqual(self.ids("fts5", "heist"), [])
+        out = StringIO()
+        call_command("rebuild_search_index", "--backend", "fts5", "--chunk-size", "2", stdout=out)
+        self.assertEqual(self.ids("fts5", "heist"), [self.in_title.pk, self.in_content.pk])
+        self.assertIn("Indexed 3 posts", out.getvalue())
+
+    def test_rebuild_command_refuses_backends_without_an_index(self):
+        for name in ("inverted", "like"):
+            with self.subTest(backend=name), self.assertRaises(CommandError):
+                call_command("rebuild_search_index", "--backend", name, stdout=StringIO())
+
+    def test_benchmark_times_the_first_page_and_every_match(self):
+        out = StringIO()
+        call_command("benchmark_search", "--posts", "40", "--repeat", "1", "--query", "drama", stdout=out)
+        rows = [line.split() for line in out.getvalue().splitlines() if line.split()[1:2] == ["drama"]]
+        self.assertEqual([row[0] for row in rows], ["like", "fts5", "inverted"])
+        # Every backend returns all matches, not only the first page.
+        self.assertEqual(len({row[-1] for row in rows}), 1)
+        self.assertGreater(int(rows[0][-1]), 10)
+
+    def test_ranked_results_paginate(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            for i in range(12):
+                Post.objects.create(title=f"Heist {i}", content="More.", author=self.author)
+        for name in self.backend_names:
+            with override_settings(BLOG_SEARCH_BACKEND=name), self.subTest(backend=name):
+                url = reverse("search")
+                first = self.client.get(url, {"q": "heist"}).context["page_obj"]
+                self.assertTrue(first.has_next())
+                second = self.client.get(url, {"q": "heist", "cursor": first.next_cursor}).context["page_obj"]
+                back = self.client.get(url, {"q": "heist", "cursor": second.previous_cursor}).context["page_obj"]
+                seen = [p.pk for p in first] + [p.pk for p in second]
+                self.assertEqual(len(seen), 14)
+                self.assertEqual(len(set(seen)), 14)
+                self.assertFalse(second.has_next())
+                self.assertEqual([p.pk for p in back], [p.pk for p in first])
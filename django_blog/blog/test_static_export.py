@@ -0,0 +1,93 @@
+"""
+Tests for manage.py export_static_site.
+
+Covers:
+- Post, feed and tag pages are written with static pagination links
+- Re-exporting rewrites only pages whose content changed
+- Pages of deleted posts are removed and the manifest follows
+- Tag names that are not slugs, and paths outside the output directory,
+  are never written
+"""
+
+import json
+import tempfile
+from io import StringIO
+from pathlib import Path
+
+from django.contrib.auth.models import User
+from django.core.exceptions import SuspiciousFileOperation
+from django.core.management import call_command
+from django.test import TestCase
+
+from .models import Post, Tag
+from .static_export import write_if_changed
+
+
+class ExportStaticSiteTests(TestCase):
+    def setUp(self):
+        self.output = Path(self.enterContext(tempfile.TemporaryDirectory()))
+        self.author = User.objects.create(username="writer")
+        tag = Tag.objects.create(name="noir")
+        self.posts = []
+        for i in range(12):
+            post = Post.objects.create(title=f"Review {i}", content="Worth watching.", author=self.author)
+            post.tags.add(tag)
+            self.posts.append(post)
+
+    def export(self):
+        out = StringIO()
+        call_command("export_static_site", str(self.output), "--workers", "0", stdout=out)
+        manifest = json.loads((self.output / "manifest.json").read_text())
+        return out.getvalue(), manifest["files"]
+
+    def test_pages_and_links(self):
+        _, files = self.export()
+        for path in (
+            f"post/{self.posts[0].pk}/index.html",
+            "post/index.html",
+            "post/page/2/index.html",
+            "tags/noir/index.html",
+            "tags/noir/page/2/index.html",
+        ):
+            self.assertIn(path, files)
+            self.assertTrue((self.output / path).exists())
+        first = (self.output / "post/index.html").read_text()
+        self.assertIn('href="/post/page/2/"', first)
+        self.assertNotIn("cursor=", first)
+        self.assertIn('href="/tags/noir/"', (self.output / "tags/noir/page/2/index.html").read_text())
+        self.assertTrue(any(path.startswith("static/blog/css/") for path in files))
+
+    def test_reexport_writes_only_changed_files(self):
+        self.export()
+        out, files = self.export()
+        self.assertIn(f"0 written, {len(files)} unchanged", out)
+
+        self.posts[0].title = "Edited"
+        self.posts[0].save()
+        out, _ = self.export()
+        # Its detail page and the listing pages that show it.
+        self.assertIn("3 written", out)
+
+    def test_deleted_posts_are_removed(self):
+        self.export()
+        path = f"post/{self.posts[0].pk}/index.html"
+        self.posts[0].delete()
+        out, files = self.export()
+        self.assertNotIn(path, files)
+        self.assertFalse((self.output / path).exists())
+        self.assertIn("1 removed", out)
+
+    def test_unsafe_tag_names_are_skipped(self):
+        # Listed as tagging a post, without one: post_list.html cannot link
+        # to a tag whose name is not a slug.
+        for name in ("../escaped", "a/b"):
+            Tag.objects.create(name=name, post_count=1)
+        _, files = self.export()
+        self.assertFalse(any(".." in path or path.startswith("tags/a/") for path in files))
+        self.assertFalse((self.output.parent / "escaped").exists())
+        self.assertIn("tags/noir/index.html", files)
+
+    def test_paths_outside_the_output_are_refused(self):
+        with self.assertRaises(SuspiciousFileOperation):
+            write_if_changed(self.output, "../outside.html", b"<p>", None)
+        self.assertFalse((self.output.parent / "outside.html").exists())
@@ -0,0 +1,101 @@
+"""
+Tests for the materialized tag popularity counters and the tag cloud.
+
+Covers:
+- Tag.post_count follows add/remove/clear from both sides of Post.tags,
+  set() and post deletion, and survives saving a stale Tag instance
+- manage.py repair_tag_counts
+- The tag-cloud endpoint, its ordering and its cache invalidation
+"""
+
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+
+from .models import Post, Tag
+
+
+class TagPostCountTests(TestCase):
+    def setUp(self):
+        self.author = User.objects.create(username="writer")
+        self.drama, self.noir = Tag.objects.create(name="drama"), Tag.objects.create(name="noir")
+        self.first = Post.objects.create(title="First", content="One.", author=self.author)
+        self.second = Post.objects.create(title="Second", content="Two.", author=self.author)
+
+    def counts(self):
+        return dict(Tag.objects.values_list("name", "post_count"))
+
+    def test_forward_changes(self):
+        self.first.tags.add(self.drama, self.noir)
+        self.first.tags.add(self.drama)  # already linked
+        self.second.tags.add(self.drama)
+        self.assertEqual(self.counts(), {"drama": 2, "noir": 1})
+
+        self.first.tags.remove(self.noir, self.noir)
+        self.second.tags.remove(self.noir)  # never linked
+        self.assertEqual(self.counts(), {"drama": 2, "noir": 0})
+
+        self.first.tags.set([self.noir])
+        self.assertEqual(self.counts(), {"drama": 1, "noir": 1})
+
+        self.first.tags.clear()
+        self.assertEqual(self.counts(), {"drama": 1, "noir": 0})
+
+    def test_reverse_changes(self):
+        self.drama.posts.add(self.first, self.second)
+        self.assertEqual(self.counts()["drama"], 2)
+        self.drama.posts.remove(self.first, self.first)
+        self.assertEqual(self.counts()["drama"], 1)
+        self.drama.posts.clear()
+        self.assertEqual(self.counts()["drama"], 0)
+
+    def test_post_deletion(self):
+        self.first.tags.add(self.drama, self.noir)
+        self.second.tags.add(self.drama)
+        self.first.delete()
+        self.assertEqual(self.counts(), {"drama": 1, "noir": 0})
+
+    def test_saving_a_stale_tag_keeps_its_count(self):
+        self.first.tags.add(self.drama)
+        self.drama.name = "melodrama"
+        self.drama.save()
+        self.assertEqual(self.counts()["melodrama"], 1)
+
+    def test_repair_command(self):
+        self.first.tags.add(self.drama)
+        Tag.objects.update(post_count=7)
+        call_command("repair_tag_counts", stdout=StringIO())
+        self.assertEqual(self.counts(), {"drama": 1, "noir": 0})
+
+
+class TagCloudTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create(username="writer")
+        with self.captureOnCommitCallbacks(execute=True):
+            for i, names in enumerate([["drama", "noir"], ["drama"], ["comedy"]]):
+                post = Post.objects.create(title=f"Review {i}", content="Text.", author=self.author)
+                post.tags.set(Tag.objects.resolve(names))
+            Tag.objects.create(name="unused")
+
+    def cloud(self):
+        return self.client.get(reverse("tag-cloud")).json()["tags"]
+
+    def test_cloud_lists_used_tags_most_popular_first(self):
+        self.assertEqual(
+            [(tag["name"], tag["post_count"]) for tag in self.cloud()],
+            [("drama", 2), ("comedy", 1), ("noir", 1)],
+        )
+        self.assertEqual(self.cloud()[0]["url"], reverse("posts-by-tag", args=["drama"]))
+
+    def test_cloud_is_cached_until_tags_change(self):
+        self.cloud()
+        with self.assertNumQueries(0):
+            self.cloud()
+        with self.captureOnCommitCallbacks(execute=True):
+            Post.objects.get(title="Review 2").tags.add(Tag.objects.get(name="noir"))
+        self.assertEqual(self.cloud()[1], {"name": "noir", "post_count": 2, "url": "/tags/noir/"})
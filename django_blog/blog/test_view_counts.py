@@ -0,0 +1,130 @@
+"""
+Tests for write-behind post view counting and trending posts.
+
+Covers:
+- Detail views are buffered in memory and not written per request
+- A flush writes one UPDATE per distinct count and skips deleted posts
+- Reaching BLOG_VIEW_FLUSH_THRESHOLD flushes at the end of the request
+- PostQuerySet.trending() and the trending endpoint
+"""
+
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from .models import Post, PostDailyViews
+from .view_counts import view_counter
+
+
+class ViewCounterTests(TestCase):
+    def setUp(self):
+        view_counter.discard()
+        self.addCleanup(view_counter.discard)
+        self.author = User.objects.create(username="writer")
+        self.posts = [
+            Post.objects.create(title=f"Post {n}", content="Text.", author=self.author) for n in range(3)
+        ]
+
+    def view(self, post, times=1):
+        for _ in range(times):
+            response = self.client.get(reverse("post-detail", args=[post.pk]))
+            self.assertEqual(response.status_code, 200)
+
+    def view_counts(self):
+        return dict(Post.objects.values_list("pk", "view_count"))
+
+    def test_views_are_buffered_until_flushed(self):
+        first, second, _ = self.posts
+        self.view(first, 2)
+        self.view(second)
+        self.assertEqual(view_counter.pending(), {first.pk: 2, second.pk: 1})
+        self.assertEqual(set(self.view_counts().values()), {0})
+
+        self.assertEqual(view_counter.flush(), 3)
+        self.assertEqual(view_counter.pending(), {})
+        self.assertEqual(self.view_counts(), {first.pk: 2, second.pk: 1, self.posts[2].pk: 0})
+        today = timezone.localdate()
+        self.assertEqual(
+            dict(PostDailyViews.objects.filter(day=today).values_list("post_id", "views")),
+            {first.pk: 2, second.pk: 1},
+        )
+
+        # A second flush adds to the same rows.
+        self.view(first)
+        view_counter.flush()
+        self.assertEqual(self.view_counts()[first.pk], 3)
+        self.assertEqual(PostDailyViews.objects.get(post=first, day=today).views, 3)
+
+    def test_flush_batches_updates_and_skips_deleted_posts(self):
+        first, second, third = self.posts
+        for post_id, views in ((first.pk, 2), (second.pk, 2), (third.pk, 5)):
+            for _ in range(views):
+                view_counter.record(post_id)
+        view_counter.record(third.pk + 100)  # deleted since it was viewed
+
+        with CaptureQueriesContext(connection) as queries:
+            view_counter.flush()
+        updates = [q["sql"] for q in queries if q["sql"].startswith("UPDATE")]
+        # One for posts and one for daily rows per distinct count (2 and 5).
+        self.assertEqual(len(updates), 4)
+        self.assertEqual(self.view_counts(), {first.pk: 2, second.pk: 2, third.pk: 5})
+        self.assertEqual(PostDailyViews.objects.count(), 3)
+
+    @override_settings(BLOG_VIEW_FLUSH_THRESHOLD=3)
+    def test_threshold_flushes_at_end_of_request(self):
+        first = self.posts[0]
+        self.view(first, 2)
+        self.assertEqual(self.view_counts()[first.pk], 0)
+        self.view(first)
+        self.assertEqual(view_counter.pending(), {})
+        self.assertEqual(self.view_counts()[first.pk], 3)
+
+    def test_conditional_hits_are_not_counted(self):
+        first = self.posts[0]
+        url = reverse("post-detail", args=[first.pk])
+        etag = self.client.get(url)["ETag"]
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(view_counter.pending(), {first.pk: 1})
+
+
+class TrendingTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        author = User.objects.create(username="writer")
+        self.old, self.steady, self.hot = [
+            Post.objects.create(title=title, content="Text.", author=author) for title in ("Old", "Steady", "Hot")
+        ]
+        today = timezone.localdate()
+        PostDailyViews.objects.bulk_create([
+            PostDailyViews(post=self.old, day=today - timedelta(days=10), views=500),
+            PostDailyViews(post=self.steady, day=today - timedelta(days=3), views=20),
+            PostDailyViews(post=self.steady, day=today, views=20),
+            PostDailyViews(post=self.hot, day=today, views=30),
+        ])
+
+    def test_trending_sums_recent_days(self):
+        trending = Post.objects.trending(days=7)
+        self.assertEqual([(p.title, p.recent_views) for p in trending], [("Steady", 40), ("Hot", 30)])
+        self.assertEqual([p.title for p in Post.objects.trending(days=1)], ["Hot", "Steady"])
+        self.assertEqual([p.title for p in Post.objects.trending(days=30)][0], "Old")
+
+    def test_trending_endpoint(self):
+        response = self.client.get(reverse("trending"), {"days": "1"})
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data["days"], 1)
+        self.assertEqual(
+            [(p["title"], p["views"]) for p in data["posts"]], [("Hot", 30), ("Steady", 20)]
+        )
+        self.assertEqual(data["posts"][0]["url"], reverse("post-detail", args=[self.hot.pk]))
+
+        # Out-of-range and malformed values fall back to sane windows.
+        self.assertEqual(self.client.get(reverse("trending"), {"days": "999"}).json()["days"], 30)
+        self.assertEqual(self.client.get(reverse("trending"), {"days": "week"}).json()["days"], 7)
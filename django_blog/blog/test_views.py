@@ -0,0 +1,244 @@
+"""
+Tests for the blog list views.
+
+Covers:
+- Query counts for every view that renders blog/post_list.html
+  (PostListView, PostByTagListView, posts_by_tag, search_posts)
+- Keyset pagination (?cursor=) for the feed, tag and search listings
+- Post card fragment caching and its invalidation
+- Conditional GET (ETag / Last-Modified) on the feeds and post detail
+
+The list template touches post.author.username and post.tags.all for every
+row, so each view must load authors and tags up front. The query count is
+asserted for several data sizes to prove it does not grow with the page,
+and every request these tests make is checked for N+1 queries and against
+QUERY_BUDGET (django_perf.nplusone).
+"""
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from django_perf.nplusone import QueryBudgetTestMixin
+
+from .models import Comment, Post, Tag
+from . import views
+
+# Queries any one page of the blog may run, sessions and auth included.
+QUERY_BUDGET = 10
+
+
+class PostListQueryCountTests(QueryBudgetTestMixin, TestCase):
+    query_budget = QUERY_BUDGET
+
+    # 1 query for posts joined to their authors, 1 each for the prefetched
+    # tags and image variants.
+    expected_queries = 3
+
+    def setUp(self):
+        self.tag_a = Tag.objects.create(name="drama")
+        self.tag_b = Tag.objects.create(name="comedy")
+
+    def create_posts(self, count):
+        # Run the on-commit search indexing so search_posts sees the posts.
+        with self.captureOnCommitCallbacks(execute=True):
+            for i in range(count):
+                author = User.objects.create(username=f"writer{Post.objects.count()}")
+                post = Post.objects.create(title=f"Review {i}", content="Worth watching.", author=author)
+                post.tags.set([self.tag_a, self.tag_b])
+
+    def assert_constant_queries(self, url, marker):
+        for size in (1, 5, 20):
+            self.create_posts(size)
+            with self.assertNumQueries(self.expected_queries):
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertContains(response, marker)
+
+    def test_post_list_query_count(self):
+        self.assert_constant_queries(reverse("post-list"), "comedy")
+
+    def test_posts_by_tag_view_query_count(self):
+        self.assert_constant_queries(reverse("posts-by-tag", args=["drama"]), "comedy")
+
+    @override_settings(BLOG_SEARCH_BACKEND="fts5")
+    def test_search_query_count(self):
+        # One extra query: the ranked id lookup in the search index.
+        self.expected_queries += 1
+        self.assert_constant_queries(f"{reverse('search')}?q=Review", "comedy")
+
+    def test_posts_by_tag_function_query_count(self):
+        for size in (1, 5, 20):
+            self.create_posts(size)
+            request = self.client.get(reverse("post-list")).wsgi_request
+            with self.assertNumQueries(self.expected_queries):
+                response = views.posts_by_tag(request, "drama")
+            self.assertEqual(response.status_code, 200)
+
+
+class PostListPaginationTests(QueryBudgetTestMixin, TestCase):
+    query_budget = QUERY_BUDGET
+
+    def setUp(self):
+        self.author = User.objects.create(username="writer")
+        self.tag = Tag.objects.create(name="drama")
+        with self.captureOnCommitCallbacks(execute=True):
+            for i in range(25):
+                post = Post.objects.create(title=f"Review {i:02d}", content="Worth watching.", author=self.author)
+                post.tags.add(self.tag)
+
+    def walk(self, url):
+        titles, cursors, cursor = [], [], None
+        while True:
+            response = self.client.get(url, {"cursor": cursor} if cursor else {})
+            self.assertEqual(response.status_code, 200)
+            page = response.context["page_obj"]
+            titles.extend(post.title for post in page)
+            cursors.append(cursor)
+            if not page.has_next():
+                return titles, cursors
+            cursor = page.next_cursor
+
+    def test_feed_pages_cover_every_post_once_newest_first(self):
+        titles, cursors = self.walk(reverse("post-list"))
+        self.assertEqual(len(cursors), 3)
+        expected = list(Post.objects.order_by("-published_date", "-id").values_list("title", flat=True))
+        self.assertEqual(titles, expected)
+
+    def test_previous_cursor_returns_the_page_before(self):
+        url = reverse("posts-by-tag", args=["drama"])
+        first = self.client.get(url).context["page_obj"]
+        second = self.client.get(url, {"cursor": first.next_cursor}).context["page_obj"]
+        back = self.client.get(url, {"cursor": second.previous_cursor}).context["page_obj"]
+        self.assertEqual([p.pk for p in back], [p.pk for p in first])
+        self.assertFalse(back.has_previous())
+
+    def test_cursor_is_stable_when_new_posts_arrive(self):
+        url = reverse("post-list")
+        first = self.client.get(url).context["page_obj"]
+        Post.objects.create(title="Brand new", content="Fresh.", author=self.author)
+        second = self.client.get(url, {"cursor": first.next_cursor}).context["page_obj"]
+        self.assertEqual(second[0].pk, first[-1].pk - 1)
+
+    def test_search_results_are_paginated(self):
+        response = self.client.get(reverse("search"), {"q": "Review"})
+        page = response.context["page_obj"]
+        self.assertEqual(len(page), 10)
+        self.assertContains(response, "q=Review&amp;cursor=")
+
+    def test_invalid_cursor_returns_404(self):
+        response = self.client.get(reverse("post-list"), {"cursor": "not-a-cursor"})
+        self.assertEqual(response.status_code, 404)
+
+
+class PostCardCacheTests(QueryBudgetTestMixin, TestCase):
+    query_budget = QUERY_BUDGET
+
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create(username="writer")
+        self.tag = Tag.objects.create(name="drama")
+        self.post = Post.objects.create(title="Cached review", content="Worth watching.", author=self.author)
+        self.post.tags.add(self.tag)
+
+    def render_feed(self):
+        return self.client.get(reverse("post-list")).content.decode()
+
+    def test_cached_card_is_reused_until_the_post_changes(self):
+        self.assertIn("Cached review", self.render_feed())
+        # A write that skips save() leaves updated_at alone, so the cached card is served.
+        Post.objects.filter(pk=self.post.pk).update(title="Sneaky edit")
+        self.assertIn("Cached review", self.render_feed())
+
+        self.post.refresh_from_db()
+        self.post.title = "Edited review"
+        self.post.save()
+        self.assertIn("Edited review", self.render_feed())
+
+    def test_tag_changes_invalidate_the_card(self):
+        self.render_feed()
+        self.post.tags.add(Tag.objects.create(name="noir"))
+        self.assertIn("noir", self.render_feed())
+
+        self.tag.name = "melodrama"
+        self.tag.save()
+        self.assertIn("melodrama", self.render_feed())
+
+    def test_author_rename_invalidates_the_card(self):
+        self.render_feed()
+        self.author.username = "renamed-writer"
+        self.author.save()
+        self.assertIn("renamed-writer", self.render_feed())
+
+    def test_login_does_not_invalidate_cards(self):
+        before = Post.objects.get(pk=self.post.pk).updated_at
+        self.author.save(update_fields=["last_login"])
+        self.assertEqual(Post.objects.get(pk=self.post.pk).updated_at, before)
+
+
+class ConditionalGetTests(QueryBudgetTestMixin, TestCase):
+    query_budget = QUERY_BUDGET
+
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create(username="writer")
+        with self.captureOnCommitCallbacks(execute=True):
+            self.post = Post.objects.create(title="Review", content="Worth watching.", author=self.author)
+
+    def revalidate(self, url, response, queries):
+        with self.assertNumQueries(queries):
+            return self.client.get(url, headers={"if-none-match": response["ETag"]})
+
+    def test_unchanged_feed_is_revalidated_without_queries(self):
+        url = reverse("post-list")
+        first = self.client.get(url)
+        self.assertIn("Last-Modified", first)
+        self.assertEqual(self.revalidate(url, first, 0).status_code, 304)
+
+        modified_since = self.client.get(url, headers={"if-modified-since": first["Last-Modified"]})
+        self.assertEqual(modified_since.status_code, 304)
+
+    def test_feed_etag_changes_after_commit(self):
+        url = reverse("posts-by-tag", args=["drama"])
+        first = self.client.get(url)
+        with self.captureOnCommitCallbacks(execute=True):
+            Comment.objects.create(post=self.post, author=self.author, content="Agreed.")
+            self.assertEqual(self.revalidate(url, first, 0).status_code, 304)
+        self.assertEqual(self.revalidate(url, first, 1).status_code, 200)
+
+    def test_feed_etag_differs_per_user(self):
+        url = reverse("post-list")
+        anonymous = self.client.get(url)
+        self.client.force_login(self.author)
+        self.assertEqual(self.client.get(url, headers={"if-none-match": anonymous["ETag"]}).status_code, 200)
+
+    def test_feed_etag_changes_when_the_csrf_cookie_rotates(self):
+        url = reverse("post-list")
+        self.client.force_login(self.author)
+        self.client.cookies[settings.CSRF_COOKIE_NAME] = "a" * 32
+        first = self.client.get(url)
+        self.assertEqual(self.client.get(url, headers={"if-none-match": first["ETag"]}).status_code, 304)
+        # As after logging in again: the cached page's logout token is stale.
+        self.client.cookies[settings.CSRF_COOKIE_NAME] = "b" * 32
+        self.assertEqual(self.client.get(url, headers={"if-none-match": first["ETag"]}).status_code, 200)
+
+    def test_post_detail_revalidates_in_one_query(self):
+        url = reverse("post-detail", args=[self.post.pk])
+        first = self.client.get(url)
+        self.assertContains(first, "Worth watching.")
+        self.assertEqual(self.revalidate(url, first, 1).status_code, 304)
+
+        comment = Comment.objects.create(post=self.post, author=self.author, content="Agreed.")
+        second = self.client.get(url, headers={"if-none-match": first["ETag"]})
+        self.assertEqual(second.status_code, 200)
+
+        # Comment edits don't touch the post row but still change the ETag.
+        Comment.objects.filter(pk=comment.pk).update(updated_at=comment.updated_at + timedelta(seconds=1))
+        self.assertEqual(self.client.get(url, headers={"if-none-match": second["ETag"]}).status_code, 200)
+
+    def test_missing_post_is_404(self):
+        self.assertEqual(self.client.get(reverse("post-detail", args=[0])).status_code, 404)
@@ -0,0 +1,58 @@
+"""
+On-commit callbacks that later changes in the same transaction can join.
+
+signals.IndexBatch and conditional.VersionBump gather the work of a whole
+transaction into one transaction.on_commit callback: register() records
+it per thread, database alias and key, and pending() finds it again until
+it runs. The registry holds callbacks weakly, leaving Django's on-commit
+list with the only strong reference, so when a rollback of the
+transaction (or of the savepoint the callback was registered in) discards
+it, it drops out of the registry as well and the next change registers a
+new one.
+"""
+
+import threading
+import weakref
+
+from django.db import transaction
+
+_local = threading.local()
+
+
+def _registry():
+    try:
+        return _local.registry
+    except AttributeError:
+        _local.registry = weakref.WeakValueDictionary()
+        return _local.registry
+
+
+class PendingCallback:
+    """Base of callbacks passed to register(); subclasses implement run()."""
+
+    registry_key = None
+
+    def __call__(self):
+        registry = _registry()
+        if registry.get(self.registry_key) is self:
+            del registry[self.registry_key]
+        self.run()
+
+    def run(self):
+        raise NotImplementedError
+
+
+def pending(key, using=None):
+    """The callback registered under ``key`` that the current transaction
+    on ``using`` will run on commit, or None.
+    """
+    return _registry().get((transaction.get_connection(using).alias, key))
+
+
+def register(key, callback, using=None):
+    """transaction.on_commit(callback), findable through pending() until it
+    runs. Outside a transaction it runs immediately.
+    """
+    callback.registry_key = (transaction.get_connection(using).alias, key)
+    _registry()[callback.registry_key] = callback
+    transaction.on_commit(callback, using=using)
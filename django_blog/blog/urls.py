@@ -1,6 +1,6 @@
-from django.urls import path
+from django.urls import path, re_path
 from django.contrib.auth import views as auth_views
-from . import views
+from . import async_views, feeds, views
 
 urlpatterns = [
     path('login/', auth_views.LoginView.as_view(template_name='blog/login.html'), name='login'),
@@ -15,13 +15,27 @@ urlpatterns = [
     path('post/<int:pk>/delete/', views.PostDeleteView.as_view(), name='post-delete'),
 
     path('post/<int:pk>/comments/', views.CommentListView.as_view(), name='comment-list'),
+    path('post/<int:pk>/comments/since/', views.comments_since, name='comments-since'),
     path('post/<int:pk>/comments/new/', views.CommentCreateView.as_view(), name='comment-create'),
     path('comment/<int:pk>/update/', views.CommentUpdateView.as_view(), name='comment-update'),
     path('comment/<int:pk>/delete/', views.CommentDeleteView.as_view(), name='comment-delete'),
 
     path('search/', views.search_posts, name='search'),
+    re_path(r'^feed\.(?P<feed_format>rss|atom|json)$', feeds.syndication_feed, name='feed'),
+    re_path(
+        r'^tags/(?P<tag_slug>[-\w]+)/feed\.(?P<feed_format>rss|atom|json)$',
+        feeds.syndication_feed, name='tag-feed',
+    ),
+    path('tag-cloud/', views.tag_cloud, name='tag-cloud'),
+    path('trending/', views.trending, name='trending'),
     path('tags/<slug:tag_slug>/', views.PostByTagListView.as_view(), name='posts-by-tag'),
 
+    # Async versions of the read views, for ASGI deployments.
+    path('async/post/', async_views.post_list, name='async-post-list'),
+    path('async/post/<int:pk>/', async_views.post_detail, name='async-post-detail'),
+    path('async/search/', async_views.search_posts, name='async-search'),
+    path('async/tags/<slug:tag_slug>/', async_views.posts_by_tag, name='async-posts-by-tag'),
+
      # Password reset URLs
     path('password-reset/', auth_views.PasswordResetView.as_view(
         template_name='blog/password_reset.html'
@@ -0,0 +1,117 @@
+"""
+Write-behind view counting for post detail pages.
+
+record() only bumps an in-memory counter, so a page view never waits on
+(or serializes) a database write. At the end of a request, once the
+response has been sent, the buffer is flushed if BLOG_VIEW_FLUSH_INTERVAL
+seconds have passed since the last flush or BLOG_VIEW_FLUSH_THRESHOLD
+views are pending. A flush is one transaction with one
+``UPDATE ... SET view_count = view_count + n`` per distinct n, plus the
+same for today's PostDailyViews rows behind PostQuerySet.trending().
+
+Each process buffers its own views; the flushed increments add up. Views
+still buffered when a process exits are lost, which is the trade-off for
+not writing on every read.
+"""
+
+import logging
+import threading
+import time
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.core.signals import request_finished
+from django.db import transaction
+from django.db.models import F
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .models import Post, PostDailyViews
+from .routers import PRIMARY_DB
+
+logger = logging.getLogger(__name__)
+
+
+class ViewCounter:
+    def __init__(self):
+        self._pending = Counter()
+        self._lock = threading.Lock()
+        self._flushing = threading.Lock()
+        self._last_flush = time.monotonic()
+
+    def record(self, post_id):
+        with self._lock:
+            self._pending[post_id] += 1
+
+    def pending(self):
+        with self._lock:
+            return dict(self._pending)
+
+    def discard(self):
+        """Drop buffered views without writing them."""
+        with self._lock:
+            self._pending.clear()
+
+    def due(self):
+        with self._lock:
+            pending = self._pending.total()
+        if not pending:
+            return False
+        interval = getattr(settings, 'BLOG_VIEW_FLUSH_INTERVAL', 5)
+        threshold = getattr(settings, 'BLOG_VIEW_FLUSH_THRESHOLD', 500)
+        return pending >= threshold or time.monotonic() - self._last_flush >= interval
+
+    def flush(self):
+        """Write buffered views to the database; returns how many."""
+        # One flush at a time; a request that finds one running moves on.
+        if not self._flushing.acquire(blocking=False):
+            return 0
+        try:
+            with self._lock:
+                pending, self._pending = self._pending, Counter()
+                self._last_flush = time.monotonic()
+            if pending:
+                try:
+                    write_views(pending)
+                except Exception:
+                    # Put them back for the next flush rather than losing them.
+                    with self._lock:
+                        self._pending.update(pending)
+                    raise
+            return pending.total()
+        finally:
+            self._flushing.release()
+
+
+def write_views(pending):
+    today = timezone.localdate()
+    posts = Post.objects.using(PRIMARY_DB)
+    # Posts deleted since they were viewed drop out here.
+    existing = set(posts.filter(pk__in=list(pending)).values_list('pk', flat=True))
+    by_count = defaultdict(list)
+    for post_id, views in pending.items():
+        if post_id in existing:
+            by_count[views].append(post_id)
+    if not by_count:
+        return
+    daily = PostDailyViews.objects.using(PRIMARY_DB)
+    with transaction.atomic(using=PRIMARY_DB):
+        daily.bulk_create(
+            [PostDailyViews(post_id=post_id, day=today) for post_id in sorted(existing)],
+            ignore_conflicts=True,
+        )
+        for views, post_ids in by_count.items():
+            posts.filter(pk__in=post_ids).update(view_count=F('view_count') + views)
+            daily.filter(post_id__in=post_ids, day=today).update(views=F('views') + views)
+
+
+view_counter = ViewCounter()
+
+
+@receiver(request_finished)
+def flush_view_counts(sender, **kwargs):
+    if view_counter.due():
+        try:
+            view_counter.flush()
+        except Exception:
+            logger.exception('Could not flush post view counts')
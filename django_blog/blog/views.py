@@ -1,13 +1,35 @@
+from django.http import JsonResponse
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required
 from django.views.generic import ListView, DetailView, CreateView, UpdateView, DeleteView
-from django.urls import reverse_lazy
+from django.core.cache import cache
+from django.urls import reverse, reverse_lazy
+from django.utils.decorators import method_decorator
+from django.views.decorators.http import condition
+from django.db import transaction
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
-from django.db.models import Q
 
 
-from .models import Post, Comment
+from .conditional import feed_etag, feed_last_modified, feed_state, post_etag, post_last_modified
+from .models import Post, Comment, Tag
 from .forms import ProfileForm, CommentForm, PostForm, UserRegisterForm
+from .pagination import KeysetPaginationMixin, KeysetPaginator, paginate_request
+from .routers import PRIMARY_DB
+from .search import SearchPaginator, get_search_backend
+from .view_counts import view_counter
+
+POSTS_PER_PAGE = 10
+POST_ORDERING = ['-published_date', '-id']
+# ?sort=discussed on the feed; served by blog_post_discussed_idx.
+DISCUSSED_ORDERING = ['-comment_count', '-id']
+COMMENTS_PER_PAGE = 20
+COMMENTS_PER_POLL = 50
+COMMENT_ORDERING = ['-created_at', '-id']
+TAG_CLOUD_SIZE = 50
+TAG_CLOUD_CACHE_TIMEOUT = 60 * 60
+TRENDING_SIZE = 10
+TRENDING_MAX_DAYS = 30
+TRENDING_CACHE_TIMEOUT = 5 * 60
 
 def register(request):
     if request.method == 'POST':
@@ -31,20 +53,46 @@ def profile(request):
     return render(request, 'blog/profile.html', {'form': form})
 
 
-class PostListView(ListView):
+# Feed pages answer If-None-Match/If-Modified-Since from the cached feed
+# version without touching the database.
+feed_condition = method_decorator(
+    condition(etag_func=feed_etag, last_modified_func=feed_last_modified), name='get'
+)
+
+
+@feed_condition
+class PostListView(KeysetPaginationMixin, ListView):
     model = Post
+    queryset = Post.objects.for_listing()
     template_name = 'blog/post_list.html'
     context_object_name = 'posts'
-    ordering = ['-published_date']
+    ordering = POST_ORDERING
+    paginate_by = POSTS_PER_PAGE
+
+    def get_ordering(self):
+        if self.request.GET.get('sort') == 'discussed':
+            return DISCUSSED_ORDERING
+        return super().get_ordering()
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['sort'] = 'discussed' if self.get_ordering() == DISCUSSED_ORDERING else 'latest'
+        return context
+
 
-class PostByTagListView(ListView):
+@feed_condition
+class PostByTagListView(KeysetPaginationMixin, ListView):
     model = Post
     template_name = 'blog/post_list.html'
     context_object_name = 'posts'
+    ordering = POST_ORDERING
+    paginate_by = POSTS_PER_PAGE
 
     def get_queryset(self):
         tag_slug = self.kwargs.get('tag_slug')
-        return Post.objects.filter(tags__name=tag_slug).distinct()
+        # Tag names are unique and a post carries a tag once, so the join
+        # cannot duplicate rows and needs no DISTINCT.
+        return Post.objects.for_listing().filter(tags__name=tag_slug)
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -52,10 +100,59 @@ class PostByTagListView(ListView):
         return context
 
 
+def tag_cloud(request):
+    """The most used tags with their post counts, as JSON.
+
+    Reads the materialized Tag.post_count through blog_tag_popular_idx and
+    caches the result per feed version, which every tag change bumps.
+    """
+    version, _ = feed_state()
+    key = f'blog:tag-cloud:{version}'
+    tags = cache.get(key)
+    if tags is None:
+        # Read the primary so a lagging replica is not cached as this version.
+        popular = Tag.objects.using(PRIMARY_DB).filter(post_count__gt=0).order_by('-post_count', 'name')
+        tags = [
+            {'name': name, 'post_count': count, 'url': reverse('posts-by-tag', args=[name])}
+            for name, count in popular.values_list('name', 'post_count')[:TAG_CLOUD_SIZE]
+        ]
+        cache.set(key, tags, TAG_CLOUD_CACHE_TIMEOUT)
+    return JsonResponse({'tags': tags})
+
+
+def trending(request):
+    """The most viewed posts of the last ``?days=`` days (default 7), as JSON.
+
+    Built on flushed counts only (see blog.view_counts), so it lags real
+    traffic by a flush interval anyway; caching it for a few minutes more
+    keeps the aggregate off the hot path.
+    """
+    try:
+        days = min(max(int(request.GET.get('days', 7)), 1), TRENDING_MAX_DAYS)
+    except ValueError:
+        days = 7
+    key = f'blog:trending:{days}'
+    posts = cache.get(key)
+    if posts is None:
+        rows = Post.objects.trending(days).values_list('pk', 'title', 'recent_views')[:TRENDING_SIZE]
+        posts = [
+            {'id': pk, 'title': title, 'views': views, 'url': reverse('post-detail', args=[pk])}
+            for pk, title, views in rows
+        ]
+        cache.set(key, posts, TRENDING_CACHE_TIMEOUT)
+    return JsonResponse({'days': days, 'posts': posts})
+
+
+@method_decorator(condition(etag_func=post_etag, last_modified_func=post_last_modified), name='get')
 class PostDetailView(DetailView):
     model = Post
     template_name = 'blog/post_detail.html'
 
+    def get(self, request, *args, **kwargs):
+        response = super().get(request, *args, **kwargs)
+        view_counter.record(self.object.pk)
+        return response
+
 
 class PostCreateView(LoginRequiredMixin, CreateView):
     model = Post
@@ -89,14 +186,71 @@ class PostDeleteView(LoginRequiredMixin, UserPassesTestMixin, DeleteView):
         post = self.get_object()
         return post.author == self.request.user
 
-class CommentListView(ListView):
+class CommentListView(KeysetPaginationMixin, ListView):
     model = Comment
     template_name = 'blog/comment_list.html'
     context_object_name = 'comments'
+    ordering = COMMENT_ORDERING
+    paginate_by = COMMENTS_PER_PAGE
 
     def get_queryset(self):
-        post_id = self.kwargs.get('post_id')
-        return Comment.objects.filter(post_id=post_id).order_by('-created_at')
+        self.post = get_object_or_404(Post, pk=self.kwargs.get('pk'))
+        return Comment.objects.filter(post=self.post).select_related('author')
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['post'] = self.post
+        # Where a client starts polling comments_since for newer comments.
+        # COMMENT_ORDERING is newest first, so on the first page that is
+        # its first comment; later pages look it up.
+        page = context['page_obj']
+        if not page.has_previous():
+            newest = page[0] if len(page) else None
+        else:
+            newest = Comment.objects.filter(post=self.post).order_by(*COMMENT_ORDERING).first()
+        if newest is not None:
+            context['poll_cursor'] = newest_comments_paginator(self.post).encode_cursor('n', newest)
+        return context
+
+
+def newest_comments_paginator(post):
+    return KeysetPaginator(
+        Comment.objects.filter(post=post).select_related('author'),
+        COMMENTS_PER_POLL,
+        ordering=('created_at', 'id'),
+    )
+
+
+def comments_since(request, pk):
+    """Comments newer than ``?after=<cursor>``, oldest first, as JSON.
+
+    Clients poll with the returned ``cursor``; an empty ``comments`` list
+    means nothing new. Without ``after`` the thread is read from the start.
+    """
+    post = get_object_or_404(Post, pk=pk)
+    paginator = newest_comments_paginator(post)
+    after = request.GET.get('after', '')
+    page = paginate_request(paginator, request, cursor_kwarg='after')
+    if page.has_next():
+        cursor = page.next_cursor
+    elif len(page):
+        cursor = paginator.encode_cursor('n', page[-1])
+    else:
+        cursor = after
+    return JsonResponse({
+        'comments': [
+            {
+                'id': comment.pk,
+                'author': comment.author.username,
+                'content': comment.content,
+                'created_at': comment.created_at.isoformat(),
+                'updated_at': comment.updated_at.isoformat(),
+            }
+            for comment in page
+        ],
+        'cursor': cursor,
+        'has_more': page.has_next(),
+    })
 
 
 class CommentCreateView(LoginRequiredMixin, CreateView):
@@ -105,11 +259,13 @@ class CommentCreateView(LoginRequiredMixin, CreateView):
     template_name = 'blog/comment_form.html'
 
     def form_valid(self, form):
-        post_id = self.kwargs.get('post_id')
+        post_id = self.kwargs.get('pk')
         post = get_object_or_404(Post, pk=post_id)
         form.instance.post = post
         form.instance.author = self.request.user
-        return super().form_valid(form)
+        # The comment and the post's comment_count update commit together.
+        with transaction.atomic():
+            return super().form_valid(form)
 
     def get_success_url(self):
         return reverse_lazy('post-detail', kwargs={'pk': self.object.post.pk})
@@ -136,30 +292,35 @@ class CommentDeleteView(LoginRequiredMixin, UserPassesTestMixin, DeleteView):
         comment = self.get_object()
         return comment.author == self.request.user
 
+    def form_valid(self, form):
+        with transaction.atomic():
+            return super().form_valid(form)
+
     def get_success_url(self):
         return reverse_lazy('post-detail', kwargs={'pk': self.object.post.pk})
     
 def posts_by_tag(request, tag_name):
-    posts = Post.objects.filter(tags__name=tag_name).distinct()
+    posts = Post.objects.for_listing().filter(tags__name=tag_name).distinct()
+    page = paginate_request(KeysetPaginator(posts, POSTS_PER_PAGE, POST_ORDERING), request)
     context = {
-        'posts': posts,
+        'posts': page.object_list,
+        'page_obj': page,
         'tag_name': tag_name,
     }
     return render(request, 'blog/post_list.html', context)
     
 def search_posts(request):
     query = request.GET.get('q', '').strip()
-    posts = Post.objects.all()
 
     if query:
-        posts = Post.objects.filter(
-            Q(title__icontains=query) |
-            Q(content__icontains=query) |
-            Q(tags__name__icontains=query)
-        ).distinct()
+        paginator = SearchPaginator(get_search_backend(), query, POSTS_PER_PAGE)
+    else:
+        paginator = KeysetPaginator(Post.objects.for_listing(), POSTS_PER_PAGE, POST_ORDERING)
 
+    page = paginate_request(paginator, request)
     context = {
-        'posts': posts,
+        'posts': page.object_list,
+        'page_obj': page,
         'query': query,
     }
     return render(request, 'blog/post_list.html', context)
\ No newline at end of file
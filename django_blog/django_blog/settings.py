@@ -10,11 +10,19 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/6.0/ref/settings/
 """
 
+import os
+import sys
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
+# The django_perf package shared by the projects in this repository lives
+# at its root.
+REPO_ROOT = BASE_DIR.parent
+if str(REPO_ROOT) not in sys.path:
+    sys.path.append(str(REPO_ROOT))
+
 
 # Quick-start development settings - unsuitable for production
 # See https://docs.djangoproject.com/en/6.0/howto/deployment/checklist/
@@ -42,7 +50,9 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'django_perf.instrumentation.RequestMetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'blog.middleware.ReplicaPinningMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -63,6 +73,7 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'blog.context_processors.cache_settings',
             ],
         },
     },
@@ -82,9 +93,65 @@ DATABASES = {
         'PASSWORD': '',
         'HOST': 'localhost',
         'PORT': '',
-    }
+    },
+    # A local stand-in for a read replica: a second SQLite file refreshed
+    # from the primary with `manage.py sync_replicas`. Tests mirror it onto
+    # the test database.
+    'replica': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / 'db.replica.sqlite3',
+        'TEST': {'MIRROR': 'default'},
+    },
+}
+
+# blog.routers.ReplicaRouter sends blog reads to these aliases (set
+# BLOG_USE_REPLICA=1 to use the local replica) and every write to
+# 'default'. After writing, a client reads from 'default' for
+# BLOG_REPLICA_PIN_SECONDS so it sees its own changes despite lag.
+DATABASE_ROUTERS = ['blog.routers.ReplicaRouter']
+BLOG_READ_REPLICAS = ['replica'] if os.environ.get('BLOG_USE_REPLICA') else []
+BLOG_REPLICA_PIN_SECONDS = 10
+
+# Blog pages take about ten queries: session, user, the page's posts or
+# comments and their tags in bulk. A request over REQUEST_QUERY_BUDGET (or
+# its view's entry in REQUEST_QUERY_BUDGETS) is logged as a likely N+1;
+# per-view totals are served at /metrics/ to staff users
+# (django_perf.instrumentation).
+REQUEST_QUERY_BUDGET = 20
+REQUEST_QUERY_BUDGETS = {}
+# Serve /metrics/ to anyone, not just staff users. Only for a scraper on
+# a network the public cannot reach.
+REQUEST_METRICS_PUBLIC = False
+
+
+# Cache
+# Rendered post cards are cached per post (see blog/post_list.html). Pick the
+# backend with BLOG_CACHE_BACKEND=locmem|file|redis; 'redis' expects a local
+# Redis-compatible server at BLOG_REDIS_URL.
+
+CACHE_BACKENDS = {
+    'locmem': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'django-blog',
+    },
+    'file': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.environ.get('BLOG_CACHE_DIR', str(BASE_DIR / 'cache')),
+    },
+    'redis': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.environ.get('BLOG_REDIS_URL', 'redis://127.0.0.1:6379/1'),
+    },
+}
+
+CACHES = {
+    'default': CACHE_BACKENDS[os.environ.get('BLOG_CACHE_BACKEND', 'locmem')],
 }
 
+# Seconds a rendered post card stays cached. Cards are keyed by post id and
+# Post.updated_at, so edits show up immediately regardless of this value.
+BLOG_CARD_CACHE_TIMEOUT = 60 * 60 * 24
+
 
 # Password validation
 # https://docs.djangoproject.com/en/6.0/ref/settings/#auth-password-validators
@@ -125,10 +192,28 @@ STATIC_URL = 'static/'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Resized copies of Post.image (see blog/images.py): target widths in pixels
+# and the number of background threads that generate them (0 = inline).
+BLOG_IMAGE_WIDTHS = (320, 640, 1280)
+BLOG_IMAGE_WORKERS = 2
+
+# Post detail views are counted in memory (see blog/view_counts.py) and
+# written in one batch at the end of a request once this many seconds have
+# passed since the last write or this many views are waiting.
+BLOG_VIEW_FLUSH_INTERVAL = 5
+BLOG_VIEW_FLUSH_THRESHOLD = 500
+
 LOGIN_URL = '/login/'
 LOGIN_REDIRECT_URL = '/post/'
 LOGOUT_REDIRECT_URL = '/login/'
 
 # Email backend for password reset (development)
 EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
-DEFAULT_FROM_EMAIL = 'no-reply@example.com'
\ No newline at end of file
+DEFAULT_FROM_EMAIL = 'no-reply@example.com'
+
+# Search backend for blog.views.search_posts: 'fts5', 'inverted', 'like' or
+# 'auto' (FTS5 when its table exists, otherwise the in-process inverted index).
+# Each process keeps its own inverted index and rebuilds it when another
+# process has written, which it learns from the default cache; with several
+# processes that cache must be shared (BLOG_CACHE_BACKEND=file or redis).
+BLOG_SEARCH_BACKEND = 'auto'
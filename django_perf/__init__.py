@@ -0,0 +1,12 @@
+"""
+Performance tooling shared by the Django projects in this repository.
+
+- ``instrumentation``: per-request query, SQL, template and size metrics,
+  the Server-Timing header and the /metrics/ endpoint.
+- ``nplusone``: the test-time N+1 query detector built on it.
+- ``benchmarking``: the base of each project's seed_benchmark_data and
+  run_benchmarks commands.
+
+Each project's settings.py puts the repository root on sys.path so this
+package imports the same way from every project.
+"""
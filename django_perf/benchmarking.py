@@ -0,0 +1,210 @@
+"""
+Shared pieces of the ``seed_benchmark_data`` and ``run_benchmarks`` commands.
+
+seed_benchmark_data (a SeedCommand) fills the database with synthetic rows
+through bulk_create in batches (insert_batches), timing each table. run_benchmarks requests the
+project's main pages in-process through the test client, so the numbers
+cover routing, middleware, views, the ORM and templates but no web server
+or network. It reports throughput, p50/p95/p99 latency and queries per
+request, and writes them as JSON. With ``--compare`` a run is checked
+against an earlier result file and fails if an endpoint's p95 grew by
+more than ``--tolerance`` percent or it runs more queries. An endpoint
+that answers any request with a 4xx or 5xx fails the run, and is left out
+of comparisons on either side: its timings are of an error page.
+"""
+
+import json
+import math
+import platform
+import time
+from contextlib import ExitStack
+from datetime import datetime, timezone
+from itertools import islice
+from pathlib import Path
+
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.test import Client
+
+
+def insert_batches(model, objects, batch_size):
+    """bulk_create ``objects``, any iterable, ``batch_size`` rows at a time
+    without holding more than one batch in memory. Returns the row count.
+    """
+    objects = iter(objects)
+    total = 0
+    while batch := list(islice(objects, batch_size)):
+        model._default_manager.bulk_create(batch)
+        total += len(batch)
+    return total
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    return sorted_values[max(0, math.ceil(len(sorted_values) * pct / 100) - 1)]
+
+
+def request_host():
+    """A Host header the project accepts: the first of ALLOWED_HOSTS, or
+    localhost, which DEBUG allows while ALLOWED_HOSTS is empty.
+    """
+    for host in settings.ALLOWED_HOSTS:
+        if host != "*":
+            return host.lstrip(".")
+    return "localhost"
+
+
+class QueryCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+class SeedCommand(BaseCommand):
+    """Base of a project's seed_benchmark_data command."""
+
+    def timed(self, label, insert):
+        """Run ``insert``, which returns a row count, and report its rate."""
+        started = time.perf_counter()
+        rows = insert()
+        elapsed = time.perf_counter() - started
+        self.stdout.write(f"{label:<10} {rows:>10} rows in {elapsed:6.1f}s ({rows / max(elapsed, 1e-9):,.0f} rows/s)")
+
+
+class BenchmarkCommand(BaseCommand):
+    """Base of a project's run_benchmarks command; subclasses return the
+    pages to request from endpoints().
+    """
+    help = (
+        "Request the main pages in-process and report throughput, p50/p95/p99 "
+        "latency and queries per request, saving the results as JSON. Seed "
+        "the database with seed_benchmark_data first."
+    )
+
+    def endpoints(self):
+        """Return ``[(name, path), ...]``."""
+        raise NotImplementedError
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=200, help="Timed requests per endpoint.")
+        parser.add_argument(
+            "--warmup", type=int, default=10, help="Untimed requests per endpoint first, e.g. to fill caches.",
+        )
+        parser.add_argument("--endpoint", action="append", dest="only", help="Only run this endpoint (repeatable).")
+        parser.add_argument("--output", help="Result file. Defaults to benchmarks/<timestamp>.json.")
+        parser.add_argument("--compare", help="Earlier result file to check this run against.")
+        parser.add_argument(
+            "--tolerance", type=float, default=10.0, help="p95 slowdown in percent that --compare accepts.",
+        )
+
+    def handle(self, *args, **options):
+        endpoints = self.endpoints()
+        if options["only"]:
+            unknown = set(options["only"]) - {name for name, _ in endpoints}
+            if unknown:
+                raise CommandError(f"Unknown endpoint(s): {', '.join(sorted(unknown))}")
+            endpoints = [(name, path) for name, path in endpoints if name in options["only"]]
+
+        client = Client(HTTP_HOST=request_host(), raise_request_exception=False)
+        results = {}
+        self.stdout.write(
+            f"{'endpoint':<22} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'queries':>8} {'errors':>7}"
+        )
+        for name, path in endpoints:
+            result = results[name] = self.run_endpoint(client, path, options["requests"], options["warmup"])
+            self.stdout.write(
+                f"{name:<22} {result['requests_per_second']:>8.1f} {result['p50_ms']:>8.2f} "
+                f"{result['p95_ms']:>8.2f} {result['p99_ms']:>8.2f} "
+                f"{result['queries_per_request']:>8.1f} {result['errors']:>7}"
+            )
+            if result["errors"]:
+                self.stderr.write(self.style.ERROR(
+                    f"{name}: {result['errors']} of {options['requests']} requests to {path} failed "
+                    f"(last status {result['last_error_status']})."
+                ))
+
+        now = datetime.now(timezone.utc)
+        report = {
+            "project": settings.ROOT_URLCONF.split(".")[0],
+            "created": now.isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "django": django.get_version(),
+            "database": connections["default"].vendor,
+            "requests": options["requests"],
+            "endpoints": results,
+        }
+        output = Path(options["output"] or Path(settings.BASE_DIR, "benchmarks", f"{now:%Y%m%dT%H%M%S}.json"))
+        output.parent.mkdir(parents=True, exist_ok=True)
+        output.write_text(json.dumps(report, indent=2) + "\n")
+        self.stdout.write(self.style.SUCCESS(f"Wrote {output}"))
+
+        failures = [f"{name}: {result['errors']} errors" for name, result in results.items() if result["errors"]]
+        if options["compare"]:
+            failures += self.compare(report, options["compare"], options["tolerance"])
+        if failures:
+            raise CommandError("Failed: " + "; ".join(failures))
+
+    def run_endpoint(self, client, path, requests, warmup):
+        for _ in range(warmup):
+            client.get(path, secure=True)
+        counter = QueryCounter()
+        latencies = []
+        errors = 0
+        last_error_status = None
+        with ExitStack() as stack:
+            for alias in connections:
+                stack.enter_context(connections[alias].execute_wrapper(counter))
+            started = time.perf_counter()
+            for _ in range(requests):
+                request_started = time.perf_counter()
+                response = client.get(path, secure=True)
+                latencies.append((time.perf_counter() - request_started) * 1000)
+                if response.status_code >= 400:
+                    errors += 1
+                    last_error_status = response.status_code
+            elapsed = time.perf_counter() - started
+        latencies.sort()
+        return {
+            "path": path,
+            "requests_per_second": round(requests / elapsed, 1),
+            "p50_ms": round(percentile(latencies, 50), 3),
+            "p95_ms": round(percentile(latencies, 95), 3),
+            "p99_ms": round(percentile(latencies, 99), 3),
+            "queries_per_request": round(counter.count / requests, 2),
+            "errors": errors,
+            "last_error_status": last_error_status,
+        }
+
+    def compare(self, report, baseline_path, tolerance):
+        """Check ``report`` against the result file at ``baseline_path`` and
+        return its regressions. Endpoints with errors in either run are skipped.
+        """
+        baseline = json.loads(Path(baseline_path).read_text())["endpoints"]
+        regressions = []
+        self.stdout.write(f"\nAgainst {baseline_path}:")
+        for name, result in report["endpoints"].items():
+            before = baseline.get(name)
+            if before is None:
+                continue
+            if result["errors"] or before.get("errors"):
+                self.stdout.write(f"{name:<22} skipped: errors in {'this run' if result['errors'] else 'the baseline'}")
+                continue
+            change = (result["p95_ms"] / before["p95_ms"] - 1) * 100 if before["p95_ms"] else 0.0
+            self.stdout.write(
+                f"{name:<22} p95 {before['p95_ms']:.2f} -> {result['p95_ms']:.2f} ms ({change:+.0f}%), "
+                f"queries {before['queries_per_request']:g} -> {result['queries_per_request']:g}"
+            )
+            if change > tolerance:
+                regressions.append(f"{name}: p95 {change:+.0f}%")
+            if result["queries_per_request"] > before["queries_per_request"]:
+                regressions.append(
+                    f"{name}: {before['queries_per_request']:g} -> {result['queries_per_request']:g} queries"
+                )
+        if not regressions:
+            self.stdout.write(self.style.SUCCESS("No regressions."))
+        return regressions
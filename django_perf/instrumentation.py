@@ -0,0 +1,272 @@
+"""
+Per-request database, template and response-size metrics.
+
+RequestMetricsMiddleware times every request and counts its queries
+across all database aliases, including queries an async view runs
+through sync_to_async. Each response gets a Server-Timing header, which
+browser dev tools show next to the request:
+
+    Server-Timing: db;dur=3.1;desc="7 queries", tpl;dur=12.4, total;dur=18.9
+
+Totals per view name accumulate in the process and are served in the
+Prometheus text format by ``metrics``, to staff users only unless DEBUG
+or REQUEST_METRICS_PUBLIC (off by default; for a scraper that cannot log
+in, on a network the public cannot reach) is on. A request that runs more queries than its budget,
+REQUEST_QUERY_BUDGETS[view name] or else REQUEST_QUERY_BUDGET, is logged
+as a warning and counted, which is usually an N+1 query.
+
+Queries and templates are counted while the view runs; the body of a
+streaming response is generated later and is not included, nor is its
+size.
+
+While a detector from ``nplusone`` is active, each query is also recorded
+with the template line or code that ran it, and the detector checks every
+request as it finishes.
+
+Nothing is patched on import: the middleware installs the database and
+template hooks when it is first set up.
+"""
+
+import logging
+import sys
+import threading
+import time
+from collections import defaultdict
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.http import Http404, HttpResponse
+from django.template.base import Node, Template
+
+logger = logging.getLogger(__name__)
+
+# The metrics of the request being handled; copied into sync_to_async threads.
+current_metrics = ContextVar('request_metrics', default=None)
+# Active N+1 detectors; each is called as detector(request, view, metrics).
+detectors = []
+
+
+class RequestMetrics:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.sql_seconds = 0.0
+        self.template_seconds = 0.0
+        self.template_depth = 0
+        # [(sql, origin), ...] while a detector is active.
+        self.statements = [] if detectors else None
+
+
+def query_origin():
+    """Where the running query comes from: a template line, a serializer
+    field, or else the innermost frame of project code.
+    """
+    frame = sys._getframe(1)
+    code_frame = None
+    while frame is not None:
+        node = frame.f_locals.get('self')
+        # Only type(node): touching a lazy object (request.user) would run
+        # its queries from in here.
+        kind = type(node)
+        if issubclass(kind, Node) and getattr(node, 'token', None) is not None and node.origin:
+            origin = node.origin
+            return f'{origin.template_name or origin.name}:{node.token.lineno}'
+        # A REST framework field reading e.g. book.author.name.
+        if any(cls.__module__ == 'rest_framework.fields' and cls.__name__ == 'Field' for cls in kind.__mro__):
+            return f'{type(node.parent).__name__}.{node.field_name}'
+        filename = frame.f_code.co_filename
+        if code_frame is None and filename != __file__ and filename.startswith(str(settings.BASE_DIR)):
+            code_frame = frame
+        frame = frame.f_back
+    if code_frame is None:
+        return '<unknown>'
+    path = code_frame.f_code.co_filename.removeprefix(f'{settings.BASE_DIR}/')
+    return f'{path}:{code_frame.f_lineno} in {code_frame.f_code.co_name}'
+
+
+def record_query(execute, sql, params, many, context):
+    metrics = current_metrics.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.queries += 1
+        metrics.sql_seconds += time.perf_counter() - start
+        if metrics.statements is not None:
+            metrics.statements.append((sql, query_origin()))
+
+
+def instrument_connection(connection):
+    # First in line, so connection.execute_wrapper() blocks that pop the
+    # last wrapper when they exit never remove this one.
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, record_query)
+
+
+def on_connection_created(sender, connection, **kwargs):
+    instrument_connection(connection)
+
+
+_render_template = Template.render
+
+
+def timed_render(self, context):
+    metrics = current_metrics.get()
+    # {% include %} and {% extends %} render inside the outer template's time.
+    if metrics is None or metrics.template_depth:
+        return _render_template(self, context)
+    metrics.template_depth += 1
+    start = time.perf_counter()
+    try:
+        return _render_template(self, context)
+    finally:
+        metrics.template_seconds += time.perf_counter() - start
+        metrics.template_depth -= 1
+
+
+def install():
+    """Time template rendering and count the queries of every connection.
+    Process-wide, so only called once the middleware is enabled.
+    """
+    connection_created.connect(on_connection_created, dispatch_uid='django_perf.instrumentation')
+    # Connections opened before the signal receiver was connected.
+    for connection in connections.all(initialized_only=True):
+        instrument_connection(connection)
+    if Template.render is not timed_render:
+        Template.render = timed_render
+
+
+# (metric name, field, type, help)
+METRICS = [
+    ('django_requests_total', 'requests', 'counter', 'Requests handled.'),
+    ('django_request_seconds_total', 'seconds', 'counter', 'Time spent handling requests.'),
+    ('django_db_queries_total', 'queries', 'counter', 'Database queries run.'),
+    ('django_db_query_seconds_total', 'sql_seconds', 'counter', 'Time spent in database queries.'),
+    ('django_template_seconds_total', 'template_seconds', 'counter', 'Time spent rendering templates.'),
+    ('django_response_bytes_total', 'response_bytes', 'counter', 'Size of non-streaming response bodies.'),
+    ('django_query_budget_exceeded_total', 'over_budget', 'counter', 'Requests over their query budget.'),
+    ('django_db_queries_max', 'max_queries', 'gauge', 'Most queries run by a single request.'),
+]
+
+
+class MetricsRegistry:
+    """Per-view totals for the life of the process."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._views = defaultdict(lambda: dict.fromkeys((field for _, field, _, _ in METRICS), 0))
+
+    def observe(self, view, metrics, seconds, response_bytes, over_budget):
+        with self._lock:
+            totals = self._views[view]
+            totals['requests'] += 1
+            totals['seconds'] += seconds
+            totals['queries'] += metrics.queries
+            totals['sql_seconds'] += metrics.sql_seconds
+            totals['template_seconds'] += metrics.template_seconds
+            totals['response_bytes'] += response_bytes
+            totals['over_budget'] += over_budget
+            totals['max_queries'] = max(totals['max_queries'], metrics.queries)
+
+    def snapshot(self):
+        with self._lock:
+            return {view: dict(totals) for view, totals in self._views.items()}
+
+    def reset(self):
+        with self._lock:
+            self._views.clear()
+
+    def render(self):
+        """The totals in the Prometheus text exposition format."""
+        views = sorted(self.snapshot().items())
+        lines = []
+        for name, field, kind, help_text in METRICS:
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} {kind}')
+            for view, totals in views:
+                label = view.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+                lines.append(f'{name}{{view="{label}"}} {totals[field]:g}')
+        return '\n'.join(lines) + '\n'
+
+
+registry = MetricsRegistry()
+
+
+def query_budget(view):
+    return getattr(settings, 'REQUEST_QUERY_BUDGETS', {}).get(view, getattr(settings, 'REQUEST_QUERY_BUDGET', None))
+
+
+class RequestMetricsMiddleware:
+    """Record query count, SQL, template and total time and response size.
+
+    Goes first in MIDDLEWARE so the queries of the other middleware, such
+    as loading the session and user, are counted too.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+        install()
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        metrics = RequestMetrics()
+        token = current_metrics.set(metrics)
+        try:
+            response = self.get_response(request)
+        finally:
+            current_metrics.reset(token)
+        return self.finish(request, metrics, response)
+
+    async def __acall__(self, request):
+        metrics = RequestMetrics()
+        token = current_metrics.set(metrics)
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_metrics.reset(token)
+        return self.finish(request, metrics, response)
+
+    def finish(self, request, metrics, response):
+        seconds = time.perf_counter() - metrics.started
+        match = request.resolver_match
+        view = match.view_name if match else '<unresolved>'
+        budget = query_budget(view)
+        over_budget = budget is not None and metrics.queries > budget
+        if over_budget:
+            logger.warning(
+                '%s %s ran %d queries, over the budget of %d for %s',
+                request.method, request.path, metrics.queries, budget, view,
+            )
+        response_bytes = 0 if response.streaming else len(response.content)
+        registry.observe(view, metrics, seconds, response_bytes, over_budget)
+        response['Server-Timing'] = ', '.join([
+            f'db;dur={metrics.sql_seconds * 1000:.1f};desc="{metrics.queries} queries"',
+            f'tpl;dur={metrics.template_seconds * 1000:.1f}',
+            f'total;dur={seconds * 1000:.1f}',
+        ])
+        if metrics.statements is not None:
+            for detector in list(detectors):
+                detector(request, view, metrics)
+        return response
+
+
+def metrics(request):
+    # Not by client address: behind a reverse proxy every request comes
+    # from the proxy.
+    user = getattr(request, 'user', None)
+    if not (
+        settings.DEBUG or getattr(settings, 'REQUEST_METRICS_PUBLIC', False)
+        or (user is not None and user.is_staff)
+    ):
+        raise Http404
+    return HttpResponse(registry.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
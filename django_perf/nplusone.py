@@ -0,0 +1,94 @@
+"""
+Fail tests on N+1 queries and on views that exceed their query budget.
+
+While a detector is active, RequestMetricsMiddleware records every query a
+request runs together with the template line or code that ran it (see
+instrumentation.query_origin). When the request finishes the detector
+groups the statements by their shape, with parameters and ``IN`` lists
+collapsed, and raises AssertionError, which the test client re-raises,
+if one shape ran ``threshold`` or more times or the request ran more
+queries than its budget:
+
+    N+1 queries in post-list (GET /post/): 14 queries
+      10x SELECT ... FROM "blog_tag" ... WHERE "blog_post_tags"."post_id" IN (...)
+          10x from blog/post_list.html:21
+
+Enable it for a test case with QueryBudgetTestMixin, or around a block:
+
+    with detect_n_plus_one(budget=8):
+        self.client.get(url)
+"""
+
+import re
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+
+from .instrumentation import detectors
+
+IN_LIST = re.compile(r'\bIN \((?:%s, )*%s\)')
+NUMBER = re.compile(r'\b\d+\b')
+WHITESPACE = re.compile(r'\s+')
+
+
+def normalize(sql):
+    """The shape of a statement: the same query for a different row or
+    with a different number of ids maps to the same string.
+    """
+    sql = IN_LIST.sub('IN (...)', sql)
+    sql = NUMBER.sub('?', sql)
+    return WHITESPACE.sub(' ', sql).strip()
+
+
+class NPlusOneDetector:
+    def __init__(self, threshold=3, budget=None, budgets=None):
+        self.threshold = threshold
+        self.budget = budget
+        self.budgets = budgets or {}
+
+    def __call__(self, request, view, metrics):
+        groups = defaultdict(Counter)
+        for sql, origin in metrics.statements:
+            groups[normalize(sql)][origin] += 1
+        repeated = {
+            shape: origins for shape, origins in groups.items() if origins.total() >= self.threshold
+        }
+        budget = self.budgets.get(view, self.budget)
+        over_budget = budget is not None and metrics.queries > budget
+        if not repeated and not over_budget:
+            return
+        problem = 'N+1 queries' if repeated else 'Query budget exceeded'
+        lines = [f'{problem} in {view} ({request.method} {request.get_full_path()}): {metrics.queries} queries']
+        if over_budget:
+            lines[0] += f', budget {budget}'
+        for shape, origins in sorted(repeated.items(), key=lambda item: -item[1].total()):
+            lines.append(f'  {origins.total()}x {shape}')
+            lines.extend(f'      {count}x from {origin}' for origin, count in origins.most_common())
+        raise AssertionError('\n'.join(lines))
+
+
+@contextmanager
+def detect_n_plus_one(threshold=3, budget=None, budgets=None):
+    """Check every request made inside the block."""
+    detector = NPlusOneDetector(threshold, budget, budgets)
+    detectors.append(detector)
+    try:
+        yield detector
+    finally:
+        detectors.remove(detector)
+
+
+class QueryBudgetTestMixin:
+    """Check every request a test case makes for N+1 queries.
+
+    ``query_budget`` caps the queries of any one request and
+    ``query_budgets`` per view name; the default only looks for repeated
+    statements.
+    """
+    n_plus_one_threshold = 3
+    query_budget = None
+    query_budgets = {}
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.enterClassContext(detect_n_plus_one(cls.n_plus_one_threshold, cls.query_budget, cls.query_budgets))